@@ -1 +1,2 @@
 # FastAPI app package
+from . import env  # noqa: F401  (loads .env before any submodule reads os.environ)
@@ -1,16 +1,105 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sih.db")
 
-# SQLite needs this arg in SQLAlchemy for multithreaded FastAPI
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").lower() in ("1", "true", "yes", "on")
+
+
+def _sqlite_pragmas(engine: Engine) -> None:
+    """Apply per-connection pragmas: WAL lets readers run alongside the single writer.
+
+    Env:
+      - SQLITE_JOURNAL_MODE (default WAL)
+      - SQLITE_SYNCHRONOUS (default NORMAL; durable under WAL except for OS crashes)
+      - SQLITE_BUSY_TIMEOUT_MS (default 5000)
+      - SQLITE_MMAP_SIZE bytes (default 256 MiB)
+    """
+    pragmas = {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+        "mmap_size": _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+    }
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cur.execute(f"PRAGMA {name}={value}")
+        cur.close()
+
+
+def make_engine(url: str = DATABASE_URL) -> Engine:
+    """Build the engine from env.
+
+    Pooling (file SQLite and server databases):
+      - DB_POOL_SIZE (default 10), DB_MAX_OVERFLOW (default 20), DB_POOL_TIMEOUT seconds (default 30)
+      - DB_POOL_RECYCLE seconds (default 1800), DB_POOL_PRE_PING (default on except SQLite)
+    Postgres only:
+      - DB_STATEMENT_TIMEOUT_MS (unset = no limit)
+    """
+    sqlite = url.startswith("sqlite")
+    connect_args = {}
+    kwargs = {}
+    if sqlite:
+        # SQLite needs this arg in SQLAlchemy for multithreaded FastAPI
+        connect_args["check_same_thread"] = False
+    in_memory = sqlite and (":memory:" in url or url == "sqlite://")
+    if not in_memory:
+        kwargs = {
+            "pool_size": _env_int("DB_POOL_SIZE", 10),
+            "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+            "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+            "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+            "pool_pre_ping": _env_flag("DB_POOL_PRE_PING", not sqlite),
+        }
+    statement_timeout = os.getenv("DB_STATEMENT_TIMEOUT_MS")
+    if statement_timeout and url.startswith("postgresql"):
+        connect_args["options"] = f"-c statement_timeout={int(statement_timeout)}"
+    engine = create_engine(url, connect_args=connect_args, **kwargs)
+    if sqlite:
+        _sqlite_pragmas(engine)
+    return engine
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Opt-in outside SQLite: with several workers or replicas, run `python -m app.db` once per deploy instead
+CREATE_SCHEMA = _env_flag("DB_CREATE_SCHEMA", DATABASE_URL.startswith("sqlite"))
+
+
+def create_schema(bind: Engine = engine) -> None:
+    """Create missing tables and indexes; existing ones are left alone."""
+    from . import models  # noqa: F401  (registers the tables on Base.metadata)
+
+    fresh_ledger = not inspect(bind).has_table(models.PointsLedger.__tablename__)
+    Base.metadata.create_all(bind=bind)
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    if fresh_ledger:
+        # One-time migration: points earned before the ledger existed become each profile's
+        # opening entry. Databases that already had the ledger use `python -m app.db --backfill-ledger`
+        from .services.points import backfill_opening_balances
+
+        with Session(bind=bind) as db:
+            backfill_opening_balances(db)
+            db.commit()
+
+
 # Dependency
 def get_db():
     db = SessionLocal()
@@ -18,3 +107,25 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # Under -m this file is __main__ with its own Base; the models register on app.db's
+    from app import db
+    from app.services import points
+
+    ap = argparse.ArgumentParser(description="Create missing tables and indexes.")
+    ap.add_argument("--backfill-ledger", action="store_true",
+                    help="give profiles with points but no ledger entries an opening entry, then list mismatches")
+    args = ap.parse_args()
+    db.create_schema()
+    print(f"schema ready on {db.engine.url.render_as_string(hide_password=True)}")
+    if args.backfill_ledger:
+        with db.SessionLocal() as session:
+            added = points.backfill_opening_balances(session)
+            session.commit()
+            print(f"opening ledger entries added: {added}")
+            for device_id, balance, total in points.ledger_mismatches(session):
+                print(f"MISMATCH {device_id}: points={balance} ledger={total}")
@@ -0,0 +1,18 @@
+"""Load .env files into os.environ before any module reads its settings.
+
+Imported by the package __init__, so it runs first for every entry point
+(uvicorn, `python -m app.services...`, password pool workers). Modules read
+env at import time (db.DATABASE_URL, service constants), which is why this
+cannot wait for app.main. Variables already set in the environment win.
+"""
+
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # backend/
+ROOT_DIR = BASE_DIR.parent  # project root
+
+# First, try root .env; then backend/.env (no override)
+load_dotenv(ROOT_DIR / ".env")
+load_dotenv(BASE_DIR / ".env")
@@ -1,26 +1,49 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .db import Base, engine
+from . import db
+from .db import SessionLocal, engine
 from .routers import profile as profile_router
 from .routers import rewards as rewards_router
 from .routers import ai as ai_router
 from .routers import weather as weather_router
 from .routers import updates as updates_router
 from .routers import auth as auth_router
-from dotenv import load_dotenv
-from pathlib import Path
+from .routers import leaderboard as leaderboard_router
+from .services import crop_cache, http_clients, leaderboard, metrics, passwords, schemes
+
+# .env is loaded by the package __init__ (app/env.py), before db reads DATABASE_URL
+
 
-# Load environment variables from project root .env and backend/.env if present
-BASE_DIR = Path(__file__).resolve().parent.parent  # backend/
-ROOT_DIR = BASE_DIR.parent  # project root
-# First, try root .env; then backend/.env (no override)
-load_dotenv(ROOT_DIR / ".env")
-load_dotenv(BASE_DIR / ".env")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema bootstrap runs per worker at startup, not on import (DB_CREATE_SCHEMA)
+    if db.CREATE_SCHEMA:
+        await asyncio.to_thread(db.create_schema)
+    # Pooled outbound HTTP clients live as long as the app
+    http_clients.open_all()
+    passwords.start()
+    schemes.start_ingester()
+    leaderboard.start()
+    crop_cache.start()
+    try:
+        yield
+    finally:
+        crop_cache.stop()
+        leaderboard.stop()
+        schemes.stop_ingester()
+        passwords.shutdown()
+        await http_clients.aclose_all()
 
-# Create tables
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="SIH Backend", version="0.1.0")
+app = FastAPI(title="SIH Backend", version="0.1.0", lifespan=lifespan)
+
+if metrics.ENABLED:
+    metrics.instrument_db(engine, SessionLocal)
+    app.add_middleware(metrics.MetricsMiddleware)
 
 # CORS for local dev (Vite default ports)
 app.add_middleware(
@@ -40,6 +63,12 @@ app.add_middleware(
 def health():
     return {"status": "ok"}
 
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus text exposition of this worker's metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Include routers under /api
 app.include_router(profile_router.router, prefix="/api")
 app.include_router(rewards_router.router, prefix="/api")
@@ -47,3 +76,4 @@ app.include_router(ai_router.router, prefix="/api")
 app.include_router(weather_router.router, prefix="/api")
 app.include_router(auth_router.router, prefix="/api")
 app.include_router(updates_router.router, prefix="/api")
+app.include_router(leaderboard_router.router, prefix="/api")
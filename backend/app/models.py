@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, JSON, UniqueConstraint
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, JSON, UniqueConstraint, Index
 from .db import Base
 
 class Profile(Base):
@@ -40,6 +40,8 @@ class Activity(Base):
     type = Column(String, nullable=False)
     meta = Column(JSON, default=dict)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Backs keyset pagination of /profile/activity (newest first)
+    __table_args__ = (Index('ix_activities_device_created_id', 'device_id', 'created_at', 'id'),)
 
 class Redemption(Base):
     __tablename__ = "redemptions"
@@ -49,3 +51,41 @@ class Redemption(Base):
     item_name = Column(String, nullable=False)
     cost = Column(Integer, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class PointsLedger(Base):
+    """Append-only record of every balance change; SUM(delta) per device rebuilds Profile.points."""
+    __tablename__ = "points_ledger"
+    id = Column(Integer, primary_key=True, index=True)
+    device_id = Column(String, index=True, nullable=False)
+    delta = Column(Integer, nullable=False)
+    balance = Column(Integer, nullable=False)  # balance right after this change
+    kind = Column(String, nullable=False)      # add_points | redeem | opening
+    reason = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ClientEvent(Base):
+    """Client-generated event ids already applied via /profile/events:batch (idempotency keys)."""
+    __tablename__ = "client_events"
+    id = Column(Integer, primary_key=True, index=True)
+    device_id = Column(String, nullable=False)
+    event_id = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = (UniqueConstraint('device_id', 'event_id', name='uq_client_event'),)
+
+
+class CropRecommendation(Base):
+    """Crop suggestions per normalized input tuple, from the precompute job or a live LLM answer."""
+    __tablename__ = "crop_recommendations"
+    id = Column(Integer, primary_key=True, index=True)
+    region = Column(String, nullable=False)
+    season = Column(String, nullable=False)
+    soil = Column(String, nullable=False)
+    market_demand = Column(Boolean, nullable=False)
+    crop_type = Column(String, nullable=False, default="")  # "" = any
+    items = Column(JSON, nullable=False)
+    source = Column(String, nullable=False)  # precompute | live
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        UniqueConstraint('region', 'season', 'soil', 'market_demand', 'crop_type', name='uq_crop_recommendation'),
+    )
@@ -1,15 +1,54 @@
+import json
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from ..schemas import ChatIn, CropSuggestIn
-from ..services.ai_chat import chat as chat_impl
+from ..services import chat_cache, crop_cache, provider_router
+from ..services.ai_chat import chat as chat_impl, chat_stream
 from ..services.ai_crops import suggest as crop_suggest
 
 router = APIRouter(tags=["ai"])
 
 @router.post("/ai/chat")
-def chat(body: ChatIn):
-    return {"reply": chat_impl(body.message)}
+async def chat(body: ChatIn):
+    return {"reply": await chat_impl(body.message)}
+
+async def _sse(message: str):
+    # `data: {"delta": ...}` per piece of text, then `event: done` naming the source
+    source = None
+    async for source, text in chat_stream(message):
+        yield f"data: {json.dumps({'delta': text}, ensure_ascii=False)}\n\n"
+    yield f"event: done\ndata: {json.dumps({'source': source})}\n\n"
+
+def _sse_response(message: str) -> StreamingResponse:
+    # X-Accel-Buffering stops nginx from holding tokens back until the answer completes
+    return StreamingResponse(
+        _sse(message), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/ai/chat/stream")
+async def chat_stream_post(body: ChatIn):
+    """Server-Sent Events version of /ai/chat; read it with fetch() and a stream reader."""
+    return _sse_response(body.message)
+
+@router.get("/ai/chat/stream")
+async def chat_stream_get(message: str):
+    """Same stream for EventSource clients, which can only send GET."""
+    return _sse_response(message)
+
+@router.get("/ai/chat/cache/stats")
+def chat_cache_stats():
+    return chat_cache.stats()
+
+@router.get("/ai/providers/health")
+def providers_health():
+    return provider_router.stats()
 
 @router.post("/ai/crops")
-def crops(body: CropSuggestIn):
-    items = crop_suggest(body.region, body.season, body.soil, body.marketDemand, body.cropType)
+async def crops(body: CropSuggestIn):
+    items = await crop_suggest(body.region, body.season, body.soil, body.marketDemand, body.cropType)
     return items
+
+@router.get("/ai/crops/stats")
+def crops_stats():
+    """Hit rates per tier, table coverage and the most requested uncovered inputs."""
+    return crop_cache.stats()
@@ -1,15 +1,18 @@
 from datetime import datetime, timedelta
+import hashlib
 import os
+import time
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Header, status
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..db import get_db
 from .. import models
 from ..schemas import UserCreate, UserLogin, UserOut, TokenOut, LinkDeviceIn
+from ..services import leaderboard, metrics, passwords, profile_cache
+from ..services.cache import TTLCache
 
 router = APIRouter(tags=["auth"])
 
@@ -17,60 +20,112 @@ SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "10080"))  # 7 days
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+# Verified tokens (sha256 -> user id, kept until the token's exp) and user rows (short TTL),
+# so the hot path of authenticated requests skips both the signature check and the DB.
+_token_cache = TTLCache(maxsize=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000")), ttl=3600)
+_user_cache = TTLCache(maxsize=int(os.getenv("AUTH_USER_CACHE_SIZE", "10000")), ttl=float(os.getenv("AUTH_USER_CACHE_TTL", "60")))
+metrics.track_cache("auth_token", _token_cache.stats)
+metrics.track_cache("auth_user", _user_cache.stats)
 
 
 def create_access_token(*, subject: str, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = {"sub": subject}
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
+    from jose import jwt  # python-jose (and its crypto backend) loads on first use, not at startup
+
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def get_current_user(authorization: Optional[str] = Header(None), db: Session = Depends(get_db)) -> models.User:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    token = authorization.split(" ", 1)[1]
+def _token_user_id(token: str) -> int:
+    key = hashlib.sha256(token.encode()).digest()
+    user_id = _token_cache.get(key)
+    if user_id is not None:
+        return user_id
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         sub: str = payload.get("sub")
         if sub is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    except JWTError:
+        user_id = int(sub)
+    except (JWTError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(models.User).filter(models.User.id == int(sub)).first()
+    # Never outlive the token itself
+    ttl = float(payload.get("exp") or 0) - time.time()
+    if ttl > 0:
+        _token_cache.set(key, user_id, ttl=min(ttl, _token_cache.ttl))
+    return user_id
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop the cached row; call after any change to a users row."""
+    _user_cache.pop(user_id)
+
+
+def auth_cache_stats() -> dict:
+    return {"tokens": _token_cache.stats(), "users": _user_cache.stats()}
+
+
+def get_current_user(authorization: Optional[str] = Header(None), db: Session = Depends(get_db)) -> models.User:
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    token = authorization.split(" ", 1)[1]
+    user_id = _token_user_id(token)
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        # Detached snapshot; callers only read id/email/full_name
+        return models.User(id=user_id, email=cached[0], full_name=cached[1])
+    user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    _user_cache.set(user_id, (user.email, user.full_name))
     return user
 
 
-@router.post("/auth/register", response_model=TokenOut)
-def register(body: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == body.email).first()
-    if existing:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
-    user = models.User(email=body.email, full_name=body.full_name or None, password_hash=get_password_hash(body.password))
+def _user_by_email(db: Session, email: str) -> Optional[models.User]:
+    return db.query(models.User).filter(models.User.email == email).first()
+
+
+def _create_user(db: Session, body: UserCreate, password_hash: str) -> models.User:
+    user = models.User(email=body.email, full_name=body.full_name or None, password_hash=password_hash)
     db.add(user)
     db.commit()
     db.refresh(user)
+    return user
+
+
+def _update_password_hash(db: Session, user: models.User, password_hash: str) -> None:
+    user.password_hash = password_hash
+    db.commit()
+    invalidate_user(user.id)
+
+
+# bcrypt runs in the password process pool; DB work stays in the threadpool
+@router.post("/auth/register", response_model=TokenOut)
+async def register(body: UserCreate, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(_user_by_email, db, body.email)
+    if existing:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
+    password_hash = await passwords.hash_password(body.password)
+    user = await run_in_threadpool(_create_user, db, body, password_hash)
     token = create_access_token(subject=str(user.id))
     return TokenOut(access_token=token, user=UserOut(id=user.id, email=user.email, full_name=user.full_name))
 
 
 @router.post("/auth/login", response_model=TokenOut)
-def login(body: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == body.email).first()
-    if not user or not verify_password(body.password, user.password_hash):
+async def login(body: UserLogin, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_user_by_email, db, body.email)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    valid, new_hash = await passwords.verify_password(body.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        # Stored hash predates the current BCRYPT_ROUNDS; upgrade it transparently
+        await run_in_threadpool(_update_password_hash, db, user, new_hash)
     token = create_access_token(subject=str(user.id))
     return TokenOut(access_token=token, user=UserOut(id=user.id, email=user.email, full_name=user.full_name))
 
@@ -98,4 +153,6 @@ def link_device(body: LinkDeviceIn, current: models.User = Depends(get_current_u
         if not prof.user_name and (current.full_name or current.email):
             prof.user_name = current.full_name or current.email.split("@")[0]
     db.commit()
+    leaderboard.update(prof.device_id, prof.points or 0)
+    profile_cache.put(prof)
     return {"linked": True, "device_id": body.device_id}
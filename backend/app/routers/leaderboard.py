@@ -0,0 +1,41 @@
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from ..db import get_db
+from .. import models
+from ..schemas import LeaderboardEntry, LeaderboardRank
+from ..services import leaderboard
+
+router = APIRouter(tags=["leaderboard"])
+
+
+def _with_names(db: Session, entries: List[Tuple[int, str, int]], me: Optional[str] = None) -> List[LeaderboardEntry]:
+    ids = [device_id for _, device_id, _ in entries]
+    names = dict(db.query(models.Profile.device_id, models.Profile.user_name).filter(models.Profile.device_id.in_(ids)))
+    return [
+        LeaderboardEntry(rank=rank, user_name=names.get(device_id), points=points, me=device_id == me)
+        for rank, device_id, points in entries
+    ]
+
+
+@router.get("/leaderboard/top", response_model=List[LeaderboardEntry])
+def get_top(limit: int = Query(default=10, ge=1, le=100), db: Session = Depends(get_db)):
+    return _with_names(db, leaderboard.top(limit))
+
+
+@router.get("/leaderboard/rank", response_model=LeaderboardRank)
+def get_rank(deviceId: str):
+    found = leaderboard.rank(deviceId)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    rank, points, total = found
+    return LeaderboardRank(rank=rank, points=points, total=total)
+
+
+@router.get("/leaderboard/around", response_model=List[LeaderboardEntry])
+def get_around(deviceId: str, window: int = Query(default=5, ge=0, le=50), db: Session = Depends(get_db)):
+    """The caller's entry (me=true) with up to `window` neighbours above and below."""
+    entries = leaderboard.around(deviceId, window)
+    if entries is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return _with_names(db, entries, me=deviceId)
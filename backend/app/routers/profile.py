@@ -1,22 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import json
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from ..db import get_db
+from ..db import get_db, SessionLocal
 from .. import models
-from ..schemas import ProfileIn, ProfileOut, PointsIn, BadgeIn, NameIn
-from datetime import datetime
+from ..schemas import (
+    ProfileIn, ProfileOut, PointsIn, BadgeIn, NameIn, EventIn, EventsBatchIn, EventsBatchOut, ActivityOut, ActivityPage,
+)
+from ..services import leaderboard, profile_cache
+from ..services.points import apply_point_events, change_points
+from datetime import datetime, timezone
 
 router = APIRouter(tags=["profile"])
 
 
-def _to_out(p: models.Profile) -> ProfileOut:
-    return ProfileOut(
-        device_id=p.device_id,
-        user_name=p.user_name,
-        points=p.points,
-        badges=p.badges or [],
-        streak_days=p.streak_days or 0,
-        last_claim_iso=p.last_claim_iso,
-    )
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): ignore W/ prefixes
+    return any(t.strip().removeprefix("W/") == etag for t in if_none_match.split(","))
 
 
 @router.post("/profile/init", response_model=ProfileOut)
@@ -34,15 +42,28 @@ def init_profile(body: ProfileIn, db: Session = Depends(get_db)):
     db.commit()
     if created:
         db.refresh(p)
-    return _to_out(p)
+        leaderboard.update(p.device_id, p.points or 0)
+    return profile_cache.put(p)
 
 
 @router.get("/profile", response_model=ProfileOut)
-def get_profile(deviceId: str, db: Session = Depends(get_db)):
-    p = db.query(models.Profile).filter(models.Profile.device_id == deviceId).first()
-    if not p:
+def get_profile(deviceId: str, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    """Served from the profile cache; pollers sending the last ETag get an empty 304 until it changes."""
+    body = profile_cache.read_through(
+        deviceId, lambda: db.query(models.Profile).filter(models.Profile.device_id == deviceId).first()
+    )
+    if body is None:
         raise HTTPException(status_code=404, detail="Profile not found")
-    return _to_out(p)
+    etag = profile_cache.etag(body)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/profile/cache/stats")
+def profile_cache_stats():
+    return profile_cache.stats()
 
 
 @router.post("/profile/name", response_model=ProfileOut)
@@ -53,21 +74,21 @@ def set_name(body: NameIn, db: Session = Depends(get_db)):
     p.user_name = body.user_name
     p.updated_at = datetime.utcnow()
     db.commit()
-    return _to_out(p)
+    return profile_cache.put(p)
 
 
 @router.post("/profile/add-points", response_model=ProfileOut)
 def add_points(body: PointsIn, db: Session = Depends(get_db)):
-    p = db.query(models.Profile).filter(models.Profile.device_id == body.device_id).first()
-    if not p:
+    # Single atomic UPDATE ... RETURNING; concurrent calls cannot lose updates
+    p = change_points(db, body.device_id, body.delta, "add_points", body.reason)
+    if p is None:
         raise HTTPException(status_code=404, detail="Profile not found")
-    p.points = (p.points or 0) + body.delta
-    p.updated_at = datetime.utcnow()
     # activity
     act = models.Activity(device_id=p.device_id, type="add_points", meta={"delta": body.delta, "reason": body.reason})
     db.add(act)
     db.commit()
-    return _to_out(p)
+    leaderboard.update(p.device_id, p.points)
+    return profile_cache.put(p)
 
 
 @router.post("/profile/award-badge", response_model=ProfileOut)
@@ -84,4 +105,149 @@ def award_badge(body: BadgeIn, db: Session = Depends(get_db)):
     act = models.Activity(device_id=p.device_id, type="award_badge", meta={"badge": body.badge})
     db.add(act)
     db.commit()
-    return _to_out(p)
+    return profile_cache.put(p)
+
+
+def _apply_events(db: Session, events: List[EventIn]) -> EventsBatchOut:
+    device_ids = {ev.device_id for ev in events}
+    profiles = {p.device_id: p for p in db.query(models.Profile).filter(models.Profile.device_id.in_(list(device_ids)))}
+    applied_keys = db.query(models.ClientEvent.device_id, models.ClientEvent.event_id).filter(
+        models.ClientEvent.event_id.in_([ev.event_id for ev in events])
+    )
+    seen = {tuple(k) for k in applied_keys}
+    fresh: List[EventIn] = []
+    duplicates = 0
+    for ev in events:
+        if ev.device_id not in profiles:
+            continue  # not recorded, so the client can replay it after /profile/init
+        key = (ev.device_id, ev.event_id)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        fresh.append(ev)
+
+    points: Dict[str, list] = {}
+    activities = []
+    for ev in fresh:
+        if ev.type == "add_points":
+            points.setdefault(ev.device_id, []).append((ev.delta, "add_points", ev.reason))
+            meta = {"delta": ev.delta, "reason": ev.reason}
+        else:
+            p = profiles[ev.device_id]
+            if ev.badge not in (p.badges or []):
+                p.badges = list(p.badges or []) + [ev.badge]
+            meta = {"badge": ev.badge}
+        activities.append({"device_id": ev.device_id, "type": ev.type, "meta": meta})
+    # One atomic UPDATE per device, however many point events it queued
+    for device_id, entries in points.items():
+        apply_point_events(db, device_id, entries)
+    if fresh:
+        db.execute(insert(models.Activity), activities)
+        db.execute(insert(models.ClientEvent), [{"device_id": ev.device_id, "event_id": ev.event_id} for ev in fresh])
+    db.commit()
+    # Commit expired the profiles; a single SELECT reloads all of them
+    rows = db.query(models.Profile).filter(models.Profile.device_id.in_(list(profiles))).all()
+    for p in rows:
+        if p.device_id in points:
+            leaderboard.update(p.device_id, p.points)
+    return EventsBatchOut(
+        profiles=[profile_cache.put(p) for p in rows],
+        applied=len(fresh),
+        duplicates=duplicates,
+        unknown_devices=sorted(device_ids - profiles.keys()),
+    )
+
+
+@router.post("/profile/events:batch", response_model=EventsBatchOut)
+def apply_events(body: EventsBatchIn, db: Session = Depends(get_db)):
+    """Apply queued offline events in one transaction; replays of a seen event_id are skipped."""
+    for ev in body.events:
+        if ev.type == "award_badge" and not ev.badge:
+            raise HTTPException(status_code=422, detail=f"Event {ev.event_id}: award_badge needs a badge")
+    try:
+        return _apply_events(db, body.events)
+    except IntegrityError:
+        # A concurrent retry of the same events committed first; they now count as duplicates
+        db.rollback()
+        return _apply_events(db, body.events)
+
+
+def _encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    # created_at is stored as naive UTC
+    if dt is not None and dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _activity_query(db: Session, device_id: str, activity_type: Optional[str], since: Optional[datetime], until: Optional[datetime]):
+    A = models.Activity
+    q = db.query(A.id, A.type, A.meta, A.created_at).filter(A.device_id == device_id)
+    if activity_type:
+        q = q.filter(A.type == activity_type)
+    if since:
+        q = q.filter(A.created_at >= since)
+    if until:
+        q = q.filter(A.created_at < until)
+    return q.order_by(A.created_at.desc(), A.id.desc())
+
+
+def _page(q, after: Optional[Tuple[datetime, int]], limit: int):
+    if after:
+        # Row-value comparison walks the (device_id, created_at, id) index from the cursor,
+        # so every page costs the same regardless of depth
+        q = q.filter(tuple_(models.Activity.created_at, models.Activity.id) < tuple_(*after))
+    return q.limit(limit).all()
+
+
+def _stream_ndjson(device_id: str, activity_type: Optional[str], since: Optional[datetime], until: Optional[datetime], after):
+    # Runs after the request's session is closed, so it uses its own
+    with SessionLocal() as db:
+        q = _activity_query(db, device_id, activity_type, since, until)
+        while True:
+            rows = _page(q, after, 1000)
+            # One chunk per page; each yielded chunk costs a threadpool hop
+            yield "".join(
+                json.dumps({"type": r.type, "meta": r.meta, "created_at": r.created_at.isoformat()}) + "\n" for r in rows
+            )
+            if len(rows) < 1000:
+                break
+            after = (rows[-1].created_at, rows[-1].id)
+
+
+@router.get("/profile/activity", response_model=ActivityPage)
+def get_activity(
+    deviceId: str,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    activity_type: Optional[str] = Query(default=None, alias="type"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    format: str = Query(default="json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db),
+):
+    """Newest-first activity history with cursor pagination; format=ndjson streams every match for export."""
+    after = _decode_cursor(cursor) if cursor else None
+    since, until = _naive_utc(since), _naive_utc(until)
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_ndjson(deviceId, activity_type, since, until, after), media_type="application/x-ndjson"
+        )
+    rows = _page(_activity_query(db, deviceId, activity_type, since, until), after, limit + 1)
+    next_cursor = _encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    items = [ActivityOut(type=r.type, meta=r.meta, created_at=r.created_at) for r in rows[:limit]]
+    return ActivityPage(items=items, next_cursor=next_cursor)
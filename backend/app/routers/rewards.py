@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 from ..db import get_db
 from .. import models
 from ..schemas import RedeemIn
-from datetime import datetime
+from ..services import leaderboard, profile_cache
+from ..services.points import change_points
 
 router = APIRouter(tags=["rewards"])
 
@@ -22,14 +23,13 @@ def get_catalog():
 
 @router.post("/rewards/redeem")
 def redeem(body: RedeemIn, db: Session = Depends(get_db)):
-    p = db.query(models.Profile).filter(models.Profile.device_id == body.device_id).first()
-    if not p:
-        raise HTTPException(status_code=404, detail="Profile not found")
-    if (p.points or 0) < body.cost:
+    # Check and deduct in one statement so parallel redeems cannot double-spend
+    p = change_points(db, body.device_id, -body.cost, "redeem", body.item_id, min_balance=body.cost)
+    if p is None:
+        exists = db.query(models.Profile.id).filter(models.Profile.device_id == body.device_id).first()
+        if not exists:
+            raise HTTPException(status_code=404, detail="Profile not found")
         raise HTTPException(status_code=400, detail="Not enough points")
-    # deduct
-    p.points = (p.points or 0) - body.cost
-    p.updated_at = datetime.utcnow()
     r = models.Redemption(
         device_id=body.device_id,
         item_id=body.item_id,
@@ -39,4 +39,6 @@ def redeem(body: RedeemIn, db: Session = Depends(get_db)):
     db.add(r)
     db.add(models.Activity(device_id=body.device_id, type="redeem", meta={"item_id": body.item_id, "cost": body.cost}))
     db.commit()
+    leaderboard.update(p.device_id, p.points)
+    profile_cache.put(p)
     return {"ok": True, "newPoints": p.points}
@@ -1,28 +1,45 @@
 from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from typing import Optional
 from ..services.schemes import fetch_live_schemes
 from ..services.eshram import validate_uan as eshram_validate
 from ..schemas import EshramValidateIn, RgiBirthIn, RgiDeathIn
-from ..services import rgi as rgi_service
+from ..services import rgi as rgi_service, verify_cache
 
 router = APIRouter(tags=["updates"])
 
 @router.get("/updates/schemes")
-def get_schemes(q: Optional[str] = Query(default=None, description="Search query"), limit: int = Query(default=8, ge=1, le=50)):
-    return fetch_live_schemes(q, limit)
+async def get_schemes(q: Optional[str] = Query(default=None, description="Search query"), limit: int = Query(default=8, ge=1, le=50)):
+    return await fetch_live_schemes(q, limit)
 
 
 @router.post("/updates/eshram/validate")
-def validate_eshram(body: EshramValidateIn):
+async def validate_eshram(body: EshramValidateIn):
     """Validate UAN and DOB against e-Shram API.
 
     Returns shape: { ok: bool, status: int, data?: any, error?: any }
     """
-    return eshram_validate(body.uan, body.dob)
+    return await eshram_validate(body.uan, body.dob)
+
+
+def _download_response(d: rgi_service.Download) -> StreamingResponse:
+    # Relayed as it arrives (chunked); nothing is buffered whole
+    # and the upstream response is closed afterwards even if the client left before the first chunk
+    headers = {"Cache-Control": "no-store", **d.headers}
+    background = BackgroundTask(d.close) if d.close is not None else None
+    return StreamingResponse(d.body, status_code=d.status, media_type=d.media_type, headers=headers, background=background)
+
+
+@router.get("/updates/verify/cache/stats")
+def verify_cache_stats():
+    return verify_cache.stats()
 
 
 @router.post("/updates/rgi/birth")
-def rgi_birth(body: RgiBirthIn):
+async def rgi_birth(body: RgiBirthIn, binary: bool = False):
+    """Birth certificate as {ok, status, contentType, data: base64}, or with ?binary=true the raw document
+    streamed with the upstream Content-Type (errors then come back as JSON with the upstream status)."""
     user = {
         "userIdType": body.userIdType,
         "userIdNumber": body.userIdNumber,
@@ -30,11 +47,16 @@ def rgi_birth(body: RgiBirthIn):
         "email": body.email,
     }
     fmt = (body.format or "pdf").lower()
-    return rgi_service.verify_birth(body.regNo, body.fullName, body.dob, body.gender, fmt=fmt, user=user)
+    if binary:
+        return _download_response(
+            await rgi_service.stream_birth(body.regNo, body.fullName, body.dob, body.gender, fmt=fmt, user=user)
+        )
+    return await rgi_service.verify_birth(body.regNo, body.fullName, body.dob, body.gender, fmt=fmt, user=user)
 
 
 @router.post("/updates/rgi/death")
-def rgi_death(body: RgiDeathIn):
+async def rgi_death(body: RgiDeathIn, binary: bool = False):
+    """Death certificate; same response modes as /updates/rgi/birth."""
     user = {
         "userIdType": body.userIdType,
         "userIdNumber": body.userIdNumber,
@@ -42,4 +64,8 @@ def rgi_death(body: RgiDeathIn):
         "email": body.email,
     }
     fmt = (body.format or "pdf").lower()
-    return rgi_service.verify_death(body.regNo, body.fullName, body.gender_deceased, body.dec_name, body.dod, body.relation, fmt=fmt, user=user)
+    if binary:
+        return _download_response(
+            await rgi_service.stream_death(body.regNo, body.fullName, body.gender_deceased, body.dec_name, body.dod, body.relation, fmt=fmt, user=user)
+        )
+    return await rgi_service.verify_death(body.regNo, body.fullName, body.gender_deceased, body.dec_name, body.dod, body.relation, fmt=fmt, user=user)
@@ -5,9 +5,23 @@ from typing import Optional
 import httpx
 from fastapi import APIRouter, HTTPException, Query
 
+from ..services import metrics
+from ..services.cache import SingleFlight, TTLCache
+from ..services.http_clients import get_async_client
+
 router = APIRouter(tags=["weather"])
 
-OW_BASE = "https://api.openweathermap.org/data/2.5"
+OW_BASE = os.getenv("OPENWEATHER_BASE", "https://api.openweathermap.org/data/2.5")
+
+# Farmers in one district send near-identical coordinates, so responses are cached
+# per grid cell (default 0.05 deg, ~5 km) and concurrent misses share one upstream call.
+GRID_DEG = float(os.getenv("WEATHER_GRID_DEG", "0.05"))
+CURRENT_TTL = float(os.getenv("WEATHER_CURRENT_TTL", "600"))     # 10 min
+FORECAST_TTL = float(os.getenv("WEATHER_FORECAST_TTL", "1800"))  # 30 min
+
+_cache = TTLCache(maxsize=int(os.getenv("WEATHER_CACHE_SIZE", "5000")), ttl=CURRENT_TTL)
+_inflight = SingleFlight()
+metrics.track_cache("weather", _cache.stats)
 
 
 def _kph(ms: Optional[float]) -> Optional[int]:
@@ -26,8 +40,27 @@ def _get_key() -> str:
     return key
 
 
-@router.get("/weather/current")
-def weather_current(lat: float = Query(...), lon: float = Query(...)):
+def _snap(value: float) -> float:
+    if GRID_DEG <= 0:
+        return value
+    return round(round(value / GRID_DEG) * GRID_DEG, 6)
+
+
+async def _cached(kind: str, lat: float, lon: float, fetch, ttl: float) -> dict:
+    key = (kind, _snap(lat), _snap(lon))
+    hit = _cache.get(key)
+    if hit is not None:
+        return hit
+
+    async def load():
+        out = await fetch(key[1], key[2])
+        _cache.set(key, out, ttl=ttl)
+        return out
+
+    return await _inflight.do(key, load)
+
+
+async def _fetch_current(lat: float, lon: float) -> dict:
     params = {
         "lat": lat,
         "lon": lon,
@@ -35,7 +68,7 @@ def weather_current(lat: float = Query(...), lon: float = Query(...)):
         "appid": _get_key(),
     }
     try:
-        r = httpx.get(f"{OW_BASE}/weather", params=params, timeout=10)
+        r = await get_async_client("weather").get(f"{OW_BASE}/weather", params=params)
         r.raise_for_status()
         j = r.json()
         rain_1h = None
@@ -59,8 +92,7 @@ def weather_current(lat: float = Query(...), lon: float = Query(...)):
         raise HTTPException(status_code=502, detail=f"OpenWeather error: {e}")
 
 
-@router.get("/weather/forecast")
-def weather_forecast(lat: float = Query(...), lon: float = Query(...)):
+async def _fetch_forecast(lat: float, lon: float) -> dict:
     params = {
         "lat": lat,
         "lon": lon,
@@ -68,7 +100,7 @@ def weather_forecast(lat: float = Query(...), lon: float = Query(...)):
         "appid": _get_key(),
     }
     try:
-        r = httpx.get(f"{OW_BASE}/forecast", params=params, timeout=10)
+        r = await get_async_client("weather").get(f"{OW_BASE}/forecast", params=params)
         r.raise_for_status()
         j = r.json()
         items = []
@@ -99,3 +131,18 @@ def weather_forecast(lat: float = Query(...), lon: float = Query(...)):
         return {"items": items}
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"OpenWeather error: {e}")
+
+
+@router.get("/weather/current")
+async def weather_current(lat: float = Query(...), lon: float = Query(...)):
+    return await _cached("current", lat, lon, _fetch_current, CURRENT_TTL)
+
+
+@router.get("/weather/forecast")
+async def weather_forecast(lat: float = Query(...), lon: float = Query(...)):
+    return await _cached("forecast", lat, lon, _fetch_forecast, FORECAST_TTL)
+
+
+@router.get("/weather/cache/stats")
+def weather_cache_stats():
+    return {**_cache.stats(), "coalesced": _inflight.coalesced, "gridDeg": GRID_DEG}
@@ -1,6 +1,6 @@
 from datetime import datetime
-from pydantic import BaseModel
-from typing import List, Optional, Any
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Any
 
 class ProfileIn(BaseModel):
     device_id: str
@@ -33,6 +33,24 @@ class RedeemIn(BaseModel):
     item_name: str
     cost: int
 
+# Offline gamification events replayed in one call; event_id is generated on the client
+class EventIn(BaseModel):
+    event_id: str
+    device_id: str
+    type: Literal["add_points", "award_badge"]
+    delta: int = 0
+    reason: Optional[str] = None
+    badge: Optional[str] = None
+
+class EventsBatchIn(BaseModel):
+    events: List[EventIn] = Field(max_length=500)
+
+class EventsBatchOut(BaseModel):
+    profiles: List[ProfileOut]
+    applied: int
+    duplicates: int
+    unknown_devices: List[str]
+
 class ChatIn(BaseModel):
     message: str
 
@@ -52,6 +70,22 @@ class ActivityOut(BaseModel):
     meta: Any
     created_at: datetime
 
+class ActivityPage(BaseModel):
+    items: List[ActivityOut]
+    next_cursor: Optional[str] = None  # pass back as `cursor` for the next (older) page
+
+# Other players are shown by name only; device ids double as credentials
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_name: Optional[str]
+    points: int
+    me: bool = False
+
+class LeaderboardRank(BaseModel):
+    rank: int
+    points: int
+    total: int
+
 # RGI (Registrar General of India) certificate verification inputs
 class RgiBirthIn(BaseModel):
     regNo: str
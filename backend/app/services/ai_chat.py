@@ -6,13 +6,20 @@ Supports (in order):
 - Ollama local (OLLAMA_BASE optional, default http://127.0.0.1:11434; OLLAMA_MODEL default llama3:latest)
 - Rule-based fallback
 
-Keep answers concise and agriculture-focused.
+`chat()` returns the whole answer; `chat_stream()` yields it as the provider
+produces it. Both skip providers whose circuit breaker is open (see
+provider_router). Keep answers concise and agriculture-focused.
 """
 
+import asyncio
+import json
 import os
-from typing import Optional
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 
-import httpx
+from . import chat_cache, provider_router
+from .http_clients import get_async_client, get_openai_client
+
+OPENROUTER_BASE = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
 
 SYSTEM_PROMPT = (
     "You are KrishiYukti, a helpful agriculture assistant for Indian farmers. "
@@ -20,7 +27,23 @@ SYSTEM_PROMPT = (
 )
 
 
-def _chat_openrouter(message: str) -> Optional[str]:
+def _messages(message: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": message},
+    ]
+
+
+def _openrouter_headers() -> Optional[dict]:
+    extra_headers = {}
+    if os.getenv("OPENROUTER_REFERRER"):
+        extra_headers["HTTP-Referer"] = os.getenv("OPENROUTER_REFERRER")
+    if os.getenv("OPENROUTER_TITLE"):
+        extra_headers["X-Title"] = os.getenv("OPENROUTER_TITLE")
+    return extra_headers or None
+
+
+async def _chat_openrouter(message: str) -> Optional[str]:
     """OpenRouter via OpenAI SDK-compatible client.
 
     Env:
@@ -28,49 +51,35 @@ def _chat_openrouter(message: str) -> Optional[str]:
       - OPENROUTER_MODEL (default 'openai/gpt-4o')
       - OPENROUTER_REFERRER (optional)
       - OPENROUTER_TITLE (optional)
+      - OPENROUTER_BASE_URL (default https://openrouter.ai/api/v1)
     """
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
         return None
     try:
-        from openai import OpenAI  # lazy import
-
-        client = OpenAI(api_key=api_key, base_url="https://openrouter.ai/api/v1")
-        extra_headers = {}
-        if os.getenv("OPENROUTER_REFERRER"):
-            extra_headers["HTTP-Referer"] = os.getenv("OPENROUTER_REFERRER")
-        if os.getenv("OPENROUTER_TITLE"):
-            extra_headers["X-Title"] = os.getenv("OPENROUTER_TITLE")
-        resp = client.chat.completions.create(
+        client = get_openai_client(OPENROUTER_BASE, api_key)
+        resp = await client.chat.completions.create(
             model=os.getenv("OPENROUTER_MODEL", "openai/gpt-4o"),
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": message},
-            ],
+            messages=_messages(message),
             temperature=0.7,
             max_tokens=250,
-            extra_headers=extra_headers or None,
+            extra_headers=_openrouter_headers(),
         )
         return resp.choices[0].message.content
     except Exception:
         return None
 
 
-def _chat_openai(message: str) -> Optional[str]:
+async def _chat_openai(message: str) -> Optional[str]:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         return None
     try:
-        # Lazy import so package remains optional
-        from openai import OpenAI
-
-        client = OpenAI(api_key=api_key)
-        resp = client.chat.completions.create(
+        # The openai package stays optional; it is imported when the first client is built
+        client = get_openai_client(None, api_key)
+        resp = await client.chat.completions.create(
             model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": message},
-            ],
+            messages=_messages(message),
             temperature=0.7,
             max_tokens=250,
         )
@@ -79,6 +88,29 @@ def _chat_openai(message: str) -> Optional[str]:
         return None
 
 
+async def _stream_openai_compat(client, message: str, **kwargs) -> AsyncIterator[str]:
+    stream = await client.chat.completions.create(
+        messages=_messages(message), temperature=0.7, max_tokens=250, stream=True, **kwargs
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _stream_openrouter(message: str) -> AsyncIterator[str]:
+    client = get_openai_client(OPENROUTER_BASE, os.getenv("OPENROUTER_API_KEY"))
+    async for token in _stream_openai_compat(
+        client, message, model=os.getenv("OPENROUTER_MODEL", "openai/gpt-4o"), extra_headers=_openrouter_headers()
+    ):
+        yield token
+
+
+async def _stream_openai(message: str) -> AsyncIterator[str]:
+    client = get_openai_client(None, os.getenv("OPENAI_API_KEY"))
+    async for token in _stream_openai_compat(client, message, model=os.getenv("OPENAI_MODEL", "gpt-4o-mini")):
+        yield token
+
+
 ## Removed: Groq and Hugging Face providers as per request
 
 
@@ -95,33 +127,91 @@ def _chat_rule_based(message: str) -> str:
     return "Monitor weather, test soil, and plan inputs based on crop stage."
 
 
-def chat(message: str) -> str:
-    # Try providers in priority order (OpenRouter first)
-    for fn in (_chat_openrouter, _chat_openai, _chat_ollama):
+Provider = Tuple[str, Callable[[str], Awaitable[Optional[str]]], Callable[[str], AsyncIterator[str]]]
+
+
+def _providers() -> List[Provider]:
+    """(cache namespace, chat, stream) in priority order (OpenRouter first); unconfigured ones are skipped."""
+    out = []
+    if os.getenv("OPENROUTER_API_KEY"):
+        out.append((f"openrouter:{os.getenv('OPENROUTER_MODEL', 'openai/gpt-4o')}", _chat_openrouter, _stream_openrouter))
+    if os.getenv("OPENAI_API_KEY"):
+        out.append((f"openai:{os.getenv('OPENAI_MODEL', 'gpt-4o-mini')}", _chat_openai, _stream_openai))
+    out.append((f"ollama:{os.getenv('OLLAMA_MODEL', 'llama3:latest')}", _chat_ollama, _stream_ollama))
+    return out
+
+
+async def chat(message: str) -> str:
+    providers = _providers()
+    cached = chat_cache.lookup(message, [ns for ns, _, _ in providers])
+    if cached is not None:
+        return cached
+    found = await provider_router.first_good([(ns, lambda fn=fn: fn(message)) for ns, fn, _ in providers])
+    if found:
+        ns, out = found
+        chat_cache.store(ns, message, out)
+        return out
+    return _chat_rule_based(message)
+
+
+async def chat_stream(message: str) -> AsyncIterator[Tuple[str, str]]:
+    """Yield (source, text) pieces of the answer as they arrive.
+
+    `source` is the provider namespace, 'cache' or 'rule-based'. A provider that
+    fails before its first token is skipped for the next one; once text has been
+    sent a failure just ends the stream, since it cannot be taken back. Health is
+    judged on time to first token; streams are not hedged.
+    """
+    providers = _providers()
+    cached = chat_cache.lookup(message, [ns for ns, _, _ in providers])
+    if cached is not None:
+        yield "cache", cached
+        return
+    for ns, _, stream in providers:
+        health = provider_router.health(ns)
+        if not health.allow():
+            continue
+        started = asyncio.get_running_loop().time()
+        tokens = stream(message)
         try:
-            out = fn(message)
+            first = await asyncio.wait_for(tokens.__anext__(), provider_router.TIMEOUT)
+        except BaseException as e:  # includes StopAsyncIteration (an empty answer)
+            # Also when the client goes away mid-wait: an unrecorded half-open probe would
+            # leave the breaker refusing this provider until restart (cf. first_good)
+            health.record(False, asyncio.get_running_loop().time() - started)
+            await tokens.aclose()
+            if isinstance(e, Exception):
+                continue
+            raise
+        health.record(True, asyncio.get_running_loop().time() - started)
+        parts = [first]
+        try:
+            yield ns, first
+            async for token in tokens:
+                parts.append(token)
+                yield ns, token
         except Exception:
-            out = None
-        if out:
-            return out
-    return _chat_rule_based(message)
+            health.record(False, asyncio.get_running_loop().time() - started)
+            return
+        finally:
+            await tokens.aclose()  # the client may stop reading mid-answer
+        chat_cache.store(ns, message, "".join(parts).strip())
+        return
+    for i, word in enumerate(_chat_rule_based(message).split(" ")):
+        yield "rule-based", word if i == 0 else " " + word
 
 
-def _chat_ollama(message: str) -> Optional[str]:
+async def _chat_ollama(message: str) -> Optional[str]:
     base = os.getenv("OLLAMA_BASE", "http://127.0.0.1:11434")
     model = os.getenv("OLLAMA_MODEL", "llama3:latest")
     try:
-        r = httpx.post(
+        r = await get_async_client("ollama").post(
             f"{base}/api/chat",
             json={
                 "model": model,
-                "messages": [
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": message},
-                ],
+                "messages": _messages(message),
                 "stream": False,
             },
-            timeout=30,
         )
         r.raise_for_status()
         data = r.json()
@@ -130,3 +220,22 @@ def _chat_ollama(message: str) -> Optional[str]:
         return content.strip() if isinstance(content, str) else None
     except Exception:
         return None
+
+
+async def _stream_ollama(message: str) -> AsyncIterator[str]:
+    # Ollama streams one JSON object per line, the last one with "done": true
+    base = os.getenv("OLLAMA_BASE", "http://127.0.0.1:11434")
+    model = os.getenv("OLLAMA_MODEL", "llama3:latest")
+    async with get_async_client("ollama").stream(
+        "POST", f"{base}/api/chat", json={"model": model, "messages": _messages(message), "stream": True}
+    ) as r:
+        r.raise_for_status()
+        async for line in r.aiter_lines():
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            content = ((data or {}).get("message") or {}).get("content")
+            if content:
+                yield content
+            if data.get("done"):
+                break
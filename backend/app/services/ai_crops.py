@@ -2,6 +2,10 @@ from typing import List, Dict, Optional
 import os
 import json
 
+from . import crop_cache, provider_router
+from .ai_chat import OPENROUTER_BASE
+from .http_clients import get_openai_client
+
 
 SYSTEM = (
     "You are KrishiYukti, an agriculture assistant. Return concise, visual-friendly JSON. "
@@ -11,21 +15,19 @@ SYSTEM = (
 )
 
 
-def _suggest_openrouter(region: str, season: str, soil: str, market_demand: bool, crop_type: Optional[str]) -> List[Dict]:
+async def _suggest_openrouter(region: str, season: str, soil: str, market_demand: bool, crop_type: Optional[str]) -> List[Dict]:
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
         return []
     try:
-        from openai import OpenAI  # lazy import
-
-        client = OpenAI(api_key=api_key, base_url="https://openrouter.ai/api/v1")
+        client = get_openai_client(OPENROUTER_BASE, api_key)
         user_msg = (
             f"Region: {region}\nSeason: {season}\nSoil: {soil}\n"
             f"Market demand priority: {'yes' if market_demand else 'no'}\n"
             f"Preferred crop type: {crop_type or 'any'}\n"
             "Respond with ONLY a JSON array as specified."
         )
-        resp = client.chat.completions.create(
+        resp = await client.chat.completions.create(
             model=os.getenv("OPENROUTER_MODEL", "openai/gpt-4o"),
             messages=[
                 {"role": "system", "content": SYSTEM},
@@ -89,10 +91,18 @@ def _fallback_cards(region: str, season: str, soil: str, market_demand: bool, cr
     return items
 
 
-def suggest(region: str, season: str, soil: str, market_demand: bool, crop_type: Optional[str] = None) -> List[Dict]:
-    # Try OpenRouter-backed suggestions
-    ai_items = _suggest_openrouter(region, season, soil, market_demand, crop_type)
-    if ai_items:
-        return ai_items
+async def suggest_llm(region: str, season: str, soil: str, market_demand: bool, crop_type: Optional[str] = None) -> List[Dict]:
+    """OpenRouter-backed suggestions, unless it is unconfigured or its breaker is open; [] otherwise."""
+    if not os.getenv("OPENROUTER_API_KEY"):
+        return []
+    found = await provider_router.first_good(
+        [("openrouter:crops", lambda: _suggest_openrouter(region, season, soil, market_demand, crop_type))]
+    )
+    return found[1] if found else []
+
+
+async def suggest(region: str, season: str, soil: str, market_demand: bool, crop_type: Optional[str] = None) -> List[Dict]:
+    # Cache, then the precomputed table, then the LLM (see crop_cache)
+    items = await crop_cache.read_through(region, season, soil, market_demand, crop_type, suggest_llm)
     # Fallback to simple cards
-    return _fallback_cards(region, season, soil, market_demand, crop_type)
+    return items or _fallback_cards(region, season, soil, market_demand, crop_type)
@@ -0,0 +1,231 @@
+"""Response cache in front of the chat providers.
+
+Two tiers, both namespaced per provider and model so switching either never
+serves answers from the old one:
+  - exact: the normalized message (case, punctuation, whitespace, filler words
+    and common Hindi/Hinglish farm terms folded to one spelling)
+  - similar (opt-in): MinHash LSH over character trigrams of the normalized
+    words finds candidates, which are accepted when their exact Jaccard
+    similarity reaches CHAT_CACHE_SIMILARITY (e.g. 0.75)
+
+Env: CHAT_CACHE_SIZE (default 5000 per tier; 0 disables), CHAT_CACHE_TTL seconds
+(default 86400), CHAT_CACHE_SIMILARITY (default 0 = exact tier only),
+CHAT_CACHE_MAX_CHARS (default 300; longer messages are not cached).
+Rule-based fallback answers are never cached.
+"""
+
+import os
+import random
+import re
+import time
+import unicodedata
+import zlib
+from collections import Counter, OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from . import metrics
+from .cache import TTLCache
+
+SIZE = int(os.getenv("CHAT_CACHE_SIZE", "5000"))
+TTL = float(os.getenv("CHAT_CACHE_TTL", "86400"))
+SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "0"))
+MAX_CHARS = int(os.getenv("CHAT_CACHE_MAX_CHARS", "300"))
+
+# \w alone splits Devanagari words at vowel signs, so include the whole block
+_TOKEN = re.compile(r"[\w\u0900-\u097f]+")
+
+_VARIANT_GROUPS = {
+    "wheat": "gehun gehu gehoon गेहूं गेहूँ गेहू",
+    "rice": "paddy dhan chawal धान चावल",
+    "fertilizer": "fertiliser fertilizers fertilisers khad khaad urvarak खाद उर्वरक",
+    "seed": "seeds beej बीज",
+    "soil": "mitti मिट्टी",
+    "irrigation": "sinchai सिंचाई",
+    "pesticide": "pesticides keetnashak कीटनाशक",
+    "crop": "crops fasal फसल",
+    "price": "prices bhav daam भाव दाम",
+    "weather": "mausam मौसम",
+    "farmer": "farmers kisan kisaan किसान",
+    "scheme": "schemes yojana yojna योजना",
+}
+_VARIANTS = {v: canon for canon, variants in _VARIANT_GROUPS.items() for v in variants.split()}
+_FILLER = {"a", "an", "the", "please", "pls", "plz", "kindly", "sir", "ji"}
+# Ignored by the similarity tier only; they change phrasing, not the question
+_STOPWORDS = {
+    "for", "of", "in", "on", "to", "is", "are", "what", "which", "how", "my", "i", "me", "do", "should", "can",
+    "के", "लिए", "में", "की", "का", "है", "क्या", "कौन", "सा",
+}
+
+# MinHash: 64 hash functions in 16 LSH bands of 4 rows; only the candidates sharing
+# the most bands get an exact Jaccard check
+_PERMS, _ROWS = 64, 4
+_MAX_CANDIDATES = 32
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_COEFFS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(_PERMS)]
+
+_hits = {"exact": 0, "similar": 0}
+_misses = 0
+
+
+def normalize(message: str) -> str:
+    text = unicodedata.normalize("NFKC", message or "").lower()
+    tokens = (_VARIANTS.get(t, t) for t in _TOKEN.findall(text))
+    return " ".join(t for t in tokens if t not in _FILLER)
+
+
+def _shingles(normalized: str) -> FrozenSet[str]:
+    # Per-word trigrams: word order does not matter and small typos only cost a few grams
+    out = set()
+    for word in normalized.split():
+        if word in _STOPWORDS:
+            continue
+        padded = f" {word} "
+        out.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(out)
+
+
+def _signature(shingles: Iterable[str]) -> Tuple[int, ...]:
+    hashes = [zlib.crc32(s.encode()) for s in shingles]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _COEFFS)
+
+
+def _bands(signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+    return [(i,) + signature[i : i + _ROWS] for i in range(0, _PERMS, _ROWS)]
+
+
+def _numbers(normalized: str) -> Tuple[str, ...]:
+    return tuple(sorted(t for t in normalized.split() if t.isdigit()))
+
+
+class SimilarityIndex:
+    """Bounded LRU of answers findable by approximate Jaccard similarity of their messages.
+
+    Messages only match when they contain the same numbers: "5 kg urea" and
+    "50 kg urea" are near-identical text but different questions.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, threshold: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        # key -> (expires, shingles, bucket keys, answer)
+        self._entries: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        self._buckets: Dict[tuple, Set[Tuple[str, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        _, _, buckets, _ = self._entries.pop(key)
+        for bucket_key in buckets:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[bucket_key]
+
+    def _bucket_keys(self, namespace: str, normalized: str, shingles: FrozenSet[str]) -> List[tuple]:
+        scope = (namespace, _numbers(normalized))
+        return [scope + band for band in _bands(_signature(shingles))]
+
+    def add(self, namespace: str, normalized: str, answer: str) -> None:
+        key = (namespace, normalized)
+        if key in self._entries:
+            self._drop(key)
+        shingles = _shingles(normalized)
+        if not shingles:
+            return
+        buckets = self._bucket_keys(namespace, normalized, shingles)
+        self._entries[key] = (time.monotonic() + self.ttl, shingles, buckets, answer)
+        for bucket_key in buckets:
+            self._buckets.setdefault(bucket_key, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+
+    def find(self, namespace: str, normalized: str) -> Optional[str]:
+        shingles = _shingles(normalized)
+        if not shingles:
+            return None
+        candidates: Counter = Counter()
+        for bucket_key in self._bucket_keys(namespace, normalized, shingles):
+            candidates.update(self._buckets.get(bucket_key, ()))
+        best, best_score = None, self.threshold
+        now = time.monotonic()
+        for key, _ in candidates.most_common(_MAX_CANDIDATES):
+            expires, other, _, answer = self._entries[key]
+            if expires <= now:
+                self._drop(key)
+                continue
+            score = len(shingles & other) / len(shingles | other)
+            if score >= best_score:
+                best, best_score = key, score
+        if best is None:
+            return None
+        self._entries.move_to_end(best)
+        return self._entries[best][3]
+
+
+_exact = TTLCache(maxsize=SIZE, ttl=TTL)
+_similar = SimilarityIndex(SIZE, TTL, SIMILARITY) if SIMILARITY > 0 else None
+metrics.track_cache("chat", lambda: {"hits": _hits["exact"] + _hits["similar"], "misses": _misses, "size": len(_exact)})
+
+
+def _cacheable(message: str) -> Optional[str]:
+    if SIZE <= 0 or not message or len(message) > MAX_CHARS:
+        return None
+    return normalize(message) or None
+
+
+def lookup(message: str, namespaces: List[str]) -> Optional[str]:
+    """Cached answer from the first namespace (provider priority order) that has one."""
+    global _misses
+    normalized = _cacheable(message)
+    if normalized is None:
+        return None
+    for ns in namespaces:
+        answer = _exact.get((ns, normalized))
+        if answer is not None:
+            _hits["exact"] += 1
+            return answer
+    if _similar is not None:
+        for ns in namespaces:
+            answer = _similar.find(ns, normalized)
+            if answer is not None:
+                _hits["similar"] += 1
+                # The next identical phrasing is then an exact hit
+                _exact.set((ns, normalized), answer)
+                return answer
+    _misses += 1
+    return None
+
+
+def store(namespace: str, message: str, answer: str) -> None:
+    normalized = _cacheable(message)
+    if normalized is None:
+        return
+    _exact.set((namespace, normalized), answer)
+    if _similar is not None:
+        _similar.add(namespace, normalized, answer)
+
+
+def clear() -> None:
+    global _similar, _misses
+    _exact.clear()
+    if _similar is not None:
+        _similar = SimilarityIndex(SIZE, TTL, SIMILARITY)
+    _hits.update(exact=0, similar=0)
+    _misses = 0
+
+
+def stats() -> dict:
+    lookups = _hits["exact"] + _hits["similar"] + _misses
+    rate = lambda n: round(n / lookups, 3) if lookups else 0.0
+    return {
+        "lookups": lookups,
+        "hits": dict(_hits),
+        "misses": _misses,
+        "hitRate": {"exact": rate(_hits["exact"]), "similar": rate(_hits["similar"]), "total": rate(lookups - _misses)},
+        "size": {"exact": len(_exact), "similar": len(_similar) if _similar is not None else 0},
+        "similarityThreshold": SIMILARITY,
+    }
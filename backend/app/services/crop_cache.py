@@ -0,0 +1,326 @@
+"""Cache and precomputed table in front of the crop-suggestion LLM.
+
+Requests are reduced to a key (region, season, soil, market demand, crop type):
+seasons and soils are folded onto canonical names (monsoon -> kharif, regur ->
+black, ...) and regions are lower-cased without a trailing 'district'. Lookups go
+  1. in-process LRU (CROP_CACHE_SIZE, default 5000; CROP_CACHE_TTL seconds, default 7 days)
+  2. the crop_recommendations table, filled by the precompute job below and by
+     every live LLM answer; rows older than CROP_TABLE_MAX_AGE days (default 90,
+     0 = never) count as missing
+  3. the LLM; concurrent misses for one key share a single call.
+Fallback cards are never stored.
+
+Fill the table for every region x season x soil x market demand (regions from a
+file, one per line), skipping rows that are already fresh. Run from backend/:
+
+    python -m app.services.crop_cache --regions districts.txt --concurrency 4 [--refresh]
+
+With CROP_CACHE_WARMUP=1 the app loads the table into the LRU at startup.
+"""
+
+import asyncio
+import os
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from .. import models
+from ..db import SessionLocal
+from . import metrics
+from .cache import SingleFlight, TTLCache
+
+SIZE = int(os.getenv("CROP_CACHE_SIZE", "5000"))
+TTL = float(os.getenv("CROP_CACHE_TTL", str(7 * 86400)))
+TABLE_MAX_AGE = float(os.getenv("CROP_TABLE_MAX_AGE", "90"))
+WARMUP = os.getenv("CROP_CACHE_WARMUP", "0").lower() in ("1", "true", "yes", "on")
+
+SEASONS = ("kharif", "rabi", "zaid")
+SOILS = ("alluvial", "black", "red", "laterite", "arid", "mountain", "saline", "peaty", "loamy", "clay", "sandy")
+
+_SEASON_ALIASES = {
+    "kharif": "monsoon rainy rain summer-monsoon खरीफ",
+    "rabi": "winter रबी",
+    "zaid": "zayed jayad summer जायद",
+}
+_SOIL_ALIASES = {
+    "alluvial": "alluvium doab जलोढ़",
+    "black": "regur cotton black-cotton काली",
+    "red": "red-yellow लाल",
+    "laterite": "lateritic",
+    "arid": "desert sandy-desert",
+    "mountain": "forest hill mountainous",
+    "saline": "alkaline saline-alkaline usar",
+    "peaty": "marshy peat",
+    "loamy": "loam sandy-loam clay-loam दोमट",
+    "clay": "clayey",
+    "sandy": "sand",
+}
+_SEASONS = {a: canon for canon, aliases in _SEASON_ALIASES.items() for a in (canon, *aliases.split())}
+_SOILS = {a: canon for canon, aliases in _SOIL_ALIASES.items() for a in (canon, *aliases.split())}
+_REGION_SUFFIX = re.compile(r"\s+(district|dist|zila|jila|जिला)$")
+_MAX_TRACKED_MISSES = 1000
+
+Key = Tuple[str, str, str, bool, str]
+Loader = Callable[[str, str, str, bool, Optional[str]], Awaitable[List[Dict]]]
+
+_memory = TTLCache(maxsize=SIZE, ttl=TTL)
+_flight = SingleFlight()
+_served: Counter = Counter()  # memory | table | llm | fallback
+_misses: Counter = Counter()  # keys that reached the LLM, to decide what to precompute
+_warm_task: Optional[asyncio.Task] = None
+metrics.track_cache("crop_memory", _memory.stats)
+metrics.track_cache("crop_table", lambda: {"hits": _served["table"], "misses": _served["llm"] + _served["fallback"]})
+
+
+def _words(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s\u0900-\u097f-]", " ", (text or "").lower()).split())
+
+
+def _canonical(text: str, aliases: Dict[str, str]) -> str:
+    words = _words(text)
+    # "Black cotton soil", "soil: red" -> black, red
+    stripped = " ".join(w for w in words.split() if w not in ("soil", "season", "मिट्टी"))
+    return aliases.get(stripped.replace(" ", "-")) or aliases.get(stripped) or stripped
+
+
+def key(region: str, season: str, soil: str, market_demand: bool, crop_type: Optional[str]) -> Key:
+    return (
+        _REGION_SUFFIX.sub("", _words(region)),
+        _canonical(season, _SEASONS),
+        _canonical(soil, _SOILS),
+        bool(market_demand),
+        _words(crop_type or ""),
+    )
+
+
+def _fresh_after() -> Optional[datetime]:
+    return datetime.utcnow() - timedelta(days=TABLE_MAX_AGE) if TABLE_MAX_AGE > 0 else None
+
+
+def _where(q, k: Key):
+    R = models.CropRecommendation
+    region, season, soil, market_demand, crop_type = k
+    return q.filter(
+        R.region == region, R.season == season, R.soil == soil, R.market_demand == market_demand, R.crop_type == crop_type
+    )
+
+
+def _load_row(k: Key) -> Optional[List[Dict]]:
+    R = models.CropRecommendation
+    with SessionLocal() as db:
+        q = _where(db.query(R.items), k)
+        fresh_after = _fresh_after()
+        if fresh_after is not None:
+            q = q.filter(R.updated_at >= fresh_after)
+        row = q.first()
+    return row.items if row else None
+
+
+def _save_row(k: Key, items: List[Dict], source: str) -> None:
+    R = models.CropRecommendation
+    region, season, soil, market_demand, crop_type = k
+    with SessionLocal() as db:
+        row = _where(db.query(R), k).first()
+        if row is None:
+            row = R(region=region, season=season, soil=soil, market_demand=market_demand, crop_type=crop_type)
+            db.add(row)
+        row.items, row.source, row.updated_at = items, source, datetime.utcnow()
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # another worker stored the same key first; theirs is as good
+
+
+def _track_miss(k: Key) -> None:
+    _misses[k] += 1
+    if len(_misses) > 2 * _MAX_TRACKED_MISSES:
+        kept = _misses.most_common(_MAX_TRACKED_MISSES)
+        _misses.clear()
+        _misses.update(dict(kept))
+
+
+async def read_through(
+    region: str, season: str, soil: str, market_demand: bool, crop_type: Optional[str], load: Loader
+) -> List[Dict]:
+    """Suggestions for the request from memory, the table or `load` (called with the key's fields).
+
+    Returns [] when `load` has nothing; the caller falls back to its own cards.
+    """
+    k = key(region, season, soil, market_demand, crop_type)
+    if SIZE > 0:
+        items = _memory.get(k)
+        if items is not None:
+            _served["memory"] += 1
+            return items
+
+    async def fetch() -> List[Dict]:
+        items = await asyncio.to_thread(_load_row, k)
+        if items:
+            _served["table"] += 1
+        else:
+            _track_miss(k)
+            region_, season_, soil_, market_demand_, crop_type_ = k
+            items = await load(region_, season_, soil_, market_demand_, crop_type_ or None)
+            if not items:
+                _served["fallback"] += 1
+                return []
+            _served["llm"] += 1
+            await asyncio.to_thread(_save_row, k, items, "live")
+        if SIZE > 0:
+            _memory.set(k, items)
+        return items
+
+    return await _flight.do(k, fetch)
+
+
+def _grid(regions: Iterable[str]) -> List[Key]:
+    out = []
+    for region in dict.fromkeys(_REGION_SUFFIX.sub("", _words(r)) for r in regions):
+        if region:
+            out.extend((region, season, soil, md, "") for season in SEASONS for soil in SOILS for md in (True, False))
+    return out
+
+
+def _existing(keys: List[Key]) -> set:
+    R = models.CropRecommendation
+    with SessionLocal() as db:
+        q = db.query(R.region, R.season, R.soil, R.market_demand, R.crop_type).filter(
+            R.region.in_({k[0] for k in keys}), R.crop_type == ""
+        )
+        fresh_after = _fresh_after()
+        if fresh_after is not None:
+            q = q.filter(R.updated_at >= fresh_after)
+        return {tuple(r) for r in q}
+
+
+async def precompute(regions: Iterable[str], load: Loader, concurrency: int = 4, refresh: bool = False) -> dict:
+    """Fill the table for every common combination in `regions`; returns counts by outcome."""
+    keys = _grid(regions)
+    todo = keys if refresh else [k for k in keys if k not in await asyncio.to_thread(_existing, keys)]
+    counts = Counter(skipped=len(keys) - len(todo))
+    gate = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(k: Key) -> None:
+        async with gate:
+            items = await load(k[0], k[1], k[2], k[3], None)
+        if items:
+            await asyncio.to_thread(_save_row, k, items, "precompute")
+            counts["stored"] += 1
+        else:
+            counts["failed"] += 1
+
+    await asyncio.gather(*(one(k) for k in todo))
+    return dict(counts)
+
+
+def _warm() -> int:
+    R = models.CropRecommendation
+    with SessionLocal() as db:
+        q = db.query(R.region, R.season, R.soil, R.market_demand, R.crop_type, R.items)
+        fresh_after = _fresh_after()
+        if fresh_after is not None:
+            q = q.filter(R.updated_at >= fresh_after)
+        rows = q.order_by(R.updated_at.desc()).limit(SIZE).all()
+    # Oldest first, so the most recent rows end up least likely to be evicted
+    for *k, items in reversed(rows):
+        _memory.set(tuple(k), items)
+    return len(rows)
+
+
+async def _warm_up() -> None:
+    try:
+        await asyncio.to_thread(_warm)
+    except Exception:
+        pass  # a cold cache still works; requests fall through to the table
+
+
+def start() -> None:
+    """Load the table into memory in the background when CROP_CACHE_WARMUP is set."""
+    global _warm_task
+    if WARMUP and SIZE > 0 and (_warm_task is None or _warm_task.done()):
+        _warm_task = asyncio.create_task(_warm_up())
+
+
+def stop() -> None:
+    if _warm_task is not None and not _warm_task.done():
+        _warm_task.cancel()
+
+
+def coverage() -> dict:
+    """How much of the region x season x soil x market-demand grid the table answers."""
+    R = models.CropRecommendation
+    with SessionLocal() as db:
+        by_source = dict(db.query(R.source, func.count()).group_by(R.source).all())
+        regions = db.query(func.count(func.distinct(R.region))).scalar() or 0
+        q = db.query(func.count()).select_from(R).filter(
+            R.crop_type == "", R.season.in_(SEASONS), R.soil.in_(SOILS)
+        )
+        fresh_after = _fresh_after()
+        if fresh_after is not None:
+            q = q.filter(R.updated_at >= fresh_after)
+        on_grid = q.scalar() or 0
+    grid = regions * len(SEASONS) * len(SOILS) * 2
+    return {
+        "rows": sum(by_source.values()),
+        "bySource": by_source,
+        "regions": regions,
+        "gridSize": grid,
+        "gridCovered": on_grid,
+        "coverage": round(on_grid / grid, 3) if grid else 0.0,
+    }
+
+
+def stats() -> dict:
+    served = sum(_served.values())
+    rate = lambda n: round(n / served, 3) if served else 0.0
+    return {
+        "served": {tier: _served[tier] for tier in ("memory", "table", "llm", "fallback")},
+        "hitRate": {
+            "memory": rate(_served["memory"]),
+            "table": rate(_served["table"]),
+            "total": rate(_served["memory"] + _served["table"]),
+        },
+        "coalesced": _flight.coalesced,
+        "memory": _memory.stats(),
+        "table": coverage(),
+        "topMisses": [
+            {"region": k[0], "season": k[1], "soil": k[2], "marketDemand": k[3], "cropType": k[4] or None, "count": n}
+            for k, n in _misses.most_common(20)
+        ],
+    }
+
+
+def main() -> None:
+    import argparse
+
+    from ..db import Base, engine
+    from . import ai_crops, http_clients
+
+    ap = argparse.ArgumentParser(description="Precompute crop suggestions for common region/season/soil combinations.")
+    ap.add_argument("--regions", required=True, help="file with one region (district) per line")
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--refresh", action="store_true", help="recompute rows that are already fresh")
+    args = ap.parse_args()
+    if not os.getenv("OPENROUTER_API_KEY"):
+        raise SystemExit("OPENROUTER_API_KEY is not set")
+    with open(args.regions, encoding="utf-8") as f:
+        regions = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    Base.metadata.create_all(bind=engine, tables=[models.CropRecommendation.__table__])
+
+    async def run() -> dict:
+        try:
+            return await precompute(regions, ai_crops.suggest_llm, args.concurrency, args.refresh)
+        finally:
+            await http_clients.aclose_all()
+
+    counts = asyncio.run(run())
+    print(counts)
+    print(coverage())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
+import asyncio
+import json
 import os
 import time
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Awaitable, Callable, Optional, Tuple
 
-import httpx
+from . import verify_cache
+from .cache import SingleFlight
+from .http_clients import get_async_client
 
 BASE_URL = os.getenv("ESHRAM_BASE_URL", "https://betaapiregisterapi.eshram.gov.in/externalscheme-api-service")
 AUTH_PATH = os.getenv("ESHRAM_AUTH_PATH", "/api/v1/generateAuthToken")
@@ -13,8 +17,7 @@ CLIENT_SECRET = os.getenv("ESHRAM_CLIENT_SECRET")
 DOB_INPUT_FORMAT = os.getenv("ESHRAM_DOB_INPUT_FORMAT", "%Y-%m-%d")  # expected from frontend
 DOB_API_FORMAT = os.getenv("ESHRAM_DOB_API_FORMAT", "%d-%m-%Y")       # API expected format
 TOKEN_TTL_DEFAULT = int(os.getenv("ESHRAM_TOKEN_TTL", "1500"))         # 25 minutes
-
-_TOKEN_CACHE = {"token": None, "exp": 0.0}
+TOKEN_REFRESH_AT = float(os.getenv("ESHRAM_TOKEN_REFRESH_AT", "0.8"))  # fraction of the TTL
 
 
 def _now() -> float:
@@ -52,14 +55,65 @@ def _parse_token_json(data: dict) -> Tuple[Optional[str], int]:
     return token, ttl
 
 
-def _get_token() -> str:
-    if _TOKEN_CACHE["token"] and _now() < _TOKEN_CACHE["exp"]:
-        return _TOKEN_CACHE["token"]
+class TokenManager:
+    """Bearer token shared by all callers, fetched once and renewed before it expires.
+
+    Concurrent callers that find no valid token wait on a single fetch. Once
+    TOKEN_REFRESH_AT of the token's lifetime has passed, the next caller starts
+    a refresh in the background and keeps using the current token, so under
+    steady traffic nobody waits for the auth call. A failed background refresh
+    is retried after a short pause while the old token is still valid.
+
+    State is swapped as one tuple, so readers on any thread see a consistent
+    token; the single-flight coalescing is per event loop.
+    """
+
+    RETRY_AFTER = 30.0
+
+    def __init__(self, fetch: Callable[[], Awaitable[Tuple[Optional[str], int]]]):
+        self._fetch = fetch
+        self._state: Tuple[Optional[str], float, float] = (None, 0.0, 0.0)  # token, expires_at, refresh_at
+        self._flight = SingleFlight()
+        self._background: Optional[asyncio.Task] = None
+        self.fetches = 0
+
+    async def _refresh(self) -> str:
+        self.fetches += 1
+        token, ttl = await self._fetch()
+        if not token:
+            raise RuntimeError("e-Shram token not found in response")
+        now = _now()
+        # Expire a little early so a token is never sent right as it lapses
+        self._state = (token, now + max(60, ttl - 30), now + max(30, ttl * TOKEN_REFRESH_AT))
+        return token
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self._flight.do("token", self._refresh)
+        except Exception:
+            token, expires_at, _ = self._state
+            self._state = (token, expires_at, _now() + self.RETRY_AFTER)
+
+    async def get(self) -> str:
+        token, expires_at, refresh_at = self._state
+        now = _now()
+        if token and now < expires_at:
+            if now >= refresh_at and (self._background is None or self._background.done()):
+                self._background = asyncio.ensure_future(self._refresh_in_background())
+            return token
+        return await self._flight.do("token", self._refresh)
+
+    def invalidate(self, token: str) -> None:
+        """Drop `token` after the API rejected it (no-op if it was already replaced)."""
+        if self._state[0] == token:
+            self._state = (None, 0.0, 0.0)
+
+
+async def _fetch_token() -> Tuple[Optional[str], int]:
     # Build payload
     auth_payload_str = os.getenv("ESHRAM_AUTH_PAYLOAD")
     if auth_payload_str:
         try:
-            import json
             payload = json.loads(auth_payload_str)
         except Exception:
             payload = None
@@ -68,16 +122,12 @@ def _get_token() -> str:
     if not payload or not any(payload.values()):
         raise RuntimeError("ESHRAM credentials not configured. Set ESHRAM_CLIENT_ID/ESHRAM_CLIENT_SECRET or ESHRAM_AUTH_PAYLOAD in .env")
     url = _full_url(AUTH_PATH)
-    with httpx.Client(timeout=20) as client:
-        r = client.post(url, json=payload)
-        r.raise_for_status()
-        data = r.json()
-        token, ttl = _parse_token_json(data)
-        if not token:
-            raise RuntimeError("e-Shram token not found in response")
-        _TOKEN_CACHE["token"] = token
-        _TOKEN_CACHE["exp"] = _now() + max(60, ttl - 30)
-        return token
+    r = await get_async_client("eshram").post(url, json=payload)
+    r.raise_for_status()
+    return _parse_token_json(r.json())
+
+
+tokens = TokenManager(_fetch_token)
 
 
 def _format_dob(dob_input: str) -> str:
@@ -86,19 +136,34 @@ def _format_dob(dob_input: str) -> str:
     return dt.strftime(DOB_API_FORMAT)
 
 
-def validate_uan(uan: str, dob: str) -> dict:
-    token = _get_token()
+async def validate_uan(uan: str, dob: str) -> dict:
+    # Retries of a settled validation are answered from the encrypted verify cache
+    cache_key = verify_cache.key("eshram", uan, dob)
+    hit = await verify_cache.aget(cache_key)
+    if hit is not None:
+        return json.loads(hit[1])
+    result = await _validate(uan, dob)
+    await verify_cache.aput(cache_key, {"status": result["status"]}, json.dumps(result).encode())
+    return result
+
+
+async def _validate(uan: str, dob: str) -> dict:
     url = _full_url(VALIDATE_PATH)
     dob_fmt = _format_dob(dob)
     payload = {"uan": uan, "dob": dob_fmt}
-    headers = {"Authorization": f"Bearer {token}"}
-    with httpx.Client(timeout=20) as client:
-        r = client.post(url, json=payload, headers=headers)
-        # Surface 4xx as clean error messages
-        if r.status_code >= 400:
-            try:
-                return {"ok": False, "status": r.status_code, "error": r.json()}
-            except Exception:
-                return {"ok": False, "status": r.status_code, "error": r.text}
-        data = r.json()
-        return {"ok": True, "status": r.status_code, "data": data}
+    for attempt in range(2):
+        token = await tokens.get()
+        headers = {"Authorization": f"Bearer {token}"}
+        r = await get_async_client("eshram").post(url, json=payload, headers=headers)
+        if r.status_code != 401 or attempt:
+            break
+        # Revoked or expired early: fetch a new token and retry once
+        tokens.invalidate(token)
+    # Surface 4xx as clean error messages
+    if r.status_code >= 400:
+        try:
+            return {"ok": False, "status": r.status_code, "error": r.json()}
+        except Exception:
+            return {"ok": False, "status": r.status_code, "error": r.text}
+    data = r.json()
+    return {"ok": True, "status": r.status_code, "data": data}
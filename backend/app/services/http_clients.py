@@ -0,0 +1,172 @@
+"""Shared outbound HTTP clients, one pooled client per integration.
+
+Clients are created lazily on first use and closed by the app lifespan, so
+repeat calls to OpenWeather, myscheme, e-Shram, RGI and Ollama reuse
+keep-alive connections instead of paying a TCP+TLS handshake every time.
+OpenAI SDK clients (OpenAI, OpenRouter) are shared the same way, one per
+base URL and API key, each on a pooled httpx client configured like the rest
+under the name OPENAI.
+Every call is timed into services.metrics unless METRICS_ENABLED=0.
+
+Env (all optional, NAME is the upper-cased integration, e.g. WEATHER):
+  - HTTP_<NAME>_TIMEOUT          request timeout in seconds
+  - HTTP_<NAME>_MAX_CONNECTIONS  connection cap for that upstream host
+  - HTTP_MAX_KEEPALIVE           idle connections kept per client (default 10)
+  - HTTP_KEEPALIVE_EXPIRY        idle connection lifetime in seconds (default 60)
+  - HTTP_HTTP2                   set to 0 to disable HTTP/2 (used only if `h2` is installed)
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from . import metrics
+
+# Default timeouts (seconds) match what each integration used before pooling
+TIMEOUTS = {
+    "weather": 10,
+    "schemes": 20,
+    "eshram": 20,
+    "rgi": 30,
+    "ollama": 30,
+}
+DEFAULT_TIMEOUT = 20
+DEFAULT_MAX_CONNECTIONS = 20
+
+_async_clients: Dict[str, httpx.AsyncClient] = {}
+# (base_url, api_key, sync) -> openai.OpenAI / openai.AsyncOpenAI
+_openai_clients: Dict[Tuple[str, str, bool], Any] = {}
+_lock = threading.Lock()
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+HTTP2 = os.getenv("HTTP_HTTP2", "1") != "0" and _h2_available()
+
+
+def _timeout(name: str) -> httpx.Timeout:
+    secs = float(os.getenv(f"HTTP_{name.upper()}_TIMEOUT", TIMEOUTS.get(name, DEFAULT_TIMEOUT)))
+    # Connecting should fail fast even when the read budget is long (LLMs, RGI)
+    return httpx.Timeout(secs, connect=min(secs, 5.0))
+
+
+def _limits(name: str) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv(f"HTTP_{name.upper()}_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60")),
+    )
+
+
+class _TimedTransport(httpx.AsyncBaseTransport):
+    """Default transport that records every call (until response headers) in metrics."""
+
+    def __init__(self, integration: str, **kwargs):
+        self._integration = integration
+        self._inner = httpx.AsyncHTTPTransport(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await self._inner.handle_async_request(request)
+        except Exception as e:
+            metrics.upstream_requests.observe((self._integration, type(e).__name__), time.perf_counter() - start)
+            raise
+        metrics.upstream_requests.observe((self._integration, str(response.status_code)), time.perf_counter() - start)
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class _TimedSyncTransport(httpx.BaseTransport):
+    def __init__(self, integration: str, **kwargs):
+        self._integration = integration
+        self._inner = httpx.HTTPTransport(**kwargs)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = self._inner.handle_request(request)
+        except Exception as e:
+            metrics.upstream_requests.observe((self._integration, type(e).__name__), time.perf_counter() - start)
+            raise
+        metrics.upstream_requests.observe((self._integration, str(response.status_code)), time.perf_counter() - start)
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+def _new_client(name: str, integration: str, sync: bool = False):
+    pool = {"limits": _limits(name), "http2": HTTP2}
+    if metrics.ENABLED:
+        transport = (_TimedSyncTransport if sync else _TimedTransport)(integration, **pool)
+        pool = {"transport": transport}
+    return (httpx.Client if sync else httpx.AsyncClient)(timeout=_timeout(name), **pool)
+
+
+def get_async_client(name: str) -> httpx.AsyncClient:
+    """Return the shared async client for an integration (created on first use)."""
+    client = _async_clients.get(name)
+    if client is None or client.is_closed:
+        with _lock:
+            client = _async_clients.get(name)
+            if client is None or client.is_closed:
+                client = _new_client(name, name)
+                _async_clients[name] = client
+    return client
+
+
+def get_openai_client(base_url: Optional[str], api_key: str, *, sync: bool = False):
+    """Return the shared OpenAI SDK client for base_url/api_key (async unless sync=True).
+
+    base_url None means the SDK default (api.openai.com, or OPENAI_BASE_URL).
+    """
+    key = (base_url or "", api_key, sync)
+    client = _openai_clients.get(key)
+    if client is None:
+        with _lock:
+            client = _openai_clients.get(key)
+            if client is None:
+                import openai  # optional dependency, imported on first use
+
+                integration = "openrouter" if "openrouter" in (base_url or "") else "openai"
+                http_client = _new_client("openai", integration, sync)
+                if sync:
+                    client = openai.OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+                else:
+                    client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+                _openai_clients[key] = client
+    return client
+
+
+def open_all() -> None:
+    """Create the async client for every known integration; called from the app lifespan on startup."""
+    for name in TIMEOUTS:
+        get_async_client(name)
+
+
+async def aclose_all() -> None:
+    """Close every pooled client; called from the app lifespan on shutdown."""
+    with _lock:
+        clients = list(_async_clients.values())
+        _async_clients.clear()
+        sdk_clients = list(_openai_clients.items())
+        _openai_clients.clear()
+    for client in clients:
+        await client.aclose()
+    for (_, _, sync), client in sdk_clients:
+        if sync:
+            client.close()
+        else:
+            await client.close()
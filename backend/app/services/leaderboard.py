@@ -0,0 +1,269 @@
+"""In-memory points leaderboard with O(log n) rank lookups.
+
+Profiles are ordered by (points desc, device_id) in a `RankIndex`. It is loaded
+from the DB on first use, kept current by the handlers that change points
+(`update()` after their commit), and reloaded every LEADERBOARD_REFRESH_INTERVAL
+seconds (default 600; 0 = never) to pick up writes made by other workers.
+
+Ranks are competition-style: tied profiles share a rank and the next rank skips.
+"""
+
+import asyncio
+import os
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from .. import models
+from ..db import SessionLocal
+
+REFRESH_INTERVAL = float(os.getenv("LEADERBOARD_REFRESH_INTERVAL", "600"))
+
+Key = Tuple[int, str]  # (-points, device_id)
+
+
+class RankIndex:
+    """Sorted set of keys supporting insert, remove, position-of and key-at-position in O(log n).
+
+    Keys are kept in sorted sublists of at most 2 * LOAD items, so an insert is a
+    bisect plus a short memmove. A Fenwick tree over the sublist lengths turns
+    positions into (sublist, offset) pairs and back in O(log n).
+    """
+
+    LOAD = 512
+
+    def __init__(self, keys: Iterable[Key] = ()):
+        keys = sorted(keys)
+        self._lists: List[List[Key]] = [keys[i : i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self._maxes: List[Key] = [lst[-1] for lst in self._lists]
+        self._len = len(keys)
+        self._build_tree()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _build_tree(self) -> None:
+        # 1-based Fenwick tree; tree[i] covers the sublists (i - lowbit(i), i]
+        tree = [0] + [len(lst) for lst in self._lists]
+        for i in range(1, len(tree)):
+            j = i + (i & -i)
+            if j < len(tree):
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, idx: int, delta: int) -> None:
+        i = idx + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, idx: int) -> int:
+        """Number of keys in sublists [0, idx)."""
+        total = 0
+        while idx > 0:
+            total += self._tree[idx]
+            idx -= idx & -idx
+        return total
+
+    def _locate(self, pos: int) -> Tuple[int, int]:
+        """(sublist index, offset) of the key at position `pos`."""
+        idx = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = idx + step
+            if nxt < len(self._tree) and self._tree[nxt] <= pos:
+                idx = nxt
+                pos -= self._tree[nxt]
+            step >>= 1
+        return idx, pos
+
+    def add(self, key: Key) -> None:
+        if not self._lists:
+            self._lists.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._build_tree()
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+            self._lists[i].append(key)
+            self._maxes[i] = key
+        else:
+            insort(self._lists[i], key)
+        self._len += 1
+        lst = self._lists[i]
+        if len(lst) > 2 * self.LOAD:
+            self._lists[i : i + 1] = [lst[: self.LOAD], lst[self.LOAD :]]
+            self._maxes[i : i + 1] = [lst[self.LOAD - 1], lst[-1]]
+            self._build_tree()
+        else:
+            self._tree_add(i, 1)
+
+    def remove(self, key: Key) -> None:
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            raise KeyError(key)
+        lst = self._lists[i]
+        j = bisect_left(lst, key)
+        if lst[j] != key:
+            raise KeyError(key)
+        del lst[j]
+        self._len -= 1
+        if lst:
+            self._maxes[i] = lst[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._lists[i], self._maxes[i]
+            self._build_tree()
+
+    def index(self, key: Key) -> int:
+        """Number of keys ordered before `key` (its position if present)."""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return self._len
+        return self._prefix(i) + bisect_left(self._lists[i], key)
+
+    def __getitem__(self, pos: int) -> Key:
+        if not 0 <= pos < self._len:
+            raise IndexError(pos)
+        idx, offset = self._locate(pos)
+        return self._lists[idx][offset]
+
+    def range(self, start: int, stop: int) -> Iterator[Key]:
+        """Keys at positions [start, stop), walking sublists after one O(log n) seek."""
+        start, stop = max(0, start), min(stop, self._len)
+        if start >= stop:
+            return
+        idx, offset = self._locate(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = self._lists[idx][offset : offset + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            idx, offset = idx + 1, 0
+
+
+_lock = threading.Lock()
+_load_lock = threading.Lock()
+_index = RankIndex()
+_points: Dict[str, int] = {}
+_pending: Optional[Dict[str, int]] = None  # updates that raced a reload, replayed on top of it
+_loaded = False
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def _set(device_id: str, points: int) -> None:
+    old = _points.get(device_id)
+    if old == points:
+        return
+    if old is not None:
+        _index.remove((-old, device_id))
+    _index.add((-points, device_id))
+    _points[device_id] = points
+
+
+def update(device_id: str, points: int) -> None:
+    """Record a profile's new balance; call after the change is committed."""
+    with _lock:
+        if _pending is not None:
+            _pending[device_id] = points
+        _set(device_id, points)
+
+
+def _reload() -> int:
+    global _index, _points, _pending, _loaded
+    with _lock:
+        _pending = {}
+    try:
+        with SessionLocal() as db:
+            rows = db.execute(select(models.Profile.device_id, models.Profile.points)).all()
+        points = {device_id: p or 0 for device_id, p in rows}
+        index = RankIndex((-p, device_id) for device_id, p in points.items())
+        with _lock:
+            _index, _points = index, points
+            for device_id, p in _pending.items():
+                _set(device_id, p)
+            _loaded = True
+            return len(_index)
+    finally:
+        with _lock:
+            _pending = None
+
+
+def reload() -> int:
+    """Rebuild the index from the profiles table; returns the number of ranked profiles."""
+    with _load_lock:
+        return _reload()
+
+
+def _ensure_loaded() -> None:
+    if not _loaded:
+        with _load_lock:
+            if not _loaded:
+                _reload()
+
+
+def _entries(start: int, stop: int) -> List[Tuple[int, str, int]]:
+    """(rank, device_id, points) for positions [start, stop); caller holds _lock."""
+    out = []
+    prev_score, rank = None, 0
+    for pos, (score, device_id) in enumerate(_index.range(start, stop), start):
+        if score != prev_score:
+            # Ties share the rank of the first profile with that score
+            rank = _index.index((score, "")) + 1 if prev_score is None else pos + 1
+            prev_score = score
+        out.append((rank, device_id, -score))
+    return out
+
+
+def top(limit: int) -> List[Tuple[int, str, int]]:
+    _ensure_loaded()
+    with _lock:
+        return _entries(0, limit)
+
+
+def rank(device_id: str) -> Optional[Tuple[int, int, int]]:
+    """(rank, points, total profiles), or None if the device has no profile."""
+    _ensure_loaded()
+    with _lock:
+        points = _points.get(device_id)
+        if points is None:
+            return None
+        return _index.index((-points, "")) + 1, points, len(_index)
+
+
+def around(device_id: str, window: int) -> Optional[List[Tuple[int, str, int]]]:
+    """Up to `window` profiles either side of `device_id`, including it."""
+    _ensure_loaded()
+    with _lock:
+        points = _points.get(device_id)
+        if points is None:
+            return None
+        pos = _index.index((-points, device_id))
+        return _entries(max(0, pos - window), pos + window + 1)
+
+
+async def _refresh_loop() -> None:
+    while True:
+        try:
+            await asyncio.to_thread(reload)
+        except Exception:
+            pass  # keep serving the current index; retry next interval
+        if REFRESH_INTERVAL <= 0:
+            return
+        await asyncio.sleep(REFRESH_INTERVAL)
+
+
+def start() -> None:
+    """Load the leaderboard in the background at startup and keep refreshing it."""
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_loop())
+
+
+def stop() -> None:
+    if _refresh_task is not None and not _refresh_task.done():
+        _refresh_task.cancel()
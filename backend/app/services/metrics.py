@@ -0,0 +1,236 @@
+"""Process-local metrics, exported in Prometheus text format at /api/metrics.
+
+  - http_request_duration_seconds{method,route,status}: every request, by route
+    template (so /profile?deviceId=... is one series); http_requests_in_flight
+  - upstream_request_duration_seconds{integration,outcome}: every call through
+    the pooled clients in http_clients (weather, schemes, eshram, rgi, ollama,
+    openai, openrouter) up to response headers; outcome is the status code or
+    the exception name
+  - db_query_duration_seconds{op,outcome} (outcome 'ok' or the exception name)
+    and db_transaction_duration_seconds{outcome}
+    (time from BEGIN to COMMIT/ROLLBACK, where SQLite write locks show up)
+  - password_duration_seconds{op}: bcrypt including pool queueing;
+    password_rejected_total when the queue is full
+  - cache_hits_total / cache_misses_total / cache_entries{cache}: read at scrape
+    time from every cache registered with track_cache()
+
+Recording is a bisect plus two increments under a lock. Values are per worker
+process; scrape each worker. Env: METRICS_ENABLED (default 1)
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+ENABLED = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true", "yes", "on")
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics: List["_Metric"] = []
+_caches: Dict[str, Callable[[], dict]] = {}
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def render(self, out: List[str]) -> None:
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} {self.kind}")
+        with self._lock:
+            series = {k: (list(v) if isinstance(v, list) else v) for k, v in self._series.items()}
+        self._render(out, series)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._series: Dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def _render(self, out: List[str], series: dict) -> None:
+        for labels, value in series.items():
+            out.append(f"{self.name}{_labels(self.label_names, labels)} {_num(value)}")
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        self._series: Dict[tuple, list] = {}  # labels -> per-bucket counts (+Inf last), then sum
+
+    def observe(self, labels: tuple, seconds: float) -> None:
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += seconds
+
+    def _render(self, out: List[str], series: dict) -> None:
+        for labels, s in series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), s):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                out.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            out.append(f"{self.name}_sum{_labels(self.label_names, labels)} {s[-1]!r}")
+            out.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+
+
+http_requests = Histogram("http_request_duration_seconds", "HTTP requests by route template.", ("method", "route", "status"))
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests being served.")
+upstream_requests = Histogram(
+    "upstream_request_duration_seconds", "Outbound calls until response headers.", ("integration", "outcome")
+)
+db_queries = Histogram("db_query_duration_seconds", "SQL statements by kind.", ("op", "outcome"))
+db_transactions = Histogram("db_transaction_duration_seconds", "ORM transactions from BEGIN to the end.", ("outcome",))
+password_ops = Histogram("password_duration_seconds", "bcrypt hash/verify including queueing.", ("op",))
+password_rejected = Counter("password_rejected_total", "Password jobs refused with 503 because the queue was full.")
+
+
+def track_cache(name: str, stats: Callable[[], dict]) -> None:
+    """Export a cache's counters; `stats()` returns 'hits', 'misses' and optionally 'size'."""
+    _caches[name] = stats
+
+
+def _render_caches(out: List[str]) -> None:
+    rows = []
+    for name, stats in _caches.items():
+        try:
+            rows.append((name, stats()))
+        except Exception:
+            continue  # e.g. a cache file that cannot be opened; skip rather than fail the scrape
+    for metric, field, kind, help in (
+        ("cache_hits_total", "hits", "counter", "Cache lookups answered from the cache."),
+        ("cache_misses_total", "misses", "counter", "Cache lookups that fell through."),
+        ("cache_entries", "size", "gauge", "Entries currently cached."),
+    ):
+        out.append(f"# HELP {metric} {help}")
+        out.append(f"# TYPE {metric} {kind}")
+        for name, s in rows:
+            if s.get(field) is not None:
+                out.append(f'{metric}{{cache="{_escape(name)}"}} {_num(s[field])}')
+
+
+def render() -> str:
+    out: List[str] = []
+    for metric in _metrics:
+        metric.render(out)
+    _render_caches(out)
+    return "\n".join(out) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request until its response is fully sent."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            http_in_flight.dec()
+            # The router stores the matched route in the shared scope; unmatched paths share one
+            # series so scanners cannot blow up the label set
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            http_requests.observe((scope["method"], route, str(status)), time.perf_counter() - start)
+
+
+_DB_OPS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def _observe(statement: str, context, outcome: str) -> None:
+    started = getattr(context, "_metrics_started", None)
+    if started is None or not statement:
+        return  # failed before the cursor ran, e.g. while connecting
+    context._metrics_started = None
+    op = statement.lstrip()[:6].upper()
+    db_queries.observe((op if op in _DB_OPS else "OTHER", outcome), time.perf_counter() - started)
+
+
+def instrument_db(engine, session_factory) -> None:
+    """Time every statement on `engine` and every transaction of `session_factory` sessions."""
+    from sqlalchemy import event
+
+    # The start time lives on the statement's execution context, so a statement that raises
+    # cannot leave anything behind on the (pooled) connection
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _observe(statement, context, "ok")
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        _observe(exception_context.statement, exception_context.execution_context,
+                 type(exception_context.original_exception).__name__)
+
+    @event.listens_for(session_factory, "after_begin")
+    def _begin(session, transaction, connection):
+        session.info.setdefault("metrics_began", time.perf_counter())
+
+    def _end(outcome: str):
+        def end(session, *args):
+            began = session.info.pop("metrics_began", None)
+            if began is not None:
+                db_transactions.observe((outcome,), time.perf_counter() - began)
+
+        return end
+
+    event.listen(session_factory, "after_commit", _end("commit"))
+    event.listen(session_factory, "after_rollback", _end("rollback"))
@@ -0,0 +1,102 @@
+"""Password hashing on a dedicated process pool with admission control.
+
+bcrypt burns ~250 ms of CPU per call. Run inline it holds a threadpool slot and
+competes with every other request on the worker, so hashes and verifies are
+sent to a small ProcessPoolExecutor instead. Once PASSWORD_QUEUE_DEPTH jobs are
+queued or running, further calls fail fast with 503 + Retry-After.
+
+Env:
+  - PASSWORD_WORKERS (default: CPU count; 0 = run in the threadpool, e.g. for dev)
+  - PASSWORD_QUEUE_DEPTH (default 4 x workers)
+  - PASSWORD_RETRY_AFTER seconds (default 1)
+  - BCRYPT_ROUNDS (default 12); raising it re-hashes users on their next login
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from . import metrics
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+WORKERS = int(os.getenv("PASSWORD_WORKERS", str(os.cpu_count() or 1)))
+QUEUE_DEPTH = int(os.getenv("PASSWORD_QUEUE_DEPTH", str(4 * max(1, WORKERS))))
+RETRY_AFTER = os.getenv("PASSWORD_RETRY_AFTER", "1")
+
+_pwd_context = None
+_executor: Optional[Executor] = None
+_pending = 0
+
+
+def _context():
+    # passlib is imported on the first hash, not when the app or a pool worker starts
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+    return _pwd_context
+
+
+# Module-level so worker processes can unpickle them
+def _hash(password: str) -> str:
+    return _context().hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return _context().verify_and_update(password, hashed)
+
+
+def start() -> None:
+    """Spawn the worker processes; called from the app lifespan."""
+    global _executor
+    if _executor is None and WORKERS > 0:
+        # spawn, not fork: the server process already runs threads and an event loop
+        _executor = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run(fn, *args):
+    global _pending
+    if _pending >= QUEUE_DEPTH:
+        metrics.password_rejected.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry",
+            headers={"Retry-After": RETRY_AFTER},
+        )
+    _pending += 1
+    started = time.perf_counter()
+    try:
+        if WORKERS <= 0:
+            return await run_in_threadpool(fn, *args)
+        start()
+        return await asyncio.wrap_future(_executor.submit(fn, *args))
+    finally:
+        _pending -= 1
+        metrics.password_ops.observe(("hash" if fn is _hash else "verify",), time.perf_counter() - started)
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Returns (valid, new_hash); new_hash is set when the stored hash uses outdated settings."""
+    return await _run(_verify_and_update, password, hashed)
+
+
+def stats() -> dict:
+    return {"workers": WORKERS, "queueDepth": QUEUE_DEPTH, "pending": _pending}
@@ -0,0 +1,112 @@
+"""Atomic changes to Profile.points, each recorded in the append-only points ledger."""
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import exists, func, insert, literal, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from .. import models
+
+# Everything ProfileOut needs, so callers never re-SELECT the profile
+PROFILE_COLUMNS = (
+    models.Profile.device_id,
+    models.Profile.user_name,
+    models.Profile.points,
+    models.Profile.badges,
+    models.Profile.streak_days,
+    models.Profile.last_claim_iso,
+)
+
+
+def change_points(
+    db: Session,
+    device_id: str,
+    delta: int,
+    kind: str,
+    reason: Optional[str] = None,
+    min_balance: Optional[int] = None,
+) -> Optional[Row]:
+    """Apply `delta` with a single UPDATE ... RETURNING and append a ledger entry.
+
+    With `min_balance` the UPDATE only matches while points >= min_balance, so the
+    balance check and the deduction cannot interleave with another request.
+    Returns the updated profile row, or None when nothing matched. The caller commits.
+    """
+    row = _update_points(db, device_id, delta, min_balance)
+    if row is None:
+        return None
+    db.execute(
+        insert(models.PointsLedger).values(device_id=device_id, delta=delta, balance=row.points, kind=kind, reason=reason)
+    )
+    return row
+
+
+def apply_point_events(db: Session, device_id: str, entries: List[Tuple[int, str, Optional[str]]]) -> Optional[Row]:
+    """Apply several (delta, kind, reason) entries for one device as a single UPDATE.
+
+    The ledger still gets one row per entry, with running balances reconstructed
+    from the final balance. Returns the updated profile row, or None if the device
+    has no profile. The caller commits.
+    """
+    total = sum(delta for delta, _, _ in entries)
+    row = _update_points(db, device_id, total, None)
+    if row is None:
+        return None
+    balance = row.points - total
+    ledger = []
+    for delta, kind, reason in entries:
+        balance += delta
+        ledger.append({"device_id": device_id, "delta": delta, "balance": balance, "kind": kind, "reason": reason})
+    if ledger:
+        db.execute(insert(models.PointsLedger), ledger)
+    return row
+
+
+def _update_points(db: Session, device_id: str, delta: int, min_balance: Optional[int]) -> Optional[Row]:
+    stmt = update(models.Profile).where(models.Profile.device_id == device_id)
+    if min_balance is not None:
+        stmt = stmt.where(models.Profile.points >= min_balance)
+    stmt = stmt.values(points=models.Profile.points + delta).returning(*PROFILE_COLUMNS)
+    return db.execute(stmt, execution_options={"synchronize_session": False}).first()
+
+
+def backfill_opening_balances(db: Session) -> int:
+    """Add an 'opening' ledger entry for each profile with points but no ledger entries at all.
+
+    For profiles created before the ledger existed; the entry carries their
+    points, dated at the profile's creation. Profiles that already have entries
+    are never touched: if those do not add up, that is drift for a human to look
+    at (see ledger_mismatches), not something to paper over. Idempotent. Returns
+    the number of entries added. The caller commits.
+    """
+    L, P = models.PointsLedger, models.Profile
+    rows = select(
+        P.device_id, P.points, P.points, literal("opening"), literal("balance before the points ledger"),
+        func.coalesce(P.created_at, datetime.utcnow()),
+    ).where(P.points != 0, ~exists().where(L.device_id == P.device_id))
+    result = db.execute(
+        insert(L).from_select(["device_id", "delta", "balance", "kind", "reason", "created_at"], rows)
+    )
+    return result.rowcount
+
+
+def ledger_mismatches(db: Session, limit: int = 100) -> List[Tuple[str, int, int]]:
+    """(device_id, points, ledger sum) for profiles whose ledger does not add up to their points."""
+    L, P = models.PointsLedger, models.Profile
+    totals = select(L.device_id, func.sum(L.delta).label("total")).group_by(L.device_id).subquery()
+    total = func.coalesce(totals.c.total, 0)
+    stmt = (
+        select(P.device_id, P.points, total)
+        .outerjoin(totals, totals.c.device_id == P.device_id)
+        .where(P.points != total)
+        .limit(limit)
+    )
+    return [tuple(r) for r in db.execute(stmt)]
+
+
+def ledger_balance(db: Session, device_id: str) -> int:
+    """Balance rebuilt from the ledger alone (opening entry included, see backfill_opening_balances)."""
+    stmt = select(func.coalesce(func.sum(models.PointsLedger.delta), 0)).where(models.PointsLedger.device_id == device_id)
+    return db.execute(stmt).scalar_one()
@@ -0,0 +1,156 @@
+"""Per-device cache of serialized profiles, read-through on GET and write-through on every change.
+
+Entries hold the exact JSON body of `GET /api/profile`, so a hit costs no query
+and no serialization, and its ETag is a hash of those bytes. Every handler that
+changes a profile calls `put()` after committing, so polling clients see the new
+state immediately. A read-through only fills an empty slot and never replaces an
+entry: a GET that loaded the row before a write committed cannot overwrite the
+newer body that write's `put()` stored in the meantime.
+
+Backends, picked by PROFILE_CACHE_URL:
+  - unset / 'memory': in-process LRU (PROFILE_CACHE_SIZE entries, default 10000);
+    per worker, so only correct with a single worker: a write refreshes the
+    cache of the worker that served it and the others keep their copy until TTL
+  - 'redis://...': shared across workers; needs the optional `redis` package
+Env: PROFILE_CACHE_TTL seconds (default 60; 0 disables caching)
+"""
+
+import hashlib
+import os
+from typing import Callable, Optional
+
+from ..schemas import ProfileOut
+from . import metrics
+from .cache import TTLCache
+
+CACHE_URL = os.getenv("PROFILE_CACHE_URL", "memory")
+TTL = float(os.getenv("PROFILE_CACHE_TTL", "60"))
+
+
+class MemoryBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, device_id: str) -> Optional[bytes]:
+        return self._cache.get(device_id)
+
+    def set(self, device_id: str, body: bytes) -> None:
+        self._cache.set(device_id, body)
+
+    def add(self, device_id: str, body: bytes) -> None:
+        self._cache.add(device_id, body)
+
+    def delete(self, device_id: str) -> None:
+        self._cache.pop(device_id)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **self._cache.stats()}
+
+
+class RedisBackend:
+    """Shared backend; errors count as misses so an unreachable Redis only costs DB reads."""
+
+    def __init__(self, url: str, ttl: float):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.5)
+        self._errors = (redis.RedisError,)
+        self._ttl = max(1, int(ttl))
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, device_id: str) -> Optional[bytes]:
+        try:
+            body = self._client.get(f"profile:{device_id}")
+        except self._errors:
+            body = None
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    def set(self, device_id: str, body: bytes) -> None:
+        try:
+            self._client.set(f"profile:{device_id}", body, ex=self._ttl)
+        except self._errors:
+            # A stale entry must not outlive a failed overwrite
+            self.delete(device_id)
+
+    def add(self, device_id: str, body: bytes) -> None:
+        try:
+            self._client.set(f"profile:{device_id}", body, ex=self._ttl, nx=True)
+        except self._errors:
+            pass
+
+    def delete(self, device_id: str) -> None:
+        try:
+            self._client.delete(f"profile:{device_id}")
+        except self._errors:
+            pass
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "hits": self.hits, "misses": self.misses}
+
+
+def _make_backend():
+    if CACHE_URL.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(CACHE_URL, TTL)
+    return MemoryBackend(int(os.getenv("PROFILE_CACHE_SIZE", "10000")), TTL)
+
+
+_backend = _make_backend() if TTL > 0 else None
+if _backend is not None:
+    metrics.track_cache("profile", _backend.stats)
+
+
+def to_out(p) -> ProfileOut:
+    """Serialize a Profile instance or a row selected with PROFILE_COLUMNS."""
+    return ProfileOut(
+        device_id=p.device_id,
+        user_name=p.user_name,
+        points=p.points,
+        badges=p.badges or [],
+        streak_days=p.streak_days or 0,
+        last_claim_iso=p.last_claim_iso,
+    )
+
+
+def _encode(out: ProfileOut) -> bytes:
+    # Same bytes FastAPI would render for response_model=ProfileOut
+    return out.model_dump_json().encode()
+
+
+def etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def put(p) -> ProfileOut:
+    """Write-through after a commit; returns the ProfileOut to send back."""
+    out = to_out(p)
+    if _backend is not None:
+        _backend.set(out.device_id, _encode(out))
+    return out
+
+
+def read_through(device_id: str, load: Callable[[], Optional[object]]) -> Optional[bytes]:
+    """Cached body for `device_id`, falling back to `load()`; None if there is no profile."""
+    body = _backend.get(device_id) if _backend is not None else None
+    if body is None:
+        p = load()
+        if p is None:
+            return None
+        body = _encode(to_out(p))
+        if _backend is not None:
+            # Only into an empty slot: a put() since load() holds a newer body
+            _backend.add(device_id, body)
+    return body
+
+
+def invalidate(device_id: str) -> None:
+    if _backend is not None:
+        _backend.delete(device_id)
+
+
+def stats() -> dict:
+    return _backend.stats() if _backend is not None else {"backend": None}
@@ -0,0 +1,165 @@
+"""Health-aware routing over the AI provider chain.
+
+Each provider gets a rolling window of outcomes and latencies plus a circuit
+breaker: after AI_BREAKER_FAILURES consecutive failures (or an error rate of
+AI_BREAKER_ERROR_RATE over the window) it is skipped for AI_BREAKER_OPEN_SECONDS,
+then one probe request decides whether it closes again or stays open twice as
+long (capped at 5 minutes). Calls are cut off after AI_PROVIDER_TIMEOUT seconds.
+
+With AI_HEDGE_AFTER_MS set, a provider that has not answered within that budget
+gets the next one started in parallel, and the first good answer wins. Losing
+calls run on (bounded by the timeout) so their outcome still feeds the breaker.
+
+Names passed in are '<provider>:<detail>' (e.g. 'openai:gpt-4o-mini'); health is
+tracked per provider, so chat and crop suggestions share one breaker per upstream.
+
+Env: AI_PROVIDER_TIMEOUT (default 20), AI_HEDGE_AFTER_MS (default 0 = off),
+AI_BREAKER_FAILURES (default 3; 0 disables the breaker), AI_BREAKER_ERROR_RATE
+(default 0.5), AI_BREAKER_WINDOW (default 20), AI_BREAKER_OPEN_SECONDS (default 30)
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+TIMEOUT = float(os.getenv("AI_PROVIDER_TIMEOUT", "20"))
+HEDGE_AFTER = float(os.getenv("AI_HEDGE_AFTER_MS", "0")) / 1000
+FAILURES = int(os.getenv("AI_BREAKER_FAILURES", "3"))
+ERROR_RATE = float(os.getenv("AI_BREAKER_ERROR_RATE", "0.5"))
+WINDOW = int(os.getenv("AI_BREAKER_WINDOW", "20"))
+OPEN_SECONDS = float(os.getenv("AI_BREAKER_OPEN_SECONDS", "30"))
+MAX_OPEN_SECONDS = 300.0
+
+
+class ProviderHealth:
+    def __init__(self, name: str):
+        self.name = name
+        self.samples: deque = deque(maxlen=WINDOW)  # (ok, seconds)
+        self.consecutive_failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.open_for = OPEN_SECONDS
+        self.skipped = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.open_for:
+            self.state, self._probing = "half_open", False
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        self.skipped += 1
+        return False
+
+    def _open(self) -> None:
+        if self.state == "half_open":
+            self.open_for = min(self.open_for * 2, MAX_OPEN_SECONDS)
+        self.state, self.opened_at, self._probing = "open", time.monotonic(), False
+
+    def record(self, ok: bool, seconds: float) -> None:
+        self.samples.append((ok, seconds))
+        if ok:
+            self.consecutive_failures = 0
+            self.state, self.open_for, self._probing = "closed", OPEN_SECONDS, False
+            return
+        self.consecutive_failures += 1
+        if FAILURES <= 0:
+            return
+        if self.state == "half_open":
+            self._open()
+        elif self.consecutive_failures >= FAILURES or (
+            len(self.samples) >= max(FAILURES, WINDOW // 2) and self.error_rate() >= ERROR_RATE
+        ):
+            self._open()
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for ok, _ in self.samples if not ok) / len(self.samples)
+
+    def stats(self) -> dict:
+        lat = sorted(s for ok, s in self.samples if ok)
+        pct = lambda q: round(lat[min(len(lat) - 1, int(q * len(lat)))] * 1000, 1) if lat else None
+        return {
+            "state": self.state,
+            "errorRate": round(self.error_rate(), 3),
+            "samples": len(self.samples),
+            "consecutiveFailures": self.consecutive_failures,
+            "skipped": self.skipped,
+            "p50Ms": pct(0.5),
+            "p95Ms": pct(0.95),
+        }
+
+
+_health: Dict[str, ProviderHealth] = {}
+
+
+def health(name: str) -> ProviderHealth:
+    key = name.split(":", 1)[0]
+    h = _health.get(key)
+    if h is None:
+        h = _health[key] = ProviderHealth(key)
+    return h
+
+
+def stats() -> dict:
+    return {name: h.stats() for name, h in _health.items()}
+
+
+Call = Tuple[str, Callable[[], Awaitable[Any]]]
+
+
+def _record_when_done(task: asyncio.Task, name: str, started: float) -> None:
+    def done(t: asyncio.Task) -> None:
+        ok = not t.cancelled() and t.exception() is None and bool(t.result())
+        health(name).record(ok, time.monotonic() - started)
+
+    task.add_done_callback(done)
+
+
+async def first_good(calls: List[Call], hedge_after: Optional[float] = None) -> Optional[Tuple[str, Any]]:
+    """Run `calls` in priority order and return (name, result) for the first truthy result.
+
+    Providers with an open breaker are skipped. A call that raises, times out or
+    returns something falsy counts as a failure and moves on to the next one.
+    """
+    hedge_after = HEDGE_AFTER if hedge_after is None else hedge_after
+    queue = list(calls)
+    pending: Dict[asyncio.Task, Tuple[str, float]] = {}
+
+    def launch() -> None:
+        while queue:
+            name, fn = queue.pop(0)
+            if health(name).allow():
+                task = asyncio.ensure_future(asyncio.wait_for(fn(), TIMEOUT))
+                pending[task] = (name, time.monotonic())
+                return
+
+    try:
+        launch()
+        while pending:
+            budget = hedge_after if hedge_after > 0 and queue else None
+            done, _ = await asyncio.wait(pending, timeout=budget, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                launch()  # hedge: the slow call keeps running alongside the next provider
+                continue
+            for task in done:
+                name, started = pending.pop(task)
+                try:
+                    result = task.result()
+                except Exception:
+                    result = None
+                health(name).record(bool(result), time.monotonic() - started)
+                if result:
+                    return name, result
+            if not pending:
+                launch()
+        return None
+    finally:
+        # Hedge losers (or everything, if the caller was cancelled) finish in the background
+        for task, (name, started) in pending.items():
+            _record_when_done(task, name, started)
@@ -1,11 +1,16 @@
+import json
 import os
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional
 
-import httpx
 import base64
 
+import httpx
+
+from . import verify_cache
+from .http_clients import get_async_client
+
 RGI_BASE_URL = os.getenv("RGI_BASE_URL", "https://apisetu.gov.in/certificate/v3/rgi")
 RGI_BIRTH_PATH = os.getenv("RGI_BIRTH_PATH", "/btcer")
 RGI_DEATH_PATH = os.getenv("RGI_DEATH_PATH", "/dtcer")
@@ -58,7 +63,7 @@ def _consent(user: Dict[str, Any]) -> Dict[str, Any]:
     return base
 
 
-def verify_birth(reg_no: str, full_name: str, dob_ddmmyyyy: str, gender: str | None, fmt: str = "pdf", user: Dict[str, Any] | None = None):
+def _birth_payload(reg_no: str, full_name: str, dob_ddmmyyyy: str, gender: str | None, fmt: str, user: Dict[str, Any] | None) -> Dict[str, Any]:
     payload = {
         "txnId": str(uuid.uuid4()),
         "format": fmt,
@@ -71,23 +76,11 @@ def verify_birth(reg_no: str, full_name: str, dob_ddmmyyyy: str, gender: str | N
     }
     if gender:
         payload["certificateParameters"]["GENDER"] = gender
-    url = _full_url(RGI_BIRTH_PATH)
-    with httpx.Client(timeout=30) as client:
-        r = client.post(url, json=payload, headers=_headers())
-        if r.status_code == 200:
-            # The API can return PDF/XML; we forward content-type and bytes as base64 for safety to frontend.
-            ct = r.headers.get("Content-Type", "application/pdf")
-            b64 = base64.b64encode(r.content).decode("ascii")
-            return {"ok": True, "status": 200, "contentType": ct, "data": b64}
-        # Error JSON forward
-        try:
-            return {"ok": False, "status": r.status_code, "error": r.json()}
-        except Exception:
-            return {"ok": False, "status": r.status_code, "error": r.text}
+    return payload
 
 
-def verify_death(reg_no: str, full_name: str, gender_deceased: str, dec_name: str, dod_ddmmyyyy: str, relation: str, fmt: str = "pdf", user: Dict[str, Any] | None = None):
-    payload = {
+def _death_payload(reg_no: str, full_name: str, gender_deceased: str, dec_name: str, dod_ddmmyyyy: str, relation: str, fmt: str, user: Dict[str, Any] | None) -> Dict[str, Any]:
+    return {
         "txnId": str(uuid.uuid4()),
         "format": fmt,
         "certificateParameters": {
@@ -100,14 +93,138 @@ def verify_death(reg_no: str, full_name: str, gender_deceased: str, dec_name: st
         },
         "consentArtifact": _consent({**(user or {}), "regNo": reg_no}),
     }
-    url = _full_url(RGI_DEATH_PATH)
-    with httpx.Client(timeout=30) as client:
-        r = client.post(url, json=payload, headers=_headers())
-        if r.status_code == 200:
-            ct = r.headers.get("Content-Type", "application/pdf")
-            b64 = base64.b64encode(r.content).decode("ascii")
-            return {"ok": True, "status": 200, "contentType": ct, "data": b64}
+
+
+def _error(status: int, content: bytes) -> Dict[str, Any]:
+    # Error JSON forward
+    try:
+        return {"ok": False, "status": status, "error": json.loads(content)}
+    except Exception:
+        return {"ok": False, "status": status, "error": content.decode("utf-8", "replace")}
+
+
+def _result(meta: Dict[str, Any], content: bytes) -> Dict[str, Any]:
+    if verify_cache.succeeded(meta["status"]):
+        # The API can return PDF/XML; we forward content-type and bytes as base64 for safety to frontend.
+        b64 = base64.b64encode(content).decode("ascii")
+        return {"ok": True, "status": 200, "contentType": meta["contentType"], "data": b64}
+    return _error(meta["status"], content)
+
+
+def _meta(r: httpx.Response) -> Dict[str, Any]:
+    meta = {"status": r.status_code, "contentType": r.headers.get("Content-Type", "application/pdf")}
+    if "Content-Disposition" in r.headers:
+        meta["disposition"] = r.headers["Content-Disposition"]
+    return meta
+
+
+async def _fetch(path: str, payload: Dict[str, Any], cache_key: str) -> Dict[str, Any]:
+    hit = await verify_cache.aget(cache_key)
+    if hit is not None:
+        return _result(*hit)
+    r = await get_async_client("rgi").post(_full_url(path), json=payload, headers=_headers())
+    meta = _meta(r)
+    await verify_cache.aput(cache_key, meta, r.content)
+    return _result(meta, r.content)
+
+
+class Download(NamedTuple):
+    status: int
+    media_type: str
+    headers: Dict[str, str]
+    body: AsyncIterator[bytes]
+    # Releases the upstream response; run it even if `body` is never iterated
+    close: Optional[Callable[[], Awaitable[None]]] = None
+
+
+async def _once(content: bytes) -> AsyncIterator[bytes]:
+    yield content
+
+
+def _download(meta: Dict[str, Any], content_or_chunks, close=None) -> Download:
+    if not verify_cache.succeeded(meta["status"]):
+        error = json.dumps(_error(meta["status"], content_or_chunks)).encode()
+        return Download(meta["status"], "application/json", {}, _once(error))
+    headers = {"Content-Disposition": meta["disposition"]} if "disposition" in meta else {}
+    body = _once(content_or_chunks) if isinstance(content_or_chunks, bytes) else content_or_chunks
+    return Download(200, meta["contentType"], headers, body, close)
+
+
+async def _relay(r: httpx.Response, meta: Dict[str, Any], cache_key: str) -> AsyncIterator[bytes]:
+    # With the cache on, chunks are also collected (up to its item limit) and stored once complete
+    parts: Optional[List[bytes]] = [] if verify_cache.enabled() else None
+    size = 0
+    try:
+        async for chunk in r.aiter_bytes():
+            yield chunk
+            if parts is not None:
+                parts.append(chunk)
+                size += len(chunk)
+                if size > verify_cache.MAX_ITEM_BYTES:
+                    parts = None
+        if parts is not None:
+            await verify_cache.aput(cache_key, meta, b"".join(parts))
+    finally:
+        await r.aclose()  # also when the client hangs up mid-download
+
+
+async def _stream(path: str, payload: Dict[str, Any], cache_key: str) -> Download:
+    hit = await verify_cache.aget(cache_key)
+    if hit is not None:
+        return _download(*hit)
+    client = get_async_client("rgi")
+    r = await client.send(client.build_request("POST", _full_url(path), json=payload, headers=_headers()), stream=True)
+    meta = _meta(r)
+    if not verify_cache.succeeded(r.status_code):
         try:
-            return {"ok": False, "status": r.status_code, "error": r.json()}
-        except Exception:
-            return {"ok": False, "status": r.status_code, "error": r.text}
+            await r.aread()
+        finally:
+            await r.aclose()
+        await verify_cache.aput(cache_key, meta, r.content)
+        return _download(meta, r.content)
+    return _download(meta, _relay(r, meta, cache_key), r.aclose)
+
+
+def _birth_key(reg_no: str, full_name: str, dob_ddmmyyyy: str, gender: str | None, fmt: str) -> str:
+    return verify_cache.key("rgi-birth", reg_no, full_name, dob_ddmmyyyy, gender, fmt)
+
+
+def _death_key(reg_no: str, full_name: str, gender_deceased: str, dec_name: str, dod_ddmmyyyy: str, relation: str, fmt: str) -> str:
+    return verify_cache.key("rgi-death", reg_no, full_name, gender_deceased, dec_name, dod_ddmmyyyy, relation, fmt)
+
+
+async def verify_birth(reg_no: str, full_name: str, dob_ddmmyyyy: str, gender: str | None, fmt: str = "pdf", user: Dict[str, Any] | None = None):
+    return await _fetch(
+        RGI_BIRTH_PATH,
+        _birth_payload(reg_no, full_name, dob_ddmmyyyy, gender, fmt, user),
+        _birth_key(reg_no, full_name, dob_ddmmyyyy, gender, fmt),
+    )
+
+
+async def verify_death(reg_no: str, full_name: str, gender_deceased: str, dec_name: str, dod_ddmmyyyy: str, relation: str, fmt: str = "pdf", user: Dict[str, Any] | None = None):
+    return await _fetch(
+        RGI_DEATH_PATH,
+        _death_payload(reg_no, full_name, gender_deceased, dec_name, dod_ddmmyyyy, relation, fmt, user),
+        _death_key(reg_no, full_name, gender_deceased, dec_name, dod_ddmmyyyy, relation, fmt),
+    )
+
+
+async def stream_birth(reg_no: str, full_name: str, dob_ddmmyyyy: str, gender: str | None, fmt: str = "pdf", user: Dict[str, Any] | None = None) -> Download:
+    """Like verify_birth, but the certificate bytes are relayed as they arrive instead of base64 in JSON.
+
+    Non-200 answers come back as the usual error JSON with the upstream status.
+    """
+    return await _stream(
+        RGI_BIRTH_PATH,
+        _birth_payload(reg_no, full_name, dob_ddmmyyyy, gender, fmt, user),
+        _birth_key(reg_no, full_name, dob_ddmmyyyy, gender, fmt),
+    )
+
+
+async def stream_death(reg_no: str, full_name: str, gender_deceased: str, dec_name: str, dod_ddmmyyyy: str, relation: str, fmt: str = "pdf", user: Dict[str, Any] | None = None) -> Download:
+    """Streaming counterpart of verify_death; see stream_birth."""
+    return await _stream(
+        RGI_DEATH_PATH,
+        _death_payload(reg_no, full_name, gender_deceased, dec_name, dod_ddmmyyyy, relation, fmt, user),
+        _death_key(reg_no, full_name, gender_deceased, dec_name, dod_ddmmyyyy, relation, fmt),
+    )
@@ -0,0 +1,215 @@
+"""Pluggable HTML backends for extracting scheme links from myscheme listing pages.
+
+Every backend applies the original BeautifulSoup heuristic: every <a href>
+containing '/schemes/' with a name of 3+ chars, in document order, described
+by the first <p> under the anchor's parent, capped at `limit` and then
+de-duplicated by link. On well-formed listing markup they give identical
+items (checked against benchmarks/fixtures/myscheme by bench_scheme_parser).
+On malformed HTML they can differ: selectolax and lxml repair the tree the
+HTML5 way (an unclosed <li> ends at the next <li>, a <div> closes an open
+<p>), while html.parser nests tags as written, so the "parent" and its first
+<p> are not always the same element.
+
+Backends, picked by SCHEMES_PARSER (default 'auto' = first one installed):
+  - 'selectolax': lexbor C parser
+  - 'lxml': incremental pull parser that stops reading once `limit` anchors are resolved
+  - 'html.parser': BeautifulSoup with the stdlib parser (always available)
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+from urllib.parse import urljoin
+
+PARSER = os.getenv("SCHEMES_PARSER", "auto")
+
+# bs4's get_text() skips these; the other backends must too
+_SKIP_TEXT = {"script", "style", "template"}
+_STREAM_CHUNK = 16 * 1024
+
+
+def _item(name: str, desc: str, href: str, base_url: str) -> dict:
+    return {
+        "name": name,
+        "desc": desc,
+        "link": href if href.startswith("http") else urljoin(base_url, href),
+        "source": "myscheme",
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _dedupe(items: list[dict]) -> list[dict]:
+    seen = set()
+    uniq = []
+    for it in items:
+        if it["link"] in seen:
+            continue
+        seen.add(it["link"])
+        uniq.append(it)
+    return uniq
+
+
+def _parse_bs4(html: str, base_url: str, limit: Optional[int]) -> list[dict]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    items = []
+    # Heuristic: find links to '/schemes/'
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        if "/schemes/" not in href:
+            continue
+        name = a.get_text(strip=True)
+        if not name or len(name) < 3:
+            continue
+        # Try to find a nearby description (sibling <p> or parent text)
+        desc = ""
+        parent = a.find_parent()
+        if parent:
+            p = parent.find("p")
+            if p:
+                desc = p.get_text(" ", strip=True)
+        items.append(_item(name, desc, href, base_url))
+        if limit and len(items) >= limit:
+            break
+    return _dedupe(items)
+
+
+def _sx_text(node, sep: str) -> str:
+    parts = []
+    for n in node.traverse(include_text=True):
+        if n.is_text_node and n.parent.tag not in _SKIP_TEXT:
+            s = n.text_content.strip()
+            if s:
+                parts.append(s)
+    return sep.join(parts)
+
+
+def _sx_first_p(node):
+    # First <p> below `node` in document order, like bs4's find("p"); css_first() could return node itself
+    for child in node.iter():
+        if child.tag == "p":
+            return child
+        p = child.css_first("p")
+        if p is not None:
+            return p
+    return None
+
+
+def _parse_selectolax(html: str, base_url: str, limit: Optional[int]) -> list[dict]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    items = []
+    for a in tree.css("a[href]"):
+        href = a.attributes.get("href") or ""
+        if "/schemes/" not in href:
+            continue
+        name = _sx_text(a, "")
+        if len(name) < 3:
+            continue
+        desc = ""
+        parent = a.parent
+        if parent is not None:
+            p = _sx_first_p(parent)
+            if p is not None:
+                desc = _sx_text(p, " ")
+        items.append(_item(name, desc, href, base_url))
+        if limit and len(items) >= limit:
+            break
+    return _dedupe(items)
+
+
+def _lx_strings(el):
+    if el.tag not in _SKIP_TEXT and el.text:
+        yield el.text
+    for child in el:
+        # Comments and processing instructions have non-string tags; keep only their tails
+        if isinstance(child.tag, str) and child.tag not in _SKIP_TEXT:
+            yield from _lx_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _lx_text(el, sep: str) -> str:
+    return sep.join(s for s in (t.strip() for t in _lx_strings(el)) if s)
+
+
+def _parse_lxml(html: str, base_url: str, limit: Optional[int]) -> list[dict]:
+    from lxml import etree
+
+    parser = etree.HTMLPullParser(events=("end",))
+    items = []
+    # Anchors whose description waits on their parent element being fully parsed
+    pending: Dict[object, list] = {}
+
+    def on_end(el):
+        waiting = pending.pop(el, None)
+        if waiting:
+            p = el.find(".//p")
+            desc = _lx_text(p, " ") if p is not None else ""
+            for it in waiting:
+                it["desc"] = desc
+        if el.tag != "a" or (limit and len(items) >= limit):
+            return
+        href = el.get("href")
+        if href is None or "/schemes/" not in href:
+            return
+        name = _lx_text(el, "")
+        if len(name) < 3:
+            return
+        it = _item(name, "", href, base_url)
+        items.append(it)
+        parent = el.getparent()
+        if parent is not None:
+            pending.setdefault(parent, []).append(it)
+
+    for start in range(0, len(html), _STREAM_CHUNK):
+        parser.feed(html[start : start + _STREAM_CHUNK])
+        for _, el in parser.read_events():
+            on_end(el)
+        if limit and len(items) >= limit and not pending:
+            return _dedupe(items)  # the rest of the page cannot change the result
+    parser.close()
+    for _, el in parser.read_events():
+        on_end(el)
+    return _dedupe(items)
+
+
+BACKENDS: Dict[str, Callable[[str, str, Optional[int]], list[dict]]] = {
+    "selectolax": _parse_selectolax,
+    "lxml": _parse_lxml,
+    "html.parser": _parse_bs4,
+}
+_MODULES = {"selectolax": "selectolax.lexbor", "lxml": "lxml.etree", "html.parser": "bs4"}
+
+
+def available() -> list[str]:
+    out = []
+    for name, module in _MODULES.items():
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        out.append(name)
+    return out
+
+
+def _resolve(name: str) -> str:
+    if name == "auto":
+        return available()[0]
+    if name not in BACKENDS:
+        raise ValueError(f"unknown SCHEMES_PARSER backend: {name}")
+    return name
+
+
+_default: Optional[str] = None
+
+
+def parse_scheme_links(html: str, base_url: str, limit: Optional[int] = 20, backend: Optional[str] = None) -> list[dict]:
+    global _default
+    if backend is None:
+        if _default is None:
+            _default = _resolve(PARSER)
+        backend = _default
+    return BACKENDS[_resolve(backend)](html, base_url, limit)
@@ -1,83 +1,105 @@
+import asyncio
 import os
-import time
-import httpx
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 from datetime import datetime, timezone
 
-_CACHE = {"ts": 0.0, "key": "", "items": []}
+from . import metrics, schemes_index
+from .cache import TTLCache
+from .http_clients import get_async_client
+from .scheme_parser import parse_scheme_links
+
+# Search is served from the local FTS index; results are cached per normalized query
+# and the cache is cleared whenever the ingester swaps in a new catalogue.
 _CACHE_TTL = int(os.getenv("SCHEMES_CACHE_TTL", "1800"))  # 30 min default
+_QUERY_CACHE = TTLCache(maxsize=int(os.getenv("SCHEMES_QUERY_CACHE_SIZE", "256")), ttl=_CACHE_TTL)
+metrics.track_cache("schemes_query", _QUERY_CACHE.stats)
+_ingest_task: asyncio.Task | None = None
 
 DEFAULT_SOURCE = os.getenv("SCHEMES_SOURCE_URL", "https://www.myscheme.gov.in/schemes")
+INGEST_INTERVAL = int(os.getenv("SCHEMES_INGEST_INTERVAL", "21600"))  # 6 h
+MAX_PAGES = int(os.getenv("SCHEMES_MAX_PAGES", "20"))
+CRAWL_DELAY = float(os.getenv("SCHEMES_CRAWL_DELAY", "0.5"))  # seconds between listing pages
+SEARCH_LIMIT = 50  # matches the router's upper bound on `limit`
 
 
-def _now_ts() -> float:
-    return time.time()
-
-
-def _parse_myscheme_list(html: str, base_url: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
-    items = []
-    # Heuristic: find links to '/schemes/'
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        if "/schemes/" not in href:
-            continue
-        name = a.get_text(strip=True)
-        if not name or len(name) < 3:
-            continue
-        link = href if href.startswith("http") else urljoin(base_url, href)
-        # Try to find a nearby description (sibling <p> or parent text)
-        desc = ""
-        parent = a.find_parent()
-        if parent:
-            p = parent.find("p")
-            if p:
-                desc = p.get_text(" ", strip=True)
-        items.append({
-            "name": name,
-            "desc": desc,
-            "link": link,
-            "source": "myscheme",
-            "updated_at": datetime.now(timezone.utc).isoformat(),
-        })
-        if len(items) >= 20:
-            break
-    # Deduplicate by link
-    seen = set()
-    uniq = []
-    for it in items:
-        if it["link"] in seen:
-            continue
-        seen.add(it["link"])
-        uniq.append(it)
-    return uniq
-
-
-def fetch_live_schemes(query: str | None = None, limit: int = 8) -> list[dict]:
-    global _CACHE
-    key = f"q={query}|l={limit}"
-    if _CACHE["items"] and _CACHE["key"] == key and (_now_ts() - _CACHE["ts"]) < _CACHE_TTL:
-        return _CACHE["items"][:limit]
-    url = DEFAULT_SOURCE
-    try:
-        with httpx.Client(timeout=20) as client:
-            r = client.get(url)
+def _parse_myscheme_list(html: str, base_url: str, limit: int | None = 20) -> list[dict]:
+    # Backend (selectolax / lxml / html.parser) is chosen by SCHEMES_PARSER
+    return parse_scheme_links(html, base_url, limit)
+
+
+def _fallback() -> list[dict]:
+    # Curated items for when the live catalogue is unavailable
+    return [
+        {"name": "PM-Kisan Samman Nidhi", "desc": "Income support to landholding farmer families.", "link": "https://pmkisan.gov.in/", "source": "curated", "updated_at": datetime.now(timezone.utc).isoformat()},
+        {"name": "Kisan Credit Card (KCC)", "desc": "Short-term credit for cultivation and allied needs.", "link": "https://www.myscheme.gov.in/schemes/kcc", "source": "curated", "updated_at": datetime.now(timezone.utc).isoformat()},
+        {"name": "PM Fasal Bima Yojana (PMFBY)", "desc": "Crop insurance against unavoidable risks.", "link": "https://pmfby.gov.in/", "source": "curated", "updated_at": datetime.now(timezone.utc).isoformat()},
+    ]
+
+
+def _normalize_query(query: str | None) -> str:
+    return " ".join((query or "").lower().split())
+
+
+async def crawl(source: str = DEFAULT_SOURCE, max_pages: int = MAX_PAGES) -> list[dict]:
+    """Walk the paginated listing until a page adds no new scheme links."""
+    client = get_async_client("schemes")
+    found: dict[str, dict] = {}
+    for page in range(1, max_pages + 1):
+        try:
+            r = await client.get(source, params={"page": page} if page > 1 else None)
             r.raise_for_status()
-            items = _parse_myscheme_list(r.text, url)
-            if query:
-                q = query.lower()
-                items = [x for x in items if q in (x.get("name", "") + " " + x.get("desc", "")).lower()]
-            if not items:
-                raise ValueError("no items parsed")
-            _CACHE = {"ts": _now_ts(), "key": key, "items": items}
-            return items[:limit]
-    except Exception:
-        # Fallback curated items
-        fallback = [
-            {"name": "PM-Kisan Samman Nidhi", "desc": "Income support to landholding farmer families.", "link": "https://pmkisan.gov.in/", "source": "curated", "updated_at": datetime.now(timezone.utc).isoformat()},
-            {"name": "Kisan Credit Card (KCC)", "desc": "Short-term credit for cultivation and allied needs.", "link": "https://www.myscheme.gov.in/schemes/kcc", "source": "curated", "updated_at": datetime.now(timezone.utc).isoformat()},
-            {"name": "PM Fasal Bima Yojana (PMFBY)", "desc": "Crop insurance against unavoidable risks.", "link": "https://pmfby.gov.in/", "source": "curated", "updated_at": datetime.now(timezone.utc).isoformat()},
-        ]
-        _CACHE = {"ts": _now_ts(), "key": key, "items": fallback}
-        return fallback[:limit]
+        except Exception:
+            if page == 1:
+                raise
+            break  # keep what the earlier pages gave us
+        # Parsing is CPU-bound; keep it off the event loop
+        items = await asyncio.to_thread(_parse_myscheme_list, r.text, str(r.url), None)
+        new = [it for it in items if it["link"] not in found]
+        if not new:
+            break
+        for it in new:
+            found[it["link"]] = it
+        if CRAWL_DELAY:
+            await asyncio.sleep(CRAWL_DELAY)
+    return list(found.values())
+
+
+async def ingest() -> int:
+    """Crawl the catalogue and swap it into the search index; returns the indexed count."""
+    items = await crawl()
+    if not items:
+        raise ValueError("no items parsed")
+    n = await asyncio.to_thread(schemes_index.replace_all, items)
+    _QUERY_CACHE.clear()
+    return n
+
+
+async def _ingest_loop() -> None:
+    while True:
+        try:
+            await ingest()
+        except Exception:
+            pass  # keep serving the existing index; retry next interval
+        await asyncio.sleep(INGEST_INTERVAL)
+
+
+def start_ingester() -> None:
+    """Run the ingester in the background for the app's lifetime."""
+    global _ingest_task
+    if _ingest_task is None or _ingest_task.done():
+        _ingest_task = asyncio.create_task(_ingest_loop())
+
+
+def stop_ingester() -> None:
+    if _ingest_task is not None and not _ingest_task.done():
+        _ingest_task.cancel()
+
+
+async def fetch_live_schemes(query: str | None = None, limit: int = 8) -> list[dict]:
+    q = _normalize_query(query)
+    items = _QUERY_CACHE.get(q)
+    if items is None:
+        # Local FTS lookup; never touches myscheme.gov.in. sqlite3 blocks (longest while an
+        # ingest swaps the index), so it runs in a thread rather than on the event loop
+        items = await asyncio.to_thread(schemes_index.search, q, SEARCH_LIMIT)
+        _QUERY_CACHE.set(q, items)
+    return (items or _fallback())[:limit]
@@ -0,0 +1,136 @@
+"""Local SQLite FTS5 search index over the scheme catalogue.
+
+The index lives in its own SQLite file (SCHEMES_INDEX_PATH) so scheme search
+works the same whatever DATABASE_URL points at, and never touches the network.
+It is filled by the ingester in `schemes.py` and queried per request.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+
+INDEX_PATH = os.getenv("SCHEMES_INDEX_PATH", "./schemes_index.db")
+
+# Common scheme vocabulary in Devanagari and romanised spelling; both forms are
+# indexed so either one finds the scheme.
+TRANSLIT = {
+    "किसान": "kisan kisaan",
+    "कृषि": "krishi",
+    "योजना": "yojana yojna",
+    "फसल": "fasal",
+    "बीमा": "bima beema",
+    "प्रधानमंत्री": "pradhan mantri pm",
+    "सम्मान": "samman",
+    "निधि": "nidhi",
+    "सिंचाई": "sinchai irrigation",
+    "मिट्टी": "mitti soil",
+    "पशुपालन": "pashupalan animal husbandry",
+    "मत्स्य": "matsya fisheries",
+    "ऋण": "rin loan credit",
+    "पेंशन": "pension",
+    "श्रम": "shram labour",
+    "ग्रामीण": "gramin rural",
+}
+TRANSLIT.update({roman: hindi for hindi, romans in TRANSLIT.items() for roman in romans.split()})
+
+# \w alone splits Devanagari words at vowel signs, so include the whole block
+_TOKEN = re.compile(r"[\w\u0900-\u097f]+")
+
+# unicode61's default categories treat combining marks (Mn/Mc) as separators, which splits
+# Devanagari words at every vowel sign; M* keeps them inside tokens
+_TOKENIZE = "unicode61 remove_diacritics 2 categories 'L* N* Co M*'"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schemes (
+    id INTEGER PRIMARY KEY,
+    link TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    desc TEXT NOT NULL DEFAULT '',
+    aliases TEXT NOT NULL DEFAULT '',
+    source TEXT,
+    updated_at TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS schemes_fts USING fts5(
+    name, desc, aliases,
+    content='schemes', content_rowid='id',
+    tokenize="%s"
+);
+""" % _TOKENIZE
+
+_local = threading.local()
+
+
+def _conn() -> sqlite3.Connection:
+    # One connection per thread; sqlite3 connections are not shareable by default
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(INDEX_PATH)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        _migrate(conn)
+        _local.conn = conn
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Create the tables; an index built with another tokenizer is dropped and rebuilt from `schemes`."""
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'schemes_fts'").fetchone()
+    stale = row is not None and _TOKENIZE not in row[0]
+    if stale:
+        conn.execute("DROP TABLE schemes_fts")
+    conn.executescript(_SCHEMA)  # commits the drop first
+    if stale:
+        conn.execute("INSERT INTO schemes_fts(schemes_fts) VALUES ('rebuild')")
+        conn.commit()
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall((text or "").lower())
+
+
+def _aliases(*texts: str) -> str:
+    out = []
+    for text in texts:
+        out.extend(TRANSLIT[t] for t in _tokens(text) if t in TRANSLIT)
+    return " ".join(out)
+
+
+def replace_all(items: list[dict]) -> int:
+    """Atomically swap the indexed catalogue for `items`; readers see old or new, never half."""
+    conn = _conn()
+    rows = [
+        (it["link"], it["name"], it.get("desc") or "", _aliases(it["name"], it.get("desc") or ""), it.get("source"), it.get("updated_at"))
+        for it in items
+    ]
+    with conn:
+        conn.execute("DELETE FROM schemes")
+        conn.executemany(
+            "INSERT OR IGNORE INTO schemes (link, name, desc, aliases, source, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute("INSERT INTO schemes_fts(schemes_fts) VALUES ('rebuild')")
+    return count()
+
+
+def count() -> int:
+    return _conn().execute("SELECT COUNT(*) FROM schemes").fetchone()[0]
+
+
+def search(query: str, limit: int = 50) -> list[dict]:
+    """Ranked prefix search; every query token must match name, description or an alias."""
+    tokens = _tokens(query)
+    conn = _conn()
+    if not tokens:
+        rows = conn.execute(
+            "SELECT name, desc, link, source, updated_at FROM schemes ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+    else:
+        match = " ".join(f'"{t}"*' for t in tokens)
+        rows = conn.execute(
+            "SELECT s.name, s.desc, s.link, s.source, s.updated_at FROM schemes_fts f "
+            "JOIN schemes s ON s.id = f.rowid WHERE schemes_fts MATCH ? "
+            "ORDER BY bm25(schemes_fts, 10.0, 2.0, 5.0) LIMIT ?",
+            (match, limit),
+        ).fetchall()
+    return [dict(r) for r in rows]
@@ -0,0 +1,196 @@
+"""Encrypted on-disk cache of RGI certificates and e-Shram validation results.
+
+Citizens retry verifications a lot (flaky networks, reopening the app), and
+each retry would otherwise be a slow round trip to a rate-limited government
+API. Entries are keyed by an HMAC of the normalized verification parameters,
+so the file reveals neither them nor which ones were looked up, and stored
+AES-GCM encrypted (the key id is bound in as associated data) in their own
+SQLite file, like the schemes index.
+
+Successful (200) results live for VERIFY_CACHE_TTL; 4xx answers about the request
+itself (not 401/403/408/429, which are about us) for VERIFY_CACHE_NEGATIVE_TTL.
+When the file holds more than VERIFY_CACHE_MAX_MB, least recently used entries
+are evicted.
+
+Env: VERIFY_CACHE_KEY (secret; unset disables the cache), VERIFY_CACHE_PATH
+(default ./verify_cache.db), VERIFY_CACHE_TTL seconds (default 7 days),
+VERIFY_CACHE_NEGATIVE_TTL (default 300), VERIFY_CACHE_MAX_MB (default 256),
+VERIFY_CACHE_MAX_ITEM_MB (default 25; bigger documents are not cached)
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from . import metrics
+
+SECRET = os.getenv("VERIFY_CACHE_KEY")
+CACHE_PATH = os.getenv("VERIFY_CACHE_PATH", "./verify_cache.db")
+TTL = float(os.getenv("VERIFY_CACHE_TTL", str(7 * 86400)))
+NEGATIVE_TTL = float(os.getenv("VERIFY_CACHE_NEGATIVE_TTL", "300"))
+MAX_BYTES = int(float(os.getenv("VERIFY_CACHE_MAX_MB", "256")) * 2**20)
+MAX_ITEM_BYTES = int(float(os.getenv("VERIFY_CACHE_MAX_ITEM_MB", "25")) * 2**20)
+
+# Not a verdict on the citizen's data: our credentials, timeouts or rate limits
+_TRANSIENT_4XX = {401, 403, 408, 429}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_entries_accessed ON entries (accessed);
+"""
+
+_local = threading.local()
+_evict_lock = threading.Lock()
+_counts = {"hits": 0, "negativeHits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+
+def _derive(purpose: bytes) -> bytes:
+    return hashlib.blake2b(SECRET.encode(), digest_size=32, person=purpose).digest()
+
+
+_aead = None
+if SECRET:
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM  # via python-jose[cryptography]
+
+        _aead = AESGCM(_derive(b"verify-cache-enc"))
+        _id_key = _derive(b"verify-cache-id")
+    except ImportError:
+        _aead = None  # never store these results unencrypted
+
+
+if _aead is not None:
+    metrics.track_cache("verify", lambda: {"hits": _counts["hits"] + _counts["negativeHits"], "misses": _counts["misses"]})
+
+
+def enabled() -> bool:
+    return _aead is not None
+
+
+def _conn() -> sqlite3.Connection:
+    # One connection per thread; sqlite3 connections are not shareable by default
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(CACHE_PATH)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _norm(value) -> str:
+    return " ".join(str(value or "").split()).casefold()
+
+
+def key(kind: str, *params) -> str:
+    """Cache key for a verification of `kind` ('rgi-birth', 'eshram', ...) with these parameters."""
+    material = json.dumps([kind, [_norm(p) for p in params]], ensure_ascii=False).encode()
+    return hmac.new(_id_key, material, hashlib.sha256).hexdigest() if enabled() else ""
+
+
+def succeeded(status: int) -> bool:
+    """Whether an upstream answer is a result to hand back and cache as one; only 200 carries it."""
+    return status == 200
+
+
+def _ttl(status: int) -> float:
+    if succeeded(status):
+        return TTL
+    if 400 <= status < 500 and status not in _TRANSIENT_4XX:
+        return NEGATIVE_TTL
+    return 0
+
+
+def get(k: str) -> Optional[Tuple[dict, bytes]]:
+    """(meta, body) stored for `k`, or None. meta always has 'status'."""
+    if not enabled() or not k:
+        return None
+    now = time.time()
+    conn = _conn()
+    row = conn.execute("SELECT data FROM entries WHERE key = ? AND expires > ?", (k, now)).fetchone()
+    if row is None:
+        _counts["misses"] += 1
+        return None
+    try:
+        blob = row[0]
+        plain = _aead.decrypt(blob[:12], blob[12:], k.encode())
+    except Exception:
+        # Written under another VERIFY_CACHE_KEY, or tampered with
+        conn.execute("DELETE FROM entries WHERE key = ?", (k,))
+        conn.commit()
+        _counts["misses"] += 1
+        return None
+    conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, k))
+    conn.commit()
+    header, _, body = plain.partition(b"\n")
+    meta = json.loads(header)
+    _counts["hits" if succeeded(meta["status"]) else "negativeHits"] += 1
+    return meta, body
+
+
+def put(k: str, meta: dict, body: bytes) -> None:
+    """Store a result; meta['status'] decides whether and for how long."""
+    ttl = _ttl(meta["status"])
+    if not enabled() or not k or ttl <= 0 or len(body) > MAX_ITEM_BYTES:
+        return
+    now = time.time()
+    plain = json.dumps(meta).encode() + b"\n" + body
+    nonce = os.urandom(12)
+    blob = nonce + _aead.encrypt(nonce, plain, k.encode())
+    conn = _conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO entries (key, expires, accessed, size, data) VALUES (?, ?, ?, ?, ?)",
+        (k, now + ttl, now, len(blob), blob),
+    )
+    conn.commit()
+    _counts["stored"] += 1
+    _evict(conn, now)
+
+
+def _evict(conn: sqlite3.Connection, now: float) -> None:
+    with _evict_lock:
+        removed = conn.execute("DELETE FROM entries WHERE expires <= ?", (now,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total > MAX_BYTES:
+            # Free a little extra so the next few writes do not each evict
+            target, victims = total - int(MAX_BYTES * 0.9), []
+            for k, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+                victims.append((k,))
+                target -= size
+                if target <= 0:
+                    break
+            conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+            removed += len(victims)
+        conn.commit()
+        _counts["evicted"] += removed
+
+
+async def aget(k: str) -> Optional[Tuple[dict, bytes]]:
+    if not enabled():
+        return None
+    return await asyncio.to_thread(get, k)
+
+
+async def aput(k: str, meta: dict, body: bytes) -> None:
+    if enabled():
+        await asyncio.to_thread(put, k, meta, body)
+
+
+def stats() -> dict:
+    out = {"enabled": enabled(), **_counts}
+    if enabled():
+        entries, size = _conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        out.update(entries=entries, bytes=size, maxBytes=MAX_BYTES)
+    return out
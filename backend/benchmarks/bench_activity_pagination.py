@@ -0,0 +1,97 @@
+"""Activity history page latency vs depth: keyset cursor vs OFFSET.
+
+Seeds --events activities for one device (plus other devices' noise), then walks
+/api/profile/activity page by page and reports latency near the start and the
+end. The same depths are timed with an OFFSET query for comparison. Run from
+backend/:
+
+    python -m benchmarks.bench_activity_pagination --events 100000
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import insert, text
+
+from .harness import run_app
+
+DEVICE = "bench-activity"
+
+
+def _seed(n: int):
+    from app import models
+    from app.db import SessionLocal
+
+    start = datetime.utcnow() - timedelta(days=365)
+    with SessionLocal() as db:
+        for offset in range(0, n, 10000):
+            rows = []
+            for i in range(offset, min(n, offset + 10000)):
+                ts = start + timedelta(seconds=i * 30)
+                rows.append({"device_id": DEVICE, "type": "add_points" if i % 3 else "award_badge", "meta": {"i": i}, "created_at": ts})
+                rows.append({"device_id": f"other-{i % 500}", "type": "add_points", "meta": {}, "created_at": ts})
+            db.execute(insert(models.Activity), rows)
+        db.commit()
+        plan = db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM activities WHERE device_id = :d AND (created_at, id) < (:c, :i) "
+            "ORDER BY created_at DESC, id DESC LIMIT 51"
+        ), {"d": DEVICE, "c": datetime.utcnow(), "i": 1}).fetchall()
+        print("plan:", "; ".join(r[-1] for r in plan))
+
+
+def _offset_ms(depth_rows: int, limit: int) -> float:
+    from app.db import SessionLocal
+
+    with SessionLocal() as db:
+        t = time.perf_counter()
+        db.execute(text(
+            "SELECT id, type, meta, created_at FROM activities WHERE device_id = :d "
+            "ORDER BY created_at DESC, id DESC LIMIT :l OFFSET :o"
+        ), {"d": DEVICE, "l": limit, "o": depth_rows}).fetchall()
+        return (time.perf_counter() - t) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=100000)
+    ap.add_argument("--limit", type=int, default=200)
+    args = ap.parse_args()
+
+    with run_app() as base:
+        t = time.perf_counter()
+        _seed(args.events)
+        print(f"seeded {args.events} events in {time.perf_counter() - t:.1f}s")
+
+        latencies = []
+        cursor = None
+        with httpx.Client(base_url=base, timeout=30) as client:
+            while True:
+                params = {"deviceId": DEVICE, "limit": args.limit}
+                if cursor:
+                    params["cursor"] = cursor
+                t = time.perf_counter()
+                page = client.get("/api/profile/activity", params=params).json()
+                latencies.append((time.perf_counter() - t) * 1000)
+                cursor = page["next_cursor"]
+                if not cursor:
+                    break
+            pages = len(latencies)
+            bucket = max(1, pages // 10)
+            print(f"keyset: {pages} pages  first {bucket}: p50={statistics.median(latencies[:bucket]):.2f}ms  "
+                  f"last {bucket}: p50={statistics.median(latencies[-bucket:]):.2f}ms")
+            print(f"offset: depth 0: {_offset_ms(0, args.limit):.2f}ms  "
+                  f"depth {args.events - args.limit}: {_offset_ms(args.events - args.limit, args.limit):.2f}ms")
+
+            t = time.perf_counter()
+            lines = 0
+            with client.stream("GET", "/api/profile/activity", params={"deviceId": DEVICE, "format": "ndjson"}) as r:
+                for _ in r.iter_lines():
+                    lines += 1
+            print(f"ndjson export: {lines} lines in {(time.perf_counter() - t) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
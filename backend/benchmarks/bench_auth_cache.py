@@ -0,0 +1,79 @@
+"""Cost of resolving the current user, with and without the token/user caches.
+
+Times get_current_user directly (JWT verify + users SELECT vs cache hits) and
+end-to-end /api/auth/me over HTTP, then prints cache hit ratios. The uncached
+run sets both cache sizes to 0 in a separate process. Run from backend/:
+
+    python -m benchmarks.bench_auth_cache --requests 2000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+CONFIGS = {
+    "uncached": {"AUTH_TOKEN_CACHE_SIZE": "0", "AUTH_USER_CACHE_SIZE": "0"},
+    "cached": {},
+}
+
+
+def run_one(n: int) -> dict:
+    os.environ.setdefault("PASSWORD_WORKERS", "0")
+    from .harness import run_app
+
+    with run_app() as base:
+        from app.db import SessionLocal
+        from app.routers import auth
+
+        r = httpx.post(f"{base}/api/auth/register", json={"email": "cache@example.com", "password": "pw"}, timeout=30)
+        header = f"Bearer {r.json()['access_token']}"
+
+        direct = []
+        with SessionLocal() as db:
+            for _ in range(n):
+                t = time.perf_counter()
+                auth.get_current_user(authorization=header, db=db)
+                direct.append((time.perf_counter() - t) * 1e6)
+                db.expunge_all()
+
+        http = []
+        with httpx.Client(base_url=base) as client:
+            for _ in range(n):
+                t = time.perf_counter()
+                client.get("/api/auth/me", headers={"Authorization": header}).raise_for_status()
+                http.append((time.perf_counter() - t) * 1000)
+        stats = auth.auth_cache_stats()
+    ratio = lambda s: round(s["hits"] / max(1, s["hits"] + s["misses"]), 3)
+    return {
+        "resolve_us_p50": round(statistics.median(direct), 1),
+        "me_ms_p50": round(statistics.median(http), 3),
+        "token_hit_ratio": ratio(stats["tokens"]),
+        "user_hit_ratio": ratio(stats["users"]),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.requests)))
+        return
+    for name, env in CONFIGS.items():
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_auth_cache", "--child", "--requests", str(args.requests)],
+            env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        )
+        print(f"{name:<9} {proc.stdout.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Chat response cache: hit rates by tier and upstream calls saved.
+
+Replays a stream of farmer questions (a handful of topics, each asked in
+several phrasings, spellings and scripts) through services.ai_chat.chat against
+a stub Ollama that answers after --upstream-ms. Each config runs in its own
+process: cache off, exact tier only, exact + similarity tier. Run from backend/:
+
+    python -m benchmarks.bench_chat_cache --questions 400 --upstream-ms 300
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from .stub_server import StubServer, json_handler
+
+TOPICS = [
+    ["Best fertilizer for wheat?", "best fertiliser for gehun", "wheat fertilizer?", "गेहूं के लिए खाद", "What is the best fertilizer for wheat"],
+    ["How much water does paddy need?", "how much water does rice need", "paddy water need?", "dhan water need"],
+    ["When to sow mustard?", "when to sow mustard", "mustard sowing time?", "Mustard sowing time"],
+    ["How to improve soil health?", "how to improve mitti health", "improve soil health", "Improve my soil health?"],
+    ["Pesticide for cotton bollworm", "cotton bollworm pesticide?", "pesticides for cotton bollworm", "bollworm in cotton pesticide"],
+    ["Which scheme gives crop insurance?", "crop insurance scheme?", "which yojana gives fasal insurance", "crop insurance yojana"],
+    ["Tomato price trend this month", "tomato prices this month?", "tomato bhav this month"],
+    ["Drip irrigation subsidy", "subsidy for drip irrigation?", "drip sinchai subsidy"],
+]
+UNIQUE = ["My cow stopped eating since {n} days", "Is {n} kg urea per acre too much?", "Field {n} has yellow leaves"]
+
+CONFIGS = {
+    "off": {"CHAT_CACHE_SIZE": "0"},
+    "exact": {"CHAT_CACHE_SIMILARITY": "0"},
+    "exact+similar": {"CHAT_CACHE_SIMILARITY": "0.7"},
+}
+
+
+def _questions(n: int) -> list:
+    rng = random.Random(42)
+    out = []
+    for i in range(n):
+        if rng.random() < 0.2:
+            out.append(rng.choice(UNIQUE).format(n=i))
+        else:
+            out.append(rng.choice(rng.choice(TOPICS)))
+    return out
+
+
+async def _replay(questions: list) -> dict:
+    from app.services import ai_chat, chat_cache, http_clients
+
+    lat = []
+    for q in questions:
+        t = time.perf_counter()
+        await ai_chat.chat(q)
+        lat.append((time.perf_counter() - t) * 1000)
+    await http_clients.aclose_all()
+    stats = chat_cache.stats()
+    hits = sorted(x for x in lat if x < 50)
+    return {
+        "mean_ms": round(statistics.mean(lat), 1),
+        "hit_p50_ms": round(statistics.median(hits), 3) if hits else None,
+        "hit_rate": stats["hitRate"],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--questions", type=int, default=400)
+    ap.add_argument("--upstream-ms", type=float, default=300)
+    ap.add_argument("--child", choices=list(CONFIGS), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_replay(_questions(args.questions)))))
+        return
+    for name, env in CONFIGS.items():
+        with StubServer(json_handler({"message": {"content": "Use balanced NPK."}}), latency_ms=args.upstream_ms) as ollama:
+            env = {**os.environ, **env, "OLLAMA_BASE": ollama.url, "OPENROUTER_API_KEY": "", "OPENAI_API_KEY": ""}
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_chat_cache", "--child", name,
+                 "--questions", str(args.questions), "--upstream-ms", str(args.upstream_ms)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            print(f"{name:<14} upstream_calls={ollama.requests:<4} {proc.stdout.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    main()
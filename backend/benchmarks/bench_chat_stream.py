@@ -0,0 +1,69 @@
+"""Time-to-first-token and total latency of /api/ai/chat vs /api/ai/chat/stream.
+
+A stub Ollama starts answering after --first-token-ms and then streams --tokens
+NDJSON chunks --token-ms apart; with stream=false it returns the whole answer
+after the same total time. Each
+question is unique so the chat cache never answers. Run from backend/:
+
+    python -m benchmarks.bench_chat_stream --requests 10 --first-token-ms 400 --tokens 60 --token-ms 40
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+import httpx
+
+from .harness import run_app
+from .stub_server import StubServer
+
+
+def _ollama(tokens: int):
+    words = [f"word{i} " for i in range(tokens)]
+    whole = json.dumps({"message": {"content": "".join(words)}, "done": True}).encode()
+    stream = [json.dumps({"message": {"content": w}, "done": False}).encode() + b"\n" for w in words]
+    stream.append(json.dumps({"message": {"content": ""}, "done": True}).encode() + b"\n")
+
+    def handle(method: str, path: str, body: bytes):
+        if json.loads(body).get("stream"):
+            return 200, {"Content-Type": "application/x-ndjson"}, stream
+        return 200, {"Content-Type": "application/json"}, whole
+
+    return handle
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=10)
+    ap.add_argument("--first-token-ms", type=float, default=400)
+    ap.add_argument("--tokens", type=int, default=60)
+    ap.add_argument("--token-ms", type=float, default=40)
+    args = ap.parse_args()
+
+    generation_ms = args.first_token_ms + (args.tokens - 1) * args.token_ms
+    blocking = StubServer(_ollama(args.tokens), latency_ms=generation_ms)
+    streaming = StubServer(_ollama(args.tokens), latency_ms=args.first_token_ms, chunk_ms=args.token_ms)
+    results = {}
+    with blocking, streaming, run_app({"OPENROUTER_API_KEY": "", "OPENAI_API_KEY": ""}) as base:
+        with httpx.Client(base_url=base, timeout=60) as client:
+            for path, stub in (("/api/ai/chat", blocking), ("/api/ai/chat/stream", streaming)):
+                os.environ["OLLAMA_BASE"] = stub.url  # read per call
+                ttft, total = [], []
+                for i in range(args.requests):
+                    t = time.perf_counter()
+                    first = None
+                    with client.stream("POST", path, json={"message": f"{path} question {i}?"}) as r:
+                        for chunk in r.iter_raw():
+                            if first is None and chunk:
+                                first = time.perf_counter() - t
+                    total.append((time.perf_counter() - t) * 1000)
+                    ttft.append(first * 1000)
+                results[path] = (statistics.median(ttft), statistics.median(total))
+    for label, (f, t) in results.items():
+        print(f"{label:<20} TTFT p50={f:8.1f}ms  total p50={t:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
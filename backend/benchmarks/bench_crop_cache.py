@@ -0,0 +1,119 @@
+"""Crop suggestions: LLM per request vs cache vs precomputed table.
+
+Replays --requests crop queries (Zipf-popular districts, seasons and soils
+spelled several ways, a few with a crop type) against a fake LLM that answers
+after --upstream-ms. Each config runs in its own process on a fresh SQLite DB:
+  - llm:         every request calls the LLM (the old behaviour)
+  - cache:       crop_cache.read_through starting cold
+  - precomputed: the precompute job fills the grid for the top --precompute
+                 districts first and the warm-up loads it, then the replay
+Run from backend/:
+
+    python -m benchmarks.bench_crop_cache --requests 2000 --districts 300 --precompute 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CONFIGS = ("llm", "cache", "precomputed")
+SEASONS = ["Kharif", "kharif", "Monsoon", "Rabi", "rabi season", "Winter", "Zaid", "summer"]
+SOILS = [
+    "Alluvial", "alluvial soil", "Black", "black cotton soil", "Regur", "Red", "red soil", "Laterite",
+    "Desert", "Loamy", "loam", "Sandy loam", "Clay", "Clayey", "Saline", "Mountain",
+]
+CARDS = [{"crop": "Soybean", "emoji": "🌱", "score": 80, "category": "Pulse", "sowing_window": "Jun-Jul",
+          "water_need": "medium", "yield_range": "1-2 t/ha", "reasons": ["Fits soil", "Good demand"]}]
+
+
+def _district(i: int, rng: random.Random) -> str:
+    name = f"District {i:03d}"
+    return rng.choice([name, name.upper(), f"{name} district", f" {name.lower()} "])
+
+
+def _requests(n: int, districts: int) -> list:
+    rng = random.Random(7)
+    weights = [1 / (i + 1) for i in range(districts)]
+    out = []
+    for _ in range(n):
+        i = rng.choices(range(districts), weights)[0]
+        crop_type = "pulses" if rng.random() < 0.1 else None
+        out.append((_district(i, rng), rng.choice(SEASONS), rng.choice(SOILS), rng.random() < 0.5, crop_type))
+    return out
+
+
+async def _run(config: str, args) -> dict:
+    from app.db import Base, engine
+    from app.services import crop_cache
+
+    Base.metadata.create_all(bind=engine)
+    calls = 0
+
+    async def llm(region, season, soil, market_demand, crop_type):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(args.upstream_ms / 1000)
+        return CARDS
+
+    out = {}
+    if config == "precomputed":
+        t = time.perf_counter()
+        counts = await crop_cache.precompute([f"District {i:03d}" for i in range(args.precompute)], llm, concurrency=16)
+        out["precompute"] = {**counts, "seconds": round(time.perf_counter() - t, 1)}
+        out["warmed"] = crop_cache._warm()
+        calls = 0
+
+    lat = []
+    for req in _requests(args.requests, args.districts):
+        t = time.perf_counter()
+        if config == "llm":
+            await llm(*req)
+        else:
+            await crop_cache.read_through(*req, llm)
+        lat.append((time.perf_counter() - t) * 1000)
+    lat.sort()
+    out.update(
+        llm_calls=calls,
+        mean_ms=round(statistics.mean(lat), 2),
+        p50_ms=round(lat[len(lat) // 2], 3),
+        p95_ms=round(lat[int(len(lat) * 0.95) - 1], 2),
+    )
+    if config != "llm":
+        stats = crop_cache.stats()
+        out.update(hit_rate=stats["hitRate"], coverage=stats["table"]["coverage"], rows=stats["table"]["rows"])
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--districts", type=int, default=300)
+    ap.add_argument("--precompute", type=int, default=100, help="top districts to precompute")
+    ap.add_argument("--upstream-ms", type=float, default=50)
+    ap.add_argument("--child", choices=CONFIGS, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_run(args.child, args)), ensure_ascii=False))
+        return
+    for name in CONFIGS:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp}/bench.db"}
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_crop_cache", "--child", name,
+                 "--requests", str(args.requests), "--districts", str(args.districts),
+                 "--precompute", str(args.precompute), "--upstream-ms", str(args.upstream_ms)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+        print(f"{name:<12} {proc.stdout.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Concurrent profile reads and writes under different database configurations.
+
+Each configuration runs in its own process (db.py reads env at import). Writer
+threads call /api/profile/add-points, reader threads poll /api/profile, for a
+fixed duration. Run from backend/:
+
+    python -m benchmarks.bench_db_config --seconds 10
+    python -m benchmarks.bench_db_config --pg postgresql+psycopg2://user:pw@localhost/bench
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+CONFIGS = {
+    "sqlite-rollback": {"SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL", "SQLITE_MMAP_SIZE": "0", "DB_POOL_SIZE": "5", "DB_MAX_OVERFLOW": "10"},
+    "sqlite-wal": {"SQLITE_JOURNAL_MODE": "WAL", "SQLITE_SYNCHRONOUS": "NORMAL"},
+}
+
+
+def _pct(xs, q):
+    return xs[min(len(xs) - 1, int(len(xs) * q))] if xs else float("nan")
+
+
+def run_one(seconds: float, writers: int, readers: int) -> dict:
+    from .harness import run_app
+
+    with run_app() as base:
+        devices = [f"dev-{i}" for i in range(writers)]
+        for d in devices:
+            httpx.post(f"{base}/api/profile/init", json={"device_id": d}).raise_for_status()
+        stop = time.perf_counter() + seconds
+        lat = {"write": [], "read": []}
+        errors = {"write": 0, "read": 0}
+        lock = threading.Lock()
+
+        def loop(kind: str, device: str):
+            with httpx.Client(base_url=base, timeout=60) as client:
+                while time.perf_counter() < stop:
+                    t = time.perf_counter()
+                    try:
+                        if kind == "write":
+                            r = client.post("/api/profile/add-points", json={"device_id": device, "delta": 1})
+                        else:
+                            r = client.get("/api/profile", params={"deviceId": device})
+                        ok = r.status_code == 200
+                    except httpx.HTTPError:
+                        ok = False
+                    dt = (time.perf_counter() - t) * 1000
+                    with lock:
+                        if ok:
+                            lat[kind].append(dt)
+                        else:
+                            errors[kind] += 1
+
+        threads = [threading.Thread(target=loop, args=("write", d)) for d in devices]
+        threads += [threading.Thread(target=loop, args=("read", devices[i % writers])) for i in range(readers)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+    out = {}
+    for kind, xs in lat.items():
+        xs.sort()
+        out[kind] = {
+            "rps": round(len(xs) / seconds, 1),
+            "p50": round(statistics.median(xs), 2) if xs else None,
+            "p99": round(_pct(xs, 0.99), 2),
+            "errors": errors[kind],
+        }
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--writers", type=int, default=8)
+    ap.add_argument("--readers", type=int, default=16)
+    ap.add_argument("--pg", help="Postgres URL to include pooled-Postgres runs")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.seconds, args.writers, args.readers)))
+        return
+
+    configs = dict(CONFIGS)
+    if args.pg:
+        configs["postgres-default-pool"] = {"DATABASE_URL": args.pg, "DB_POOL_SIZE": "5", "DB_MAX_OVERFLOW": "10", "DB_POOL_PRE_PING": "0"}
+        configs["postgres-tuned-pool"] = {"DATABASE_URL": args.pg, "DB_POOL_SIZE": "20", "DB_MAX_OVERFLOW": "20"}
+    for name, env in configs.items():
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_db_config", "--child", "--seconds", str(args.seconds),
+             "--writers", str(args.writers), "--readers", str(args.readers)],
+            env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        )
+        res = json.loads(proc.stdout.strip().splitlines()[-1])
+        for kind in ("write", "read"):
+            r = res[kind]
+            print(f"{name:<22} {kind:<5} {r['rps']:>8} req/s  p50={r['p50']}ms  p99={r['p99']}ms  errors={r['errors']}")
+
+
+if __name__ == "__main__":
+    main()
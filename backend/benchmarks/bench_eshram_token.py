@@ -0,0 +1,108 @@
+"""e-Shram auth token refreshes under concurrent validate calls.
+
+A local stub plays both generateAuthToken (counting requests) and
+validateUserByUanAndDob, answering after --latency-ms. Each wave fires
+--callers concurrent validate_uan calls after moving a fake clock:
+  - old dict cache, token expired: the per-process dict the service used before
+  - manager, token expired:        TokenManager with no valid token left
+  - manager, refresh window:       TokenManager past ESHRAM_TOKEN_REFRESH_AT
+Run from backend/:
+
+    python -m benchmarks.bench_eshram_token --callers 100 --waves 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from .stub_server import StubServer
+
+TTL = 1500
+
+
+class Upstream:
+    def __init__(self):
+        self.auth_requests = 0
+
+    def __call__(self, method: str, path: str, body: bytes):
+        if path.endswith("/generateAuthToken"):
+            self.auth_requests += 1
+            payload = {"data": {"token": f"t{self.auth_requests}", "expires_in": TTL}}
+        else:
+            payload = {"status": "valid"}
+        return 200, {"Content-Type": "application/json"}, json.dumps(payload).encode()
+
+
+def _old_get_token(eshram):
+    # The module-level dict the service used before TokenManager
+    cache = {"token": None, "exp": 0.0}
+
+    async def get() -> str:
+        if cache["token"] and eshram._now() < cache["exp"]:
+            return cache["token"]
+        token, ttl = await eshram._fetch_token()
+        cache["token"], cache["exp"] = token, eshram._now() + max(60, ttl - 30)
+        return token
+
+    return get
+
+
+async def _waves(eshram, clock: list, step: float, callers: int, waves: int) -> list:
+    lat = []
+
+    async def one():
+        t = time.perf_counter()
+        await eshram.validate_uan("100000000001", "1990-01-31")
+        lat.append((time.perf_counter() - t) * 1000)
+
+    for _ in range(waves):
+        clock[0] += step
+        await asyncio.gather(*(one() for _ in range(callers)))
+        await asyncio.sleep(0.2)  # let background refreshes land before the next wave
+    return lat
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--callers", type=int, default=100)
+    ap.add_argument("--waves", type=int, default=5)
+    ap.add_argument("--latency-ms", type=float, default=50)
+    args = ap.parse_args()
+
+    upstream = Upstream()
+    with StubServer(upstream, latency_ms=args.latency_ms) as stub:
+        os.environ.update(ESHRAM_BASE_URL=stub.url, ESHRAM_CLIENT_ID="bench", ESHRAM_CLIENT_SECRET="bench")
+        os.environ.setdefault("HTTP_ESHRAM_MAX_CONNECTIONS", str(args.callers))
+        from app.services import eshram, http_clients
+
+        clock = [1_000_000.0]
+        eshram._now = lambda: clock[0]
+        refresh_step = TTL * eshram.TOKEN_REFRESH_AT + 1
+        configs = [
+            ("old dict cache, token expired", TTL, True),
+            ("manager, token expired", TTL, False),
+            ("manager, refresh window", refresh_step, False),
+        ]
+
+        async def run():
+            for label, step, old in configs:
+                eshram.tokens = eshram.TokenManager(eshram._fetch_token)
+                if old:
+                    eshram.tokens.get = _old_get_token(eshram)
+                await eshram.tokens.get()  # start every config with a fresh token
+                before = upstream.auth_requests
+                lat = sorted(await _waves(eshram, clock, step, args.callers, args.waves))
+                print(
+                    f"{label:<31} auth_requests={upstream.auth_requests - before:<4} "
+                    f"p50={statistics.median(lat):7.1f}ms  p95={lat[int(len(lat) * 0.95) - 1]:7.1f}ms"
+                )
+            await http_clients.aclose_all()
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
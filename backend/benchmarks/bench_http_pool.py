@@ -0,0 +1,64 @@
+"""Per-request client vs the shared pooled client, against a local stub.
+
+The stub delays each new connection by --handshake-ms to model TCP+TLS setup
+to a remote upstream. Run from backend/:
+
+    python -m benchmarks.bench_http_pool --requests 200 --handshake-ms 40
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.services import http_clients
+from .stub_server import StubServer, json_handler
+
+
+def _report(label: str, samples: list, server: StubServer, conns_before: int):
+    samples = sorted(samples)
+    p50 = statistics.median(samples) * 1000
+    p95 = samples[int(len(samples) * 0.95) - 1] * 1000
+    print(f"{label:<22} p50={p50:7.2f}ms  p95={p95:7.2f}ms  connections={server.connections - conns_before}")
+
+
+async def _fresh_client(url: str, n: int) -> list:
+    out = []
+    for _ in range(n):
+        t = time.perf_counter()
+        async with httpx.AsyncClient(timeout=10) as client:
+            (await client.get(url)).raise_for_status()
+        out.append(time.perf_counter() - t)
+    return out
+
+
+async def _pooled_client(url: str, n: int) -> list:
+    client = http_clients.get_async_client("weather")
+    out = []
+    for _ in range(n):
+        t = time.perf_counter()
+        (await client.get(url)).raise_for_status()
+        out.append(time.perf_counter() - t)
+    await http_clients.aclose_all()
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--handshake-ms", type=float, default=40)
+    ap.add_argument("--latency-ms", type=float, default=2)
+    args = ap.parse_args()
+
+    with StubServer(json_handler({"main": {"temp": 30}}), args.handshake_ms, args.latency_ms) as server:
+        url = f"{server.url}/data/2.5/weather"
+        before = server.connections
+        _report("client per request", asyncio.run(_fresh_client(url, args.requests)), server, before)
+        before = server.connections
+        _report("shared pooled client", asyncio.run(_pooled_client(url, args.requests)), server, before)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Leaderboard at scale: in-memory RankIndex vs ranking with SQL.
+
+Fills a temp SQLite DB with N profiles (zipf-ish points), then times:
+  - leaderboard.reload() (startup load from the DB)
+  - rank / around / top / point updates on the in-memory index
+  - the per-request SQL alternative: COUNT(*) WHERE points > ? and ORDER BY LIMIT,
+    with and without an index on points
+Run from backend/:
+
+    python -m benchmarks.bench_leaderboard --profiles 1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+
+def _timed(fn, n: int) -> float:
+    """Median microseconds per call over n calls."""
+    samples = []
+    for _ in range(n):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--profiles", type=int, default=1_000_000)
+    ap.add_argument("--ops", type=int, default=20_000)
+    ap.add_argument("--sql-ops", type=int, default=20)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+    from app.db import Base, engine
+    from app.services import leaderboard
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    ids = [f"dev-{i:07d}" for i in range(args.profiles)]
+    conn = sqlite3.connect(f"{tmp}/bench.db")
+    with conn:
+        conn.executemany(
+            "INSERT INTO profiles (device_id, points, badges, streak_days) VALUES (?, ?, '[]', 0)",
+            ((d, int(rng.paretovariate(1.2) * 10)) for d in ids),
+        )
+    print(f"profiles: {args.profiles:,}")
+
+    t = time.perf_counter()
+    leaderboard.reload()
+    print(f"reload from DB: {time.perf_counter() - t:.2f}s")
+
+    pick = lambda: rng.choice(ids)
+    print("in-memory (median us/op):")
+    print(f"  rank     {_timed(lambda: leaderboard.rank(pick()), args.ops):8.1f}")
+    print(f"  around±5 {_timed(lambda: leaderboard.around(pick(), 5), args.ops):8.1f}")
+    print(f"  top 10   {_timed(lambda: leaderboard.top(10), args.ops):8.1f}")
+    print(f"  update   {_timed(lambda: leaderboard.update(pick(), rng.randint(0, 5000)), args.ops):8.1f}")
+
+    def sql_rank():
+        d = pick()
+        (pts,) = conn.execute("SELECT points FROM profiles WHERE device_id = ?", (d,)).fetchone()
+        conn.execute("SELECT COUNT(*) FROM profiles WHERE points > ?", (pts,)).fetchone()
+
+    def sql_top():
+        conn.execute("SELECT device_id, points FROM profiles ORDER BY points DESC, device_id LIMIT 10").fetchall()
+
+    for label in ("no index on points", "index on points"):
+        if label == "index on points":
+            conn.execute("CREATE INDEX ix_bench_points ON profiles (points)")
+        print(f"SQL, {label} (median us/op):")
+        print(f"  rank     {_timed(sql_rank, args.sql_ops):8.1f}")
+        print(f"  top 10   {_timed(sql_top, args.sql_ops):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Login throughput and collateral latency while bcrypt saturates the worker.
+
+Runs each configuration in its own process: 'threadpool' hashes inline in the
+AnyIO threadpool (the old behaviour), 'process-pool' uses the dedicated bcrypt
+pool with admission control. Login clients hammer /api/auth/login while a probe
+polls /api/profile. Run from backend/:
+
+    python -m benchmarks.bench_login_pool --seconds 10 --clients 32
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+CONFIGS = {
+    "threadpool": {"PASSWORD_WORKERS": "0", "PASSWORD_QUEUE_DEPTH": "100000"},
+    "process-pool": {},
+}
+
+
+def run_one(seconds: float, clients: int) -> dict:
+    from .harness import run_app
+
+    with run_app() as base:
+        httpx.post(f"{base}/api/auth/register", json={"email": "bench@example.com", "password": "pw"}, timeout=30).raise_for_status()
+        httpx.post(f"{base}/api/profile/init", json={"device_id": "probe"}).raise_for_status()
+        stop = time.perf_counter() + seconds
+        counts = {"ok": 0, "busy": 0, "error": 0}
+        login_ms, probe_ms = [], []
+        lock = threading.Lock()
+
+        def login_loop():
+            with httpx.Client(base_url=base, timeout=60) as client:
+                while time.perf_counter() < stop:
+                    t = time.perf_counter()
+                    try:
+                        status = client.post("/api/auth/login", json={"email": "bench@example.com", "password": "pw"}).status_code
+                    except httpx.HTTPError:
+                        status = None
+                    with lock:
+                        if status == 200:
+                            counts["ok"] += 1
+                            login_ms.append((time.perf_counter() - t) * 1000)
+                        elif status == 503:
+                            counts["busy"] += 1
+                            time.sleep(0.05)
+                        else:
+                            counts["error"] += 1
+
+        def probe_loop():
+            with httpx.Client(base_url=base, timeout=60) as client:
+                while time.perf_counter() < stop:
+                    t = time.perf_counter()
+                    client.get("/api/profile", params={"deviceId": "probe"})
+                    probe_ms.append((time.perf_counter() - t) * 1000)
+                    time.sleep(0.05)
+
+        threads = [threading.Thread(target=login_loop) for _ in range(clients)] + [threading.Thread(target=probe_loop)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+    probe_ms.sort()
+    return {
+        "logins_per_s": round(counts["ok"] / seconds, 1),
+        "login_p50": round(statistics.median(login_ms), 1) if login_ms else None,
+        "rejected_503": counts["busy"],
+        "errors": counts["error"],
+        "profile_p50": round(statistics.median(probe_ms), 1),
+        "profile_p99": round(probe_ms[min(len(probe_ms) - 1, int(len(probe_ms) * 0.99))], 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.seconds, args.clients)))
+        return
+    for name, env in CONFIGS.items():
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_login_pool", "--child", "--seconds", str(args.seconds), "--clients", str(args.clients)],
+            env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        )
+        print(f"{name:<14} {proc.stdout.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Cost of the /api/metrics instrumentation.
+
+Drives the app in-process through httpx's ASGI transport (no sockets, so the
+difference is not lost in network noise) with METRICS_ENABLED=0 and =1, each in
+its own process: GET /api/health (middleware only) and POST /api/profile/add-points
+(middleware + DB statements + a transaction + cache refresh). Also times a bare
+Histogram.observe() and a scrape. Run from backend/:
+
+    python -m benchmarks.bench_metrics_overhead --requests 5000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROUNDS = 5
+
+
+async def _per_request_us(client: httpx.AsyncClient, n: int, call) -> float:
+    # Best of several rounds: the floor is the cost we add, the rest is scheduling noise
+    best = float("inf")
+    for _ in range(ROUNDS):
+        t = time.perf_counter()
+        for _ in range(n):
+            await call(client)
+        best = min(best, (time.perf_counter() - t) / n * 1e6)
+    return best
+
+
+async def _child(n: int) -> dict:
+    from app import db
+    from app.main import app
+    from app.services import metrics
+
+    db.create_schema()  # the ASGI transport does not run the lifespan
+    out = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/api/profile/init", json={"device_id": "bench", "user_name": "b"})
+        out["health_us"] = round(await _per_request_us(client, n, lambda c: c.get("/api/health")), 1)
+        out["add_points_us"] = round(
+            await _per_request_us(
+                client, n // 5, lambda c: c.post("/api/profile/add-points", json={"device_id": "bench", "delta": 1})
+            ),
+            1,
+        )
+        if metrics.ENABLED:
+            t = time.perf_counter()
+            scrape = (await client.get("/api/metrics")).text
+            out["scrape_ms"] = round((time.perf_counter() - t) * 1000, 2)
+            out["scrape_lines"] = len(scrape.splitlines())
+
+    if metrics.ENABLED:
+        h = metrics.Histogram("bench_seconds", "bench", ("a",))
+        labels = ("x",)
+        t = time.perf_counter()
+        for i in range(200_000):
+            h.observe(labels, 0.003)
+        out["observe_ns"] = round((time.perf_counter() - t) / 200_000 * 1e9)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=5000)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child(args.requests))))
+        return
+    results = {}
+    for enabled in ("0", "1"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {**os.environ, "METRICS_ENABLED": enabled, "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+                   "SCHEMES_INDEX_PATH": f"{tmp}/schemes_index.db"}
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_metrics_overhead", "--child", "--requests", str(args.requests)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+        results[enabled] = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"METRICS_ENABLED={enabled} {results[enabled]}")
+    off, on = results["0"], results["1"]
+    for key in ("health_us", "add_points_us"):
+        delta = on[key] - off[key]
+        print(f"{key:<14} +{delta:.1f}us per request ({delta / off[key] * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
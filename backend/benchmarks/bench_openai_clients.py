@@ -0,0 +1,91 @@
+"""Per-call OpenAI SDK client construction vs the shared client registry.
+
+Against a local OpenAI-compatible stub whose new connections cost
+--handshake-ms, times one chat completion per iteration with
+  - a fresh AsyncOpenAI(...) per call (the old provider code)
+  - http_clients.get_openai_client(...)
+and, with no network involved, the cost of building a client vs fetching
+it from the registry. Run from backend/:
+
+    python -m benchmarks.bench_openai_clients --requests 200 --handshake-ms 40
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services import http_clients
+from .stub_server import StubServer, json_handler
+
+COMPLETION = {
+    "id": "cmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "stub",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Use balanced NPK."}, "finish_reason": "stop"}],
+}
+
+
+async def _call(client) -> None:
+    await client.chat.completions.create(model="stub", messages=[{"role": "user", "content": "hi"}], max_tokens=5)
+
+
+async def _per_call(base_url: str, n: int) -> list:
+    from openai import AsyncOpenAI
+
+    out = []
+    for _ in range(n):
+        t = time.perf_counter()
+        client = AsyncOpenAI(api_key="bench", base_url=base_url)
+        await _call(client)
+        out.append(time.perf_counter() - t)
+        await client.close()  # untimed; the old code left this to the garbage collector
+    return out
+
+
+async def _registry(base_url: str, n: int) -> list:
+    out = []
+    for _ in range(n):
+        t = time.perf_counter()
+        await _call(http_clients.get_openai_client(base_url, "bench"))
+        out.append(time.perf_counter() - t)
+    await http_clients.aclose_all()
+    return out
+
+
+def _construct(n: int) -> tuple:
+    from openai import AsyncOpenAI
+
+    t = time.perf_counter()
+    for _ in range(n):
+        AsyncOpenAI(api_key="bench", base_url="http://127.0.0.1:1/v1")
+    build = (time.perf_counter() - t) / n
+    http_clients.get_openai_client("http://127.0.0.1:1/v1", "bench")
+    t = time.perf_counter()
+    for _ in range(n):
+        http_clients.get_openai_client("http://127.0.0.1:1/v1", "bench")
+    lookup = (time.perf_counter() - t) / n
+    return build, lookup
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--handshake-ms", type=float, default=40)
+    args = ap.parse_args()
+
+    build, lookup = _construct(200)
+    print(f"client setup only: AsyncOpenAI() {build * 1e6:8.1f}us   registry lookup {lookup * 1e6:6.2f}us")
+    with StubServer(json_handler(COMPLETION), handshake_ms=args.handshake_ms) as stub:
+        base_url = stub.url + "/v1"
+        for label, fn in (("new client per call", _per_call), ("shared registry", _registry)):
+            before = stub.connections
+            samples = sorted(asyncio.run(fn(base_url, args.requests)))
+            p50 = statistics.median(samples) * 1000
+            p95 = samples[int(len(samples) * 0.95) - 1] * 1000
+            print(f"{label:<20} p50={p50:7.2f}ms  p95={p95:7.2f}ms  connections={stub.connections - before}")
+
+
+if __name__ == "__main__":
+    main()
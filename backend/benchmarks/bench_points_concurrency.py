@@ -0,0 +1,78 @@
+"""Hammer one device with parallel add-points and redeem calls, then check the books.
+
+Every successful call is counted client-side; the final Profile.points must equal
+that expected balance and the sum of the points ledger, with no negative balance.
+Run from backend/:
+
+    python -m benchmarks.bench_points_concurrency --threads 16 --ops 50
+"""
+
+import argparse
+import random
+import threading
+import time
+
+import httpx
+
+from .harness import run_app
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--ops", type=int, default=50, help="calls per thread")
+    args = ap.parse_args()
+
+    with run_app() as base:
+        from app.db import SessionLocal
+        from app.services.points import ledger_balance
+
+        device = "stress-device"
+        httpx.post(f"{base}/api/profile/init", json={"device_id": device}).raise_for_status()
+        lock = threading.Lock()
+        totals = {"expected": 0, "ok": 0, "rejected": 0, "errors": 0}
+
+        def worker(seed: int):
+            rnd = random.Random(seed)
+            with httpx.Client(base_url=base, timeout=30) as client:
+                for _ in range(args.ops):
+                    try:
+                        if rnd.random() < 0.6:
+                            delta = rnd.randint(1, 10)
+                            r = client.post("/api/profile/add-points", json={"device_id": device, "delta": delta})
+                        else:
+                            delta = -rnd.randint(5, 20)
+                            r = client.post("/api/rewards/redeem", json={"device_id": device, "item_id": "x", "item_name": "X", "cost": -delta})
+                        status = r.status_code
+                    except httpx.HTTPError:
+                        status = None
+                    with lock:
+                        if status == 200:
+                            totals["expected"] += delta
+                            totals["ok"] += 1
+                        elif status == 400:
+                            totals["rejected"] += 1
+                        else:
+                            totals["errors"] += 1
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+        t = time.perf_counter()
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        elapsed = time.perf_counter() - t
+
+        final = httpx.get(f"{base}/api/profile", params={"deviceId": device}).json()["points"]
+        with SessionLocal() as db:
+            ledger = ledger_balance(db, device)
+        calls = args.threads * args.ops
+        print(f"{calls} calls in {elapsed:.2f}s ({calls / elapsed:.0f}/s): ok={totals['ok']} rejected={totals['rejected']} errors={totals['errors']}")
+        print(f"final={final} expected={totals['expected']} ledger={ledger}")
+        ok = final == totals["expected"] == ledger and final >= 0
+        print("PASS" if ok else "FAIL")
+        raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Polling GET /api/profile with the profile cache on/off and with/without ETags.
+
+Each config runs in its own process against a fresh DB: N devices are polled
+round-robin, and every 10th poll is preceded by an add-points write so some
+ETags go stale. Reports latency, profile SELECTs issued and body bytes received.
+First it replays the read-through/write race in-process: a GET loads the row,
+a write commits and calls put(), then the GET finishes; the cache must keep the
+write's body (exit 1 otherwise). Run from backend/:
+
+    python -m benchmarks.bench_profile_cache --devices 200 --polls 5000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+CONFIGS = [
+    ("no cache", {"PROFILE_CACHE_TTL": "0"}, False),
+    ("cache", {}, False),
+    ("cache+etag", {}, True),
+]
+
+
+def run_one(devices: int, polls: int, etags: bool) -> dict:
+    from sqlalchemy import event
+
+    from .harness import run_app
+
+    with run_app() as base:
+        from app.db import engine
+
+        selects = 0
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, *args):
+            nonlocal selects
+            if statement.lstrip().upper().startswith("SELECT") and "FROM profiles" in statement:
+                selects += 1
+
+        with httpx.Client(base_url=base) as client:
+            ids = [f"dev-{i}" for i in range(devices)]
+            for d in ids:
+                client.post("/api/profile/init", json={"device_id": d})
+            selects = 0
+            seen = {}
+            lat = []
+            body_bytes = not_modified = 0
+            for i in range(polls):
+                d = ids[i % devices]
+                if i % 10 == 0:
+                    client.post("/api/profile/add-points", json={"device_id": d, "delta": 1})
+                headers = {"If-None-Match": seen[d]} if etags and d in seen else {}
+                t = time.perf_counter()
+                r = client.get("/api/profile", params={"deviceId": d}, headers=headers)
+                lat.append((time.perf_counter() - t) * 1000)
+                seen[d] = r.headers["etag"]
+                body_bytes += len(r.content)
+                not_modified += r.status_code == 304
+    return {
+        "p50_ms": round(statistics.median(lat), 3),
+        "profile_selects": selects,
+        "body_bytes": body_bytes,
+        "not_modified": not_modified,
+    }
+
+
+def race_check() -> bool:
+    """True when a read-through that loaded before a put() leaves the put's body cached."""
+    from types import SimpleNamespace
+
+    from app.services import profile_cache
+
+    def row(points):
+        return SimpleNamespace(device_id="race", user_name="R", points=points, badges=[], streak_days=0,
+                               last_claim_iso=None)
+
+    def stale_load():
+        snapshot = row(1)  # read before the write commits
+        profile_cache.put(row(2))  # the write commits and refreshes the cache
+        return snapshot
+
+    profile_cache.invalidate("race")
+    profile_cache.read_through("race", stale_load)
+    cached = profile_cache.read_through("race", lambda: None)
+    return cached is not None and json.loads(cached)["points"] == 2
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--devices", type=int, default=200)
+    ap.add_argument("--polls", type=int, default=5000)
+    ap.add_argument("--child", choices=[name for name, _, _ in CONFIGS], help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        etags = dict((name, e) for name, _, e in CONFIGS)[args.child]
+        print(json.dumps(run_one(args.devices, args.polls, etags)))
+        return
+    if not race_check():
+        print("STALE: a read-through overwrote a newer put()")
+        sys.exit(1)
+    print("race check: ok (put() wins over an older read-through)")
+    for name, env, _ in CONFIGS:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_profile_cache", "--child", name,
+             "--devices", str(args.devices), "--polls", str(args.polls)],
+            env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        )
+        print(f"{name:<11} {proc.stdout.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Chat latency while the primary provider is down.
+
+OpenAI (primary) is a stub that either hangs (--fault hang) or answers 500
+(--fault error); Ollama (secondary) is a healthy stub answering in
+--ollama-ms. Sequential unique questions go through services.ai_chat.chat in a
+fresh process per config:
+  - no breaker: every request pays for the dead provider first
+  - breaker: a few requests pay, then the primary is skipped until its probe
+  - breaker + hedge: the secondary is started once the primary is --hedge-ms late
+Then a check: a streaming client disconnects while its request is the breaker's
+half-open probe of a recovered primary; the primary must be probed again and
+close, not stay half-open and skipped for good. Run from backend/:
+
+    python -m benchmarks.bench_provider_outage --requests 40 --fault hang --timeout 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from .stub_server import StubServer, json_handler
+from .upstreams import openai_compat
+
+CONFIGS = {
+    "no breaker": {"AI_BREAKER_FAILURES": "0"},
+    "breaker": {},
+    "breaker+hedge": {"AI_HEDGE_AFTER_MS": None},  # filled from --hedge-ms
+}
+
+
+async def _replay(n: int) -> dict:
+    from app.services import ai_chat, http_clients, provider_router
+
+    lat = []
+    for i in range(n):
+        t = time.perf_counter()
+        await ai_chat.chat(f"outage question {i}")
+        lat.append((time.perf_counter() - t) * 1000)
+    await http_clients.aclose_all()
+    lat.sort()
+    return {
+        "p50_ms": round(statistics.median(lat), 1),
+        "p95_ms": round(lat[int(0.95 * (len(lat) - 1))], 1),
+        "max_ms": round(lat[-1], 1),
+        "openai": provider_router.stats().get("openai", {}).get("state"),
+    }
+
+
+async def _probe_disconnect(open_seconds: float) -> dict:
+    from app.services import ai_chat, http_clients, provider_router
+
+    primary = provider_router.health("openai")
+    primary.record(False, 0)  # AI_BREAKER_FAILURES=1: open
+    await asyncio.sleep(open_seconds * 1.2)
+
+    async def consume(message: str) -> str:
+        return "".join([source async for source, _ in ai_chat.chat_stream(message)][:1])
+
+    probe = asyncio.create_task(consume("probe question"))
+    await asyncio.sleep(0.1)  # the primary answers after 500 ms: still waiting for its first token
+    probe.cancel()
+    await asyncio.gather(probe, return_exceptions=True)
+    after_disconnect = primary.state
+    await asyncio.sleep(open_seconds * 2.5)  # a failed probe doubles the open period
+    source = await consume("question after the disconnect")
+    await http_clients.aclose_all()
+    return {"after_disconnect": after_disconnect, "next_source": source, "state": primary.state}
+
+
+def _failing(method: str, path: str, body: bytes):
+    return 500, {"Content-Type": "application/json"}, b'{"error": {"message": "injected"}}'
+
+
+PROBE_OPEN_SECONDS = 0.5
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=40)
+    ap.add_argument("--fault", choices=["hang", "error"], default="hang")
+    ap.add_argument("--timeout", type=float, default=5, help="AI_PROVIDER_TIMEOUT seconds")
+    ap.add_argument("--ollama-ms", type=float, default=200)
+    ap.add_argument("--hedge-ms", type=float, default=300)
+    ap.add_argument("--child", choices=list(CONFIGS) + ["probe"], help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child == "probe":
+        print(json.dumps(asyncio.run(_probe_disconnect(PROBE_OPEN_SECONDS))))
+        return
+    if args.child:
+        print(json.dumps(asyncio.run(_replay(args.requests))))
+        return
+    if args.fault == "hang":
+        primary = StubServer(json_handler({}), latency_ms=600_000)
+    else:
+        primary = StubServer(_failing)
+    ollama = StubServer(json_handler({"message": {"content": "Use balanced NPK."}}), latency_ms=args.ollama_ms)
+    with primary, ollama:
+        for name, extra in CONFIGS.items():
+            extra = {k: (str(args.hedge_ms) if v is None else v) for k, v in extra.items()}
+            env = {
+                **os.environ, **extra,
+                "OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": primary.url + "/v1", "OPENROUTER_API_KEY": "",
+                "OLLAMA_BASE": ollama.url, "AI_PROVIDER_TIMEOUT": str(args.timeout), "CHAT_CACHE_SIZE": "0",
+            }
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_provider_outage", "--child", name, "--requests", str(args.requests)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            print(f"{name:<14} {proc.stdout.strip().splitlines()[-1]}")
+
+    recovered = StubServer(openai_compat, latency_ms=500)
+    with recovered, ollama:
+        env = {
+            **os.environ, "AI_BREAKER_FAILURES": "1", "AI_BREAKER_OPEN_SECONDS": str(PROBE_OPEN_SECONDS),
+            "OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": recovered.url + "/v1", "OPENROUTER_API_KEY": "",
+            "OLLAMA_BASE": ollama.url, "CHAT_CACHE_SIZE": "0",
+        }
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_provider_outage", "--child", "probe"],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        verdict = "ok" if result["state"] == "closed" and result["next_source"].startswith("openai") else "STUCK"
+        print(f"{'probe disconnect':<14} {json.dumps(result)} {verdict}")
+        if verdict != "ok":
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
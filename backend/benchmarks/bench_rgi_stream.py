@@ -0,0 +1,122 @@
+"""Memory and bytes on the wire for RGI certificates: base64-in-JSON vs ?binary=true.
+
+A stub RGI returns a --mb MB certificate in 64 KiB chunks. The app runs in a
+child process per mode while --concurrency clients download --requests
+certificates and throw the bytes away; the child reports the Python heap peak
+(tracemalloc) and max RSS. A last child opens a ?binary=true download whose
+client hangs up before the first chunk and fails (exit 1) if the upstream
+connection is left checked out. Run from backend/:
+
+    python -m benchmarks.bench_rgi_stream --mb 5 --requests 16 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from .harness import run_app
+from .stub_server import StubServer
+
+CHUNK = 64 * 1024
+BODY = {"regNo": "B-2024-1", "fullName": "Asha Devi", "dob": "01-01-2024", "format": "pdf"}
+
+
+def _rgi(mb: float):
+    chunk = b"%PDF" + os.urandom(CHUNK - 4)
+    chunks = [chunk] * max(1, int(mb * 1024 * 1024 / CHUNK))
+
+    def handle(method: str, path: str, body: bytes):
+        return 200, {"Content-Type": "application/pdf"}, chunks
+
+    return handle
+
+
+def _child(mode: str, args) -> dict:
+    with run_app() as base:
+        path = "/api/updates/rgi/birth" + ("?binary=true" if mode == "binary" else "")
+        with httpx.Client(base_url=base, timeout=120) as client:
+            client.post(path, json=BODY).read()  # warm up imports and the pool
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            tracemalloc.start()
+
+            def one(_):
+                size = 0
+                with client.stream("POST", path, json=BODY) as r:
+                    for chunk in r.iter_raw():
+                        size += len(chunk)
+                return size
+
+            t = time.perf_counter()
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                sizes = list(pool.map(one, range(args.requests)))
+            elapsed = time.perf_counter() - t
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return {
+        "heap_peak_mb": round(peak / 2**20, 1),
+        "rss_growth_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024, 1),
+        "wire_mb_per_cert": round(sizes[0] / 2**20, 2),
+        "seconds": round(elapsed, 2),
+    }
+
+
+def _disconnect() -> dict:
+    """Serve one binary download to a client that is gone before the body starts; is the upstream released?"""
+    with run_app():
+        from app.routers import updates
+        from app.schemas import RgiBirthIn
+        from app.services.http_clients import get_async_client
+
+        async def run():
+            response = await updates.rgi_birth(RgiBirthIn(**BODY), binary=True)
+
+            async def receive():
+                await asyncio.sleep(0.1)
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                await asyncio.sleep(3600)  # a dead socket: the headers never go out
+
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+            pool = get_async_client("rgi")._transport._inner._pool
+            return sum(not c.is_idle() for c in pool.connections)
+
+        return {"connections_in_use": asyncio.run(run())}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=float, default=5)
+    ap.add_argument("--requests", type=int, default=16)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--child", choices=["json", "binary", "disconnect"], help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(_disconnect() if args.child == "disconnect" else _child(args.child, args)))
+        return
+    with StubServer(_rgi(args.mb)) as stub:
+        for mode in ("json", "binary", "disconnect"):
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_rgi_stream", "--child", mode, "--mb", str(args.mb),
+                 "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+                env={**os.environ, "RGI_BASE_URL": stub.url}, capture_output=True, text=True, check=True,
+            )
+            result = proc.stdout.strip().splitlines()[-1]
+            print(f"{mode:<10} {result}")
+    if json.loads(result)["connections_in_use"]:
+        print("LEAK: the upstream response outlived a client that left before the first chunk")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
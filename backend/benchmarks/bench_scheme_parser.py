@@ -0,0 +1,89 @@
+"""Compare scheme-link parser backends for speed and identical output.
+
+By default runs over the listing pages in benchmarks/fixtures/myscheme/ plus a
+generated page of --cards cards shaped like the myscheme listing (nav, cards,
+nested markup, comments, scripts, Hindi text, duplicate and short links,
+anchors inside <p>). Pass other saved pages with --pages. Exits 1 when a
+backend's output differs from BeautifulSoup's; pages must be well-formed (see
+the scheme_parser docstring for how malformed markup is repaired differently). Run from backend/:
+
+    python -m benchmarks.bench_scheme_parser --cards 400
+    python -m benchmarks.bench_scheme_parser --pages saved/*.html
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from app.services import scheme_parser
+
+BASE_URL = "https://www.myscheme.gov.in/schemes"
+FIXTURES = Path(__file__).parent / "fixtures" / "myscheme"
+
+
+def synthetic_page(cards: int, seed: int = 11) -> str:
+    rnd = random.Random(seed)
+    words = "kisan fasal bima yojana credit soil irrigation pension dairy seed subsidy".split()
+    out = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>myScheme</title>',
+           "<script>window.__NEXT_DATA__ = {\"props\": {}};</script><style>a{color:red}</style></head><body>",
+           '<nav><a href="/">Home</a><a href="/schemes/">All</a><a href="/about">About</a></nav><main>']
+    for i in range(cards):
+        name = " ".join(rnd.sample(words, 3)).title()
+        desc = " ".join(rnd.sample(words, 6))
+        slug = f"s{i if rnd.random() > 0.05 else i - 1}"  # some duplicate links
+        out.append(
+            f'<div class="card"><h2><a href="/schemes/{slug}">  {name} <span>&amp; योजना</span><!-- tag --></a></h2>'
+            f'<div class="meta"><span>Ministry of Agriculture</span></div>'
+            f"<p>  {desc}\n <b>प्रधानमंत्री</b>  किसान </p><p>Second para</p></div>"
+        )
+        if i % 37 == 0:
+            out.append('<div><a href="https://www.myscheme.gov.in/schemes/ab">ab</a></div>')
+        if i % 53 == 0:
+            # The anchor's parent is the <p>; only <p>s below it count, so the description is empty
+            out.append(f'<div><p>first <a href="/schemes/e{i}">Epsilon {i}</a> tail</p></div>')
+    out.append("</main><footer><p>Footer</p></footer></body></html>")
+    return "".join(out)
+
+
+def _strip(items):
+    return [{k: v for k, v in it.items() if k != "updated_at"} for it in items]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", nargs="*", help="saved listing HTML files")
+    ap.add_argument("--cards", type=int, default=400)
+    ap.add_argument("--repeat", type=int, default=30)
+    args = ap.parse_args()
+
+    if args.pages:
+        pages = {p: Path(p).read_text(encoding="utf-8") for p in args.pages}
+    else:
+        pages = {p.name: p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("*.html"))}
+        pages["synthetic"] = synthetic_page(args.cards)
+    backends = scheme_parser.available()
+    print(f"backends: {', '.join(backends)}; pages: {len(pages)} ({sum(map(len, pages.values())) // 1024} KiB)")
+    mismatches = 0
+    for limit in (20, None):
+        reference = {n: _strip(scheme_parser.parse_scheme_links(p, BASE_URL, limit, "html.parser")) for n, p in pages.items()}
+        for backend in backends:
+            got = {n: _strip(scheme_parser.parse_scheme_links(p, BASE_URL, limit, backend)) for n, p in pages.items()}
+            differ = [n for n in pages if got[n] != reference[n]]
+            mismatches += len(differ)
+            same = "identical" if not differ else "DIFFERENT on " + ", ".join(differ)
+            samples = []
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                for p in pages.values():
+                    scheme_parser.parse_scheme_links(p, BASE_URL, limit, backend)
+                samples.append((time.perf_counter() - t) * 1000)
+            items = sum(map(len, got.values()))
+            print(f"limit={str(limit):<5} {backend:<12} median={statistics.median(samples):8.2f}ms  items={items:<5} {same}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Scheme index ingestion throughput and search latency on a synthetic catalogue.
+
+Also checks Hindi words that differ only in a vowel sign (बीज/बाज, काम/कम):
+the catalogue has the first of each pair, so the second must find nothing.
+Exits 1 if one does. Run from backend/:
+
+    python -m benchmarks.bench_schemes_index --items 5000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+WORDS = (
+    "kisan farmer crop insurance irrigation credit loan soil health pension rural "
+    "fisheries dairy horticulture seed subsidy organic solar pump women youth tribal"
+).split()
+HINDI = ["प्रधानमंत्री", "किसान", "योजना", "फसल", "बीमा", "सिंचाई", "ऋण", "ग्रामीण", "बीज", "काम"]
+QUERIES = ["kisan", "crop ins", "irrig", "किसान", "फसल बीमा", "सिंचाई", "बीज", "solar pump", "pm", "zzz"]
+# Same consonants as बीज / काम with another (or no) vowel sign; not in the catalogue
+ABSENT = ["बाज", "कम"]
+
+
+def _catalogue(n: int) -> list[dict]:
+    rnd = random.Random(7)
+    return [
+        {
+            "name": " ".join(rnd.sample(WORDS, 3)).title() + f" Scheme {i}",
+            "desc": " ".join(rnd.sample(WORDS, 8) + rnd.sample(HINDI, 2)),
+            "link": f"https://www.myscheme.gov.in/schemes/s{i}",
+            "source": "myscheme",
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["SCHEMES_INDEX_PATH"] = os.path.join(tmp, "index.db")
+        from app.services import schemes_index
+
+        items = _catalogue(args.items)
+        t = time.perf_counter()
+        n = schemes_index.replace_all(items)
+        dt = time.perf_counter() - t
+        print(f"ingest {n} schemes: {dt * 1000:.1f}ms ({n / dt:,.0f} rows/s)")
+
+        for q in QUERIES:
+            samples = []
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                hits = schemes_index.search(q, 50)
+                samples.append((time.perf_counter() - t) * 1000)
+            samples.sort()
+            print(f"{q!r:<14} hits={len(hits):<3} p50={statistics.median(samples):.3f}ms  p95={samples[int(len(samples) * 0.95) - 1]:.3f}ms")
+
+        wrong = [q for q in ABSENT if schemes_index.search(q, 50)]
+        wrong += [q for q in ("बीज", "काम") if not schemes_index.search(q, 50)]
+        print("vowel-sign queries: " + ("ok" if not wrong else "WRONG for " + ", ".join(wrong)))
+    sys.exit(1 if wrong else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Latency of fast endpoints while a slow LLM upstream is saturated.
+
+Fires --slow concurrent /api/ai/chat calls at a stub Ollama that answers after
+--upstream-ms, and meanwhile polls /api/health and /api/profile. With async
+handlers those stay fast; with blocking handlers they queue behind the
+40-thread AnyIO pool. Run from backend/:
+
+    python -m benchmarks.bench_slow_upstream --slow 100 --upstream-ms 3000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from .harness import run_app
+from .stub_server import StubServer, json_handler
+
+
+async def _probe(client: httpx.AsyncClient, path: str, n: int) -> list:
+    out = []
+    for _ in range(n):
+        t = time.perf_counter()
+        (await client.get(path)).raise_for_status()
+        out.append((time.perf_counter() - t) * 1000)
+        await asyncio.sleep(0.02)
+    return out
+
+
+async def _drive(base: str, slow: int, probes: int):
+    limits = httpx.Limits(max_connections=slow + 10)
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as client:
+        (await client.post("/api/profile/init", json={"device_id": "bench"})).raise_for_status()
+        baseline = await _probe(client, "/api/health", probes)
+        chats = [asyncio.create_task(client.post("/api/ai/chat", json={"message": "wheat fertilizer?"})) for _ in range(slow)]
+        await asyncio.sleep(0.5)  # let the chat calls occupy the server
+        health = await _probe(client, "/api/health", probes)
+        profile = await _probe(client, "/api/profile?deviceId=bench", probes)
+        t = time.perf_counter()
+        await asyncio.gather(*chats)
+        chat_wall = time.perf_counter() - t
+    for label, xs in (("health (idle)", baseline), ("health (saturated)", health), ("profile (saturated)", profile)):
+        xs = sorted(xs)
+        print(f"{label:<22} p50={statistics.median(xs):8.2f}ms  max={xs[-1]:8.2f}ms")
+    print(f"{slow} slow chats finished {chat_wall:.2f}s after probing")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--slow", type=int, default=100)
+    ap.add_argument("--upstream-ms", type=float, default=3000)
+    ap.add_argument("--probes", type=int, default=20)
+    args = ap.parse_args()
+
+    ollama = StubServer(json_handler({"message": {"content": "Use balanced NPK."}}), latency_ms=args.upstream_ms)
+    with ollama:
+        env = {
+            "OLLAMA_BASE": ollama.url,
+            "HTTP_OLLAMA_MAX_CONNECTIONS": str(args.slow),
+            "OPENROUTER_API_KEY": None,
+            "OPENAI_API_KEY": None,
+        }
+        with run_app(env) as base:
+            asyncio.run(_drive(base, args.slow, args.probes))
+
+
+if __name__ == "__main__":
+    main()
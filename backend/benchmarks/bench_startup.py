@@ -0,0 +1,85 @@
+"""Cold-start cost of a worker, with a regression budget.
+
+Imports app.main in --runs fresh interpreters under `python -X importtime`
+(after one discarded run that writes the .pyc files) and reports the median
+import time and the heaviest packages. Then it times `uvicorn app.main:app`
+from spawn to the first healthy /api/health, lifespan included. Fails (exit 1)
+when the median import exceeds --budget-ms, when a module that should load
+lazily is imported, or when importing creates the database. Run from backend/:
+
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 500
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from .harness import BACKEND_DIR, run_app_process
+
+# Optional or only needed on some requests; importing app.main must not pull them in
+LAZY = ("bs4", "lxml", "selectolax", "openai", "jose", "passlib", "bcrypt", "redis")
+BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "500"))
+
+
+def _importtime(tmp: str, code: str = "import app.main") -> dict:
+    """{module: (self_us, cumulative_us)} for one run of `code`."""
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp}/startup.db", "SCHEMES_INDEX_PATH": f"{tmp}/schemes_index.db",
+           "VERIFY_CACHE_PATH": f"{tmp}/verify_cache.db"}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=BACKEND_DIR, env=env,
+                          capture_output=True, text=True, check=True)
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        out[name.strip()] = (int(self_us), int(cumulative_us))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    ap.add_argument("--top", type=int, default=8)
+    args = ap.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        _importtime(tmp)  # compile .pyc files
+        runs = [_importtime(tmp) for _ in range(args.runs)]
+        interpreter = _importtime(tmp, "pass")  # site, encodings, ...: paid by every Python process
+        if os.path.exists(f"{tmp}/startup.db"):
+            failures.append("importing app.main created the database (schema bootstrap belongs in the lifespan)")
+
+    total_ms = statistics.median(r["app.main"][1] for r in runs) / 1000
+    print(f"import app.main: median {total_ms:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    last = runs[-1]
+    packages = sorted(
+        ((cum, name) for name, (_, cum) in last.items() if "." not in name and name not in interpreter and name != "app"),
+        reverse=True,
+    )
+    for cum, name in packages[: args.top]:
+        print(f"  {name:<24} {cum / 1000:>7.1f} ms (with its dependencies)")
+
+    eager = sorted({name.split(".")[0] for name in last} & set(LAZY))
+    if eager:
+        failures.append(f"imported at startup but should be lazy: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+
+    started = time.perf_counter()
+    with run_app_process():
+        boot_ms = (time.perf_counter() - started) * 1000
+    print(f"uvicorn spawn to healthy: {boot_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Verification retries with and without the encrypted verify cache.
+
+Stub RGI and e-Shram APIs answer after --upstream-ms (RGI with a --kb KB
+certificate; one in five citizens gets a 404). --citizens each verify a birth
+certificate (JSON and ?binary=true alternately) and a UAN, then retry both
+--retries times. Each config runs the app in its own process. Run from backend/:
+
+    python -m benchmarks.bench_verify_cache --citizens 40 --retries 4 --upstream-ms 800
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from .harness import run_app
+from .stub_server import StubServer
+
+CONFIGS = {"off": {"VERIFY_CACHE_KEY": None}, "on": {"VERIFY_CACHE_KEY": "bench-secret"}}
+
+
+class Upstream:
+    def __init__(self, kb: int):
+        self.pdf = b"%PDF" + os.urandom(kb * 1024)
+        self.requests = 0
+
+    def __call__(self, method: str, path: str, body: bytes):
+        if path.endswith("/generateAuthToken"):
+            return 200, {"Content-Type": "application/json"}, b'{"token": "t", "expires_in": 1500}'
+        self.requests += 1
+        data = json.loads(body)
+        reg_no = (data.get("certificateParameters") or {}).get("RegNo") or data.get("uan", "")
+        if reg_no.endswith("0") or reg_no.endswith("5"):
+            return 404, {"Content-Type": "application/json"}, b'{"error": "record not found"}'
+        if path.endswith("/btcer"):
+            return 200, {"Content-Type": "application/pdf"}, self.pdf
+        return 200, {"Content-Type": "application/json"}, b'{"valid": true}'
+
+
+def _child(args) -> dict:
+    first, retry = [], []
+    with run_app() as base, httpx.Client(base_url=base, timeout=60) as client:
+        for attempt in range(args.retries + 1):
+            for i in range(args.citizens):
+                birth = {"regNo": f"B-{i}", "fullName": f"Citizen {i}", "dob": "01-01-2000"}
+                path = "/api/updates/rgi/birth" + ("?binary=true" if i % 2 else "")
+                t = time.perf_counter()
+                client.post(path, json=birth).read()
+                client.post("/api/updates/eshram/validate", json={"uan": f"1000{i}", "dob": "2000-01-01"}).read()
+                (retry if attempt else first).append((time.perf_counter() - t) * 1000)
+        stats = client.get("/api/updates/verify/cache/stats").json()
+    return {
+        "first_p50_ms": round(statistics.median(first), 1),
+        "retry_p50_ms": round(statistics.median(retry), 1),
+        "hits": stats.get("hits"),
+        "negative_hits": stats.get("negativeHits"),
+        "cache_kb": round(stats.get("bytes", 0) / 1024),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--citizens", type=int, default=40)
+    ap.add_argument("--retries", type=int, default=4)
+    ap.add_argument("--upstream-ms", type=float, default=800)
+    ap.add_argument("--kb", type=int, default=300)
+    ap.add_argument("--child", choices=list(CONFIGS), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(_child(args)))
+        return
+    for name, extra in CONFIGS.items():
+        upstream = Upstream(args.kb)
+        with StubServer(upstream, latency_ms=args.upstream_ms) as stub:
+            env = {**os.environ, "RGI_BASE_URL": stub.url, "ESHRAM_BASE_URL": stub.url,
+                   "ESHRAM_CLIENT_ID": "bench", "ESHRAM_CLIENT_SECRET": "bench"}
+            for k, v in extra.items():
+                if v is None:
+                    env.pop(k, None)
+                else:
+                    env[k] = v
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_verify_cache", "--child", name, "--citizens", str(args.citizens),
+                 "--retries", str(args.retries), "--upstream-ms", str(args.upstream_ms), "--kb", str(args.kb)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            print(f"{name:<4} upstream_requests={upstream.requests:<4} {proc.stdout.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    main()
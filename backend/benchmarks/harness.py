@@ -0,0 +1,101 @@
+"""Boot `app.main:app` under uvicorn for benchmarks.
+
+run_app() serves it from a thread of the calling process; run_app_process()
+starts `uvicorn` as a child process, so a load driver does not share its GIL.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def run_app(env: dict | None = None):
+    """Yield the base URL of a live app; env is applied before the app is imported."""
+    tmp = tempfile.TemporaryDirectory()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+    os.environ.setdefault("SCHEMES_INDEX_PATH", f"{tmp.name}/schemes_index.db")
+    os.environ.setdefault("VERIFY_CACHE_PATH", f"{tmp.name}/verify_cache.db")
+    for k, v in (env or {}).items():
+        if v is None:
+            os.environ.pop(k, None)
+        else:
+            os.environ[k] = v
+
+    import uvicorn
+    from app.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level=os.getenv("BENCH_LOG_LEVEL", "critical")))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        tmp.cleanup()
+
+
+@contextmanager
+def run_app_process(env: dict | None = None, workers: int = 1, startup_timeout: float = 60):
+    """Yield the base URL of `uvicorn app.main:app` running in a child process with a scratch DB."""
+    tmp = tempfile.TemporaryDirectory()
+    child_env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp.name}/bench.db",
+        "SCHEMES_INDEX_PATH": f"{tmp.name}/schemes_index.db",
+        "VERIFY_CACHE_PATH": f"{tmp.name}/verify_cache.db",
+    }
+    for k, v in (env or {}).items():
+        if v is None:
+            child_env.pop(k, None)
+        else:
+            child_env[k] = v
+
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", os.getenv("BENCH_LOG_LEVEL", "critical")],
+        cwd=BACKEND_DIR, env=child_env,
+    )
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {proc.returncode} during startup")
+            try:
+                if httpx.get(f"{base}/api/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("app did not become healthy in time")
+            time.sleep(0.02)
+        yield base
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        tmp.cleanup()
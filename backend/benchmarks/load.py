@@ -0,0 +1,362 @@
+"""Mixed-workload load test of the whole app against stub upstreams, fully offline.
+
+Starts every upstream as a stub (see upstreams.py) and `uvicorn app.main:app`
+in a child process pointed at them, creates --devices profiles and --accounts
+users, then runs --users closed-loop virtual users for --duration seconds
+(after --warmup seconds that are not recorded). Each iteration picks one
+workload by weight and sleeps a random think time of up to 2 x --think-ms:
+
+  profile_poll  GET /api/profile with the last ETag (mostly 304s)
+  points_burst  POST /api/profile/events:batch with 5-20 add_points events
+  login         POST /api/auth/login (bcrypt)
+  chat          POST /api/ai/chat from a pool of common questions
+  weather       GET /api/weather/current or /forecast near district centres
+  schemes       GET /api/updates/schemes?q=...
+
+Throughput, error count and p50/p95/p99 per endpoint go to --out as JSON,
+with the git revision and the exact configuration. Compare two runs with
+--compare; it exits non-zero when an endpoint got more than --threshold
+percent slower at p95/p99 or lost that much throughput. Run from backend/:
+
+    python -m benchmarks.load --users 32 --duration 30 --out results/base.json
+    python -m benchmarks.load --users 32 --duration 30 --env CHAT_CACHE_SIZE=0 --out results/nocache.json
+    python -m benchmarks.load --upstream-ms openrouter=3000 --error-rate openrouter=0.3 --out results/outage.json
+    python -m benchmarks.load --compare results/base.json results/nocache.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+from .harness import BACKEND_DIR, run_app_process
+from .upstreams import NAMES, Upstreams
+
+DEFAULT_MIX = {"profile_poll": 45, "points_burst": 15, "login": 5, "chat": 10, "weather": 15, "schemes": 10}
+
+QUESTIONS = [
+    "How do I improve soil fertility?", "When should I sow wheat?", "What fertilizer for paddy?",
+    "How to control aphids on mustard?", "Best crop for black soil in kharif?", "How much water does sugarcane need?",
+    "What is the mandi price trend for onion?", "How to test soil pH at home?", "Is drip irrigation worth it?",
+    "How to make compost quickly?", "Which millet grows in low rainfall?", "How to store grain safely?",
+    "What causes yellow leaves in tomato?", "How to apply for crop insurance?", "When to harvest chickpea?",
+    "How to reduce fertilizer cost?",
+]
+SEARCH_TERMS = ["kisan", "irrigation", "insurance", "seed", "soil health", "credit", "pension", "scheme 12", "crop", ""]
+# Lat/lon of a few district headquarters; farmers are scattered a few km around them
+DISTRICTS = [(28.61, 77.21), (26.85, 80.95), (23.26, 77.41), (19.08, 72.88), (22.57, 88.36), (17.39, 78.49),
+             (12.97, 77.59), (30.73, 76.78), (25.59, 85.14), (21.15, 79.09)]
+PASSWORD = "load-test-password"
+
+
+class Run:
+    """Shared state of the virtual users plus the recorded samples."""
+
+    def __init__(self, args):
+        self.args = args
+        self.devices = [f"load-{i}" for i in range(args.devices)]
+        self.accounts = [f"farmer{i}@load.test" for i in range(args.accounts)]
+        self.etags = {}
+        self.recording = False
+        self.samples = defaultdict(list)  # endpoint -> latencies in ms
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint: str, started: float, status) -> None:
+        if not self.recording:
+            return
+        self.samples[endpoint].append((time.perf_counter() - started) * 1000)
+        self.statuses[endpoint][str(status)] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors[endpoint] += 1
+
+
+async def _call(run: Run, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kw):
+    started = time.perf_counter()
+    try:
+        r = await client.request(method, url, **kw)
+    except httpx.HTTPError as e:
+        run.record(endpoint, started, type(e).__name__)
+        return None
+    run.record(endpoint, started, r.status_code)
+    return r
+
+
+async def profile_poll(run: Run, client: httpx.AsyncClient, rng: random.Random):
+    device = rng.choice(run.devices)
+    headers = {"If-None-Match": run.etags[device]} if device in run.etags else {}
+    r = await _call(run, client, "GET /api/profile", "GET", "/api/profile", params={"deviceId": device}, headers=headers)
+    if r is not None and r.headers.get("etag"):
+        run.etags[device] = r.headers["etag"]
+
+
+async def points_burst(run: Run, client: httpx.AsyncClient, rng: random.Random):
+    device = rng.choice(run.devices)
+    events = [
+        {"event_id": uuid.uuid4().hex, "device_id": device, "type": "add_points", "delta": rng.randint(1, 10), "reason": "quiz"}
+        for _ in range(rng.randint(5, 20))
+    ]
+    await _call(run, client, "POST /api/profile/events:batch", "POST", "/api/profile/events:batch", json={"events": events})
+
+
+async def login(run: Run, client: httpx.AsyncClient, rng: random.Random):
+    body = {"email": rng.choice(run.accounts), "password": PASSWORD}
+    await _call(run, client, "POST /api/auth/login", "POST", "/api/auth/login", json=body)
+
+
+async def chat(run: Run, client: httpx.AsyncClient, rng: random.Random):
+    await _call(run, client, "POST /api/ai/chat", "POST", "/api/ai/chat", json={"message": rng.choice(QUESTIONS)})
+
+
+async def weather(run: Run, client: httpx.AsyncClient, rng: random.Random):
+    lat, lon = rng.choice(DISTRICTS)
+    params = {"lat": round(lat + rng.uniform(-0.2, 0.2), 4), "lon": round(lon + rng.uniform(-0.2, 0.2), 4)}
+    kind = "forecast" if rng.random() < 0.3 else "current"
+    await _call(run, client, f"GET /api/weather/{kind}", "GET", f"/api/weather/{kind}", params=params)
+
+
+async def schemes(run: Run, client: httpx.AsyncClient, rng: random.Random):
+    term = rng.choice(SEARCH_TERMS)
+    await _call(run, client, "GET /api/updates/schemes", "GET", "/api/updates/schemes", params={"q": term} if term else None)
+
+
+WORKLOADS = {f.__name__: f for f in (profile_poll, points_burst, login, chat, weather, schemes)}
+
+
+async def _user(run: Run, client: httpx.AsyncClient, uid: int, mix: dict, deadline: float):
+    rng = random.Random(run.args.seed * 100_003 + uid)
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        await WORKLOADS[rng.choices(names, weights)[0]](run, client, rng)
+        if run.args.think_ms:
+            await asyncio.sleep(rng.uniform(0, 2 * run.args.think_ms) / 1000)
+
+
+async def _setup(run: Run, client: httpx.AsyncClient):
+    sem = asyncio.Semaphore(32)
+
+    async def init(device):
+        async with sem:
+            (await client.post("/api/profile/init", json={"device_id": device, "user_name": device})).raise_for_status()
+
+    async def register(email):
+        async with sem:
+            r = await client.post("/api/auth/register", json={"email": email, "password": PASSWORD, "full_name": email})
+            if r.status_code not in (200, 400):  # 400: already registered
+                r.raise_for_status()
+
+    await asyncio.gather(*(init(d) for d in run.devices), *(register(a) for a in run.accounts))
+    # The ingester crawls the schemes stub in the background; search the real index, not the fallback
+    deadline = time.perf_counter() + 30
+    while time.perf_counter() < deadline:
+        items = (await client.get("/api/updates/schemes", params={"q": "kisan"})).json()
+        if any(it.get("source") == "myscheme" for it in items):
+            break
+        await asyncio.sleep(0.2)
+
+
+def _percentile(sorted_ms: list, p: float) -> float:
+    return sorted_ms[max(0, math.ceil(p / 100 * len(sorted_ms)) - 1)]
+
+
+def _summary(samples: list, errors: int, seconds: float) -> dict:
+    s = sorted(samples)
+    if not s:
+        return {"requests": 0, "errors": errors, "rps": 0.0}
+    return {
+        "requests": len(s),
+        "errors": errors,
+        "rps": round(len(s) / seconds, 2),
+        "mean_ms": round(sum(s) / len(s), 2),
+        "p50_ms": round(_percentile(s, 50), 2),
+        "p95_ms": round(_percentile(s, 95), 2),
+        "p99_ms": round(_percentile(s, 99), 2),
+        "max_ms": round(s[-1], 2),
+    }
+
+
+async def _drive(run: Run, base: str, mix: dict) -> dict:
+    args = run.args
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=base, timeout=args.timeout, limits=limits) as client:
+        await _setup(run, client)
+        start = time.perf_counter()
+        deadline = start + args.warmup + args.duration
+        users = [asyncio.create_task(_user(run, client, i, mix, deadline)) for i in range(args.users)]
+        await asyncio.sleep(args.warmup)
+        run.recording = True
+        measured_from = time.perf_counter()
+        await asyncio.gather(*users)
+        seconds = time.perf_counter() - measured_from
+
+    endpoints = {
+        ep: {**_summary(lat, run.errors[ep], seconds), "statuses": dict(run.statuses[ep])}
+        for ep, lat in sorted(run.samples.items())
+    }
+    everything = [ms for lat in run.samples.values() for ms in lat]
+    return {"seconds": round(seconds, 2), "total": _summary(everything, sum(run.errors.values()), seconds), "endpoints": endpoints}
+
+
+def _git_revision() -> str:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND_DIR,
+                               capture_output=True, text=True, check=True)
+        return rev.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _pairs(values: list, cast) -> dict:
+    """'name=value,name=value' (repeatable); a bare value applies to every upstream."""
+    out = {}
+    for value in values or []:
+        for part in value.split(","):
+            name, sep, v = part.partition("=")
+            if not sep:
+                out.update({n: cast(name) for n in NAMES})
+                continue
+            if name not in NAMES:
+                raise SystemExit(f"unknown upstream {name!r}; expected one of {', '.join(NAMES)}")
+            out[name] = cast(v)
+    return out
+
+
+def _mix(value: str | None) -> dict:
+    mix = dict(DEFAULT_MIX)
+    for part in (value or "").split(","):
+        if part:
+            name, _, weight = part.partition("=")
+            if name not in WORKLOADS:
+                raise SystemExit(f"unknown workload {name!r}; expected one of {', '.join(WORKLOADS)}")
+            mix[name] = float(weight)
+    return {k: v for k, v in mix.items() if v > 0}
+
+
+def run_load(args) -> dict:
+    mix = _mix(args.mix)
+    app_env = dict(e.split("=", 1) for e in args.env or [])
+    upstreams = Upstreams(
+        latency_ms=_pairs(args.upstream_ms, float), error_rate=_pairs(args.error_rate, float),
+        jitter=args.jitter, seed=args.seed,
+    )
+    run = Run(args)
+    with upstreams:
+        with run_app_process({**upstreams.env(), **app_env}, workers=args.workers) as base:
+            result = asyncio.run(_drive(run, base, mix))
+        upstream_stats = upstreams.stats()
+    latency = {name: s.latency_ms for name, s in upstreams.servers.items()}
+    errors = {name: s.error_rate for name, s in upstreams.servers.items() if s.error_rate}
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": {
+                "users": args.users, "duration": args.duration, "warmup": args.warmup, "think_ms": args.think_ms,
+                "devices": args.devices, "accounts": args.accounts, "workers": args.workers, "seed": args.seed,
+                "mix": mix, "upstream_latency_ms": latency, "upstream_error_rate": errors, "jitter": args.jitter,
+                "env": app_env,
+            },
+        },
+        **result,
+        "upstreams": upstream_stats,
+    }
+
+
+def _print_run(result: dict) -> None:
+    print(f"{'endpoint':<34} {'req':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    rows = list(result["endpoints"].items()) + [("TOTAL", result["total"])]
+    for ep, s in rows:
+        if not s["requests"]:
+            continue
+        print(f"{ep:<34} {s['requests']:>7} {s['errors']:>5} {s['rps']:>8.1f} "
+              f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}")
+    print("upstream requests: " + ", ".join(f"{k}={v['requests']}" for k, v in result["upstreams"].items()))
+
+
+def _pct(a: float, b: float) -> float:
+    return (b - a) / a * 100 if a else 0.0
+
+
+def compare(path_a: str, path_b: str, threshold: float) -> int:
+    """Print per-endpoint changes from run A to run B; the number of regressions beyond `threshold` %."""
+    with open(path_a) as f:
+        a = json.load(f)
+    with open(path_b) as f:
+        b = json.load(f)
+    print(f"A: {path_a} ({a['meta']['revision']}, {a['meta']['started_at']})")
+    print(f"B: {path_b} ({b['meta']['revision']}, {b['meta']['started_at']})")
+    changed = {k for k in a["meta"]["config"] if a["meta"]["config"][k] != b["meta"]["config"].get(k)}
+    if changed:
+        print("config differs: " + ", ".join(sorted(changed)))
+    print(f"{'endpoint':<34} {'rps':>16} {'p50 ms':>18} {'p95 ms':>18} {'p99 ms':>18}")
+    regressions = 0
+    rows = sorted(set(a["endpoints"]) | set(b["endpoints"])) + ["TOTAL"]
+    for ep in rows:
+        sa = a["total"] if ep == "TOTAL" else a["endpoints"].get(ep)
+        sb = b["total"] if ep == "TOTAL" else b["endpoints"].get(ep)
+        if not sa or not sb or not sa["requests"] or not sb["requests"]:
+            print(f"{ep:<34} only in {'B' if not sa or not sa['requests'] else 'A'}")
+            continue
+        cells, worse = [], False
+        for field, higher_is_better in (("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False)):
+            change = _pct(sa[field], sb[field])
+            cells.append(f"{sb[field]:>8.1f} {change:>+7.1f}%")
+            if field != "p50_ms" and (-change if higher_is_better else change) > threshold:
+                worse = True
+        if sb["errors"] > sa["errors"] and sb["errors"] / sb["requests"] > sa["errors"] / sa["requests"] + 0.01:
+            worse = True
+        regressions += worse
+        print(f"{ep:<34} " + " ".join(cells) + ("  REGRESSION" if worse else ""))
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--users", type=int, default=32, help="concurrent virtual users")
+    ap.add_argument("--duration", type=float, default=30, help="measured seconds")
+    ap.add_argument("--warmup", type=float, default=5, help="seconds run before recording starts")
+    ap.add_argument("--think-ms", type=float, default=50, help="mean pause between a user's requests")
+    ap.add_argument("--devices", type=int, default=500)
+    ap.add_argument("--accounts", type=int, default=20)
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    ap.add_argument("--mix", help="workload weights, e.g. profile_poll=60,chat=0 (default %s)" % DEFAULT_MIX)
+    ap.add_argument("--upstream-ms", action="append", help="stub latency, e.g. openrouter=2000,weather=50 or 100 for all")
+    ap.add_argument("--error-rate", action="append", help="fraction of stub requests answered 503, e.g. openrouter=0.2")
+    ap.add_argument("--jitter", type=float, default=0.5, help="random extra stub latency, as a fraction of it")
+    ap.add_argument("--env", action="append", help="extra app environment, KEY=VALUE (repeatable)")
+    ap.add_argument("--timeout", type=float, default=30, help="client timeout per request, seconds")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", help="write the JSON result here")
+    ap.add_argument("--compare", nargs=2, metavar=("A", "B"), help="compare two result files instead of running")
+    ap.add_argument("--threshold", type=float, default=10, help="percent change counted as a regression")
+    args = ap.parse_args()
+
+    if args.compare:
+        regressions = compare(*args.compare, args.threshold)
+        sys.exit(1 if regressions else 0)
+    result = run_load(args)
+    _print_run(result)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
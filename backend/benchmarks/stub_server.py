@@ -0,0 +1,148 @@
+"""Minimal keep-alive HTTP/1.1 stub server for offline benchmarks.
+
+Runs an asyncio server on 127.0.0.1 in a background thread. `handshake_ms`
+delays every *new* connection before the first byte is read, standing in for
+the TCP+TLS setup cost of a real upstream; `latency_ms` delays every response.
+A handler may return its body as a list of chunks; they are sent with chunked
+transfer encoding, `chunk_ms` apart, like a token stream.
+
+For load tests, `jitter_ms` adds a uniform random extra delay to each response
+and `error_rate` answers that fraction of requests with a 503 instead of
+calling the handler (`errors` counts them). Both draw from a seeded RNG so a
+run is repeatable.
+"""
+
+import asyncio
+import json
+import random
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+# handler(method, path, body) -> (status, headers, body or list of body chunks)
+Handler = Callable[[str, str, bytes], Tuple[int, Dict[str, str], Union[bytes, List[bytes]]]]
+
+
+def json_handler(payload) -> Handler:
+    body = json.dumps(payload).encode()
+
+    def handle(method: str, path: str, req_body: bytes):
+        return 200, {"Content-Type": "application/json"}, body
+
+    return handle
+
+
+class StubServer:
+    def __init__(
+        self,
+        handler: Handler,
+        handshake_ms: float = 0,
+        latency_ms: float = 0,
+        chunk_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0,
+        seed: int = 0,
+    ):
+        self.handler = handler
+        self.handshake_ms = handshake_ms
+        self.latency_ms = latency_ms
+        self.chunk_ms = chunk_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.connections = 0
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self.port: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _serve_conn(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        if self.handshake_ms:
+            await asyncio.sleep(self.handshake_ms / 1000)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                body = b""
+                length = int(headers.get("content-length") or 0)
+                if length:
+                    body = await reader.readexactly(length)
+                self.requests += 1
+                delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+                if delay:
+                    await asyncio.sleep(delay / 1000)
+                if self.error_rate and self._rng.random() < self.error_rate:
+                    self.errors += 1
+                    status, resp_headers, resp_body = 503, {"Content-Type": "application/json"}, b'{"error": "injected"}'
+                else:
+                    status, resp_headers, resp_body = self.handler(method, path, body)
+                chunked = isinstance(resp_body, list)
+                framing = "Transfer-Encoding: chunked" if chunked else f"Content-Length: {len(resp_body)}"
+                head = [f"HTTP/1.1 {status} OK", framing]
+                head += [f"{k}: {v}" for k, v in resp_headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + (b"" if chunked else resp_body))
+                await writer.drain()
+                if chunked:
+                    for i, chunk in enumerate(resp_body):
+                        if i and self.chunk_ms:
+                            await asyncio.sleep(self.chunk_ms / 1000)
+                        writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                        await writer.drain()
+                    writer.write(b"0\r\n\r\n")
+                    await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass  # CancelledError: stop() is closing a connection that is still waiting
+        finally:
+            writer.close()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._serve_conn, "127.0.0.1", 0))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    async def _shutdown(self):
+        self._server.close()
+        conns = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for t in conns:
+            t.cancel()
+        await asyncio.gather(*conns, return_exceptions=True)
+
+    def stop(self):
+        if self._loop:
+            # Cancel open connections first so a hanging stub shuts down quietly
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
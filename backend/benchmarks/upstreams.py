@@ -0,0 +1,197 @@
+"""Stub servers for every upstream the app talks to, for offline load tests.
+
+`Upstreams` starts one StubServer per integration (OpenWeather, myscheme,
+e-Shram, RGI, OpenRouter, OpenAI, Ollama) and `env()` returns the variables
+that point the app at them. Latency, jitter and error injection are set per
+integration, e.g. Upstreams(latency_ms={"openrouter": 800}, error_rate={"openrouter": 0.2}).
+The answers are shaped like the real APIs, only as detailed as the app reads them.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .stub_server import StubServer
+
+NAMES = ("weather", "schemes", "eshram", "rgi", "openrouter", "openai", "ollama")
+
+# Typical answer times of the real services, in ms
+DEFAULT_LATENCY_MS = {
+    "weather": 120, "schemes": 300, "eshram": 400, "rgi": 600, "openrouter": 900, "openai": 700, "ollama": 1500,
+}
+
+ANSWER = "Test your soil before sowing, and add compost to improve its structure and water holding."
+CROPS = [
+    {"crop": "Wheat", "emoji": "🌾", "score": 82, "category": "Cereal", "sowing_window": "Nov-Dec",
+     "water_need": "medium", "yield_range": "3-5 t/ha", "reasons": ["Cool season fit", "Stable demand"]},
+    {"crop": "Mustard", "emoji": "🌼", "score": 76, "category": "Oilseed", "sowing_window": "Oct-Nov",
+     "water_need": "low", "yield_range": "1-2 t/ha", "reasons": ["Low water need", "Good mandi price"]},
+    {"crop": "Chickpea", "emoji": "🫘", "score": 71, "category": "Pulse", "sowing_window": "Oct-Nov",
+     "water_need": "low", "yield_range": "1-2 t/ha", "reasons": ["Fixes nitrogen", "Rainfed friendly"]},
+]
+
+_JSON = {"Content-Type": "application/json"}
+
+
+def _json(payload, status: int = 200):
+    return status, _JSON, json.dumps(payload).encode()
+
+
+def weather(method: str, path: str, body: bytes):
+    url = urlsplit(path)
+    q = {k: v[0] for k, v in parse_qs(url.query).items()}
+    lat, lon = float(q.get("lat", 0)), float(q.get("lon", 0))
+    now = int(time.time())
+    current = {
+        "coord": {"lat": lat, "lon": lon},
+        "weather": [{"description": "scattered clouds"}],
+        "main": {"temp": 29.5, "humidity": 62},
+        "wind": {"speed": 3.1},
+        "rain": {"1h": 0.2},
+        "dt": now,
+        "name": "Stub",
+    }
+    if url.path.endswith("/forecast"):
+        return _json({"list": [{**current, "dt": now + 3 * 3600 * i} for i in range(40)]})
+    return _json(current)
+
+
+def schemes(pages: int = 3, per_page: int = 20):
+    """myscheme listing: `pages` pages of `per_page` cards, then a page with nothing new."""
+
+    def handle(method: str, path: str, body: bytes):
+        q = parse_qs(urlsplit(path).query)
+        page = int(q.get("page", ["1"])[0])
+        cards = []
+        if page <= pages:
+            for i in range((page - 1) * per_page, page * per_page):
+                cards.append(
+                    f'<div class="card"><a href="/schemes/scheme-{i}">Kisan Support Scheme {i}</a>'
+                    f"<p>Financial assistance for farmers: seeds, irrigation, crop insurance and soil health, batch {i % 7}.</p></div>"
+                )
+        html = "<html><body><main>" + "".join(cards) + "</main></body></html>"
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, html.encode()
+
+    return handle
+
+
+def eshram(method: str, path: str, body: bytes):
+    if path.endswith("/generateAuthToken"):
+        return _json({"token": "stub-token", "expires_in": 1800})
+    uan = (json.loads(body or b"{}").get("uan") or "")
+    if uan.endswith("0"):
+        return _json({"error": "record not found"}, 404)
+    return _json({"valid": True, "uan": uan})
+
+
+def rgi(kb: int = 200):
+    pdf = b"%PDF" + os.urandom(kb * 1024)
+
+    def handle(method: str, path: str, body: bytes):
+        return 200, {"Content-Type": "application/pdf"}, pdf
+
+    return handle
+
+
+def _completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()), "model": "stub",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 40, "completion_tokens": 20, "total_tokens": 60},
+    }
+
+
+def _sse(content: str) -> list:
+    chunks = []
+    for i, word in enumerate(content.split(" ")):
+        delta = {"content": word if i == 0 else " " + word}
+        chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": "stub",
+                 "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+        chunks.append(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+    chunks.append(b"data: [DONE]\n\n")
+    return chunks
+
+
+def openai_compat(method: str, path: str, body: bytes):
+    """OpenAI-style /chat/completions, used for both OpenAI and OpenRouter; crop prompts get a JSON array."""
+    req = json.loads(body or b"{}")
+    prompt = " ".join(str(m.get("content", "")) for m in req.get("messages", []))
+    content = json.dumps(CROPS, ensure_ascii=False) if "JSON array" in prompt else ANSWER
+    if req.get("stream"):
+        return 200, {"Content-Type": "text/event-stream"}, _sse(content)
+    return _json(_completion(content))
+
+
+def ollama(method: str, path: str, body: bytes):
+    req = json.loads(body or b"{}")
+    if req.get("stream"):
+        words = ANSWER.split(" ")
+        lines = [json.dumps({"message": {"content": w if i == 0 else " " + w}, "done": False}).encode() + b"\n"
+                 for i, w in enumerate(words)]
+        lines.append(json.dumps({"message": {"content": ""}, "done": True}).encode() + b"\n")
+        return 200, {"Content-Type": "application/x-ndjson"}, lines
+    return _json({"message": {"role": "assistant", "content": ANSWER}, "done": True})
+
+
+class Upstreams:
+    """All stubs as one context manager; `servers[name]` exposes each StubServer's counters."""
+
+    def __init__(
+        self,
+        latency_ms: Optional[Dict[str, float]] = None,
+        error_rate: Optional[Dict[str, float]] = None,
+        jitter: float = 0.5,
+        chunk_ms: float = 20,
+        seed: int = 0,
+    ):
+        latency = {**DEFAULT_LATENCY_MS, **(latency_ms or {})}
+        errors = error_rate or {}
+        handlers = {
+            "weather": weather, "schemes": schemes(), "eshram": eshram, "rgi": rgi(),
+            "openrouter": openai_compat, "openai": openai_compat, "ollama": ollama,
+        }
+        # jitter is a fraction of the base latency, so tails exist without a separate knob per service
+        self.servers = {
+            name: StubServer(
+                handlers[name], latency_ms=latency[name], jitter_ms=latency[name] * jitter,
+                chunk_ms=chunk_ms, error_rate=errors.get(name, 0), seed=seed + i,
+            )
+            for i, name in enumerate(NAMES)
+        }
+
+    def __enter__(self) -> "Upstreams":
+        for s in self.servers.values():
+            s.start()
+        return self
+
+    def __exit__(self, *exc):
+        for s in self.servers.values():
+            s.stop()
+
+    def env(self) -> Dict[str, str]:
+        """Variables pointing app.main at the stubs, with credentials for every integration."""
+        u = {name: s.url for name, s in self.servers.items()}
+        return {
+            "OPENWEATHER_BASE": u["weather"],
+            "OPENWEATHER_API_KEY": "stub",
+            "SCHEMES_SOURCE_URL": u["schemes"] + "/schemes",
+            "SCHEMES_CRAWL_DELAY": "0",
+            "ESHRAM_BASE_URL": u["eshram"],
+            "ESHRAM_CLIENT_ID": "stub",
+            "ESHRAM_CLIENT_SECRET": "stub",
+            "RGI_BASE_URL": u["rgi"],
+            "RGI_API_KEY": "stub",
+            "OPENROUTER_BASE_URL": u["openrouter"] + "/v1",
+            "OPENROUTER_API_KEY": "stub",
+            "OPENAI_BASE_URL": u["openai"] + "/v1",
+            "OPENAI_API_KEY": "stub",
+            "OLLAMA_BASE": u["ollama"],
+        }
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {"requests": s.requests, "errors": s.errors, "connections": s.connections}
+            for name, s in self.servers.items()
+        }